@@ -0,0 +1,250 @@
+from config import Config
+from document_parser import DocumentParser
+from test_case_generator import TestCaseGenerator
+from output_handler import OutputHandler
+from run import finalize_cases, open_journal, report_traceability, start_profile, save_profile
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from datetime import datetime
+from pathlib import Path
+from typing import List, Dict, Any, Optional
+import argparse
+import json
+import time
+
+'''
+批量生成入口，一次处理多个章节/ECU 的功能规范与信号矩阵。
+输入由清单文件（JSON）或 PDF 通配符给出；各文档的解析在进程池中并行进行，
+全部文档的大模型请求提交到同一个线程池，共享 RequestScheduler 的限流、重试和自适应并发，
+总耗时取决于服务商的速率上限，而不是各章节顺序运行时间之和。
+每个章节的测试用例单独输出到批次目录下的子目录，并生成汇总 summary.json。
+
+清单文件格式：
+[
+  {"name": "第七章", "pdf": "功能规范-第七章.pdf", "signals": ["CAN信号矩阵-第七章.xlsx"]},
+  ...
+]
+相对路径相对于清单文件所在目录。
+'''
+
+MATRIX_SUFFIXES = (".xlsx", ".dbc")
+
+
+def load_manifest(manifest_path: Path) -> List[Dict[str, Any]]:
+    """读取清单文件，返回 [{"name", "pdf", "signals"}]"""
+    manifest_path = Path(manifest_path)
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        entries = json.load(f)
+    jobs = []
+    for entry in entries:
+        pdf_path = manifest_path.parent / entry["pdf"]
+        signals = entry.get("signals") or []
+        if isinstance(signals, str):
+            signals = [signals]
+        jobs.append({
+            "name": entry.get("name") or pdf_path.stem,
+            "pdf": pdf_path,
+            "signals": [manifest_path.parent / path for path in signals]
+        })
+    return jobs
+
+
+def pair_inputs(pattern: str, base_dir: Path) -> List[Dict[str, Any]]:
+    """按通配符查找 PDF，并在同一目录下按章节名匹配信号矩阵
+
+    章节名取文件名最后一个 "-" 之后的部分，如 "功能规范-第七章.pdf" 对应 "CAN信号矩阵-第七章.xlsx"。
+    """
+    jobs = []
+    for pdf_path in sorted(Path(base_dir).glob(pattern)):
+        key = pdf_path.stem.split("-")[-1]
+        matrices = sorted(path for path in pdf_path.parent.iterdir()
+                          if path.suffix.lower() in MATRIX_SUFFIXES and path.stem.split("-")[-1] == key)
+        jobs.append({"name": key, "pdf": pdf_path, "signals": matrices})
+    return jobs
+
+
+def _parse_job(config, job: Dict[str, Any]) -> Dict[str, Any]:
+    """在子进程中解析一个章节的功能规范和信号矩阵"""
+    start = time.perf_counter()
+    result = {"name": job["name"], "requirements": [], "signals": {}, "error": None}
+    try:
+        if not job["signals"]:
+            raise FileNotFoundError(f"未找到章节 {job['name']} 的信号矩阵")
+        parser = DocumentParser(config)
+        result["requirements"] = parser.parse_pdf(Path(job["pdf"]), workers=1)
+        result["signals"] = parser.parse_signal_matrices(job["signals"])
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+    result["parse_seconds"] = round(time.perf_counter() - start, 3)
+    return result
+
+
+def run_batch(config, jobs: List[Dict[str, Any]], parse_workers: Optional[int] = None,
+              resume: Optional[str] = None) -> Dict[str, Any]:
+    """执行批量生成，返回汇总信息"""
+    run_profiler = start_profile(config)
+    context = {}
+    try:
+        return _run_batch(config, jobs, parse_workers, resume, context)
+    finally:
+        generator = context.get("generator")
+        save_profile(config, run_profiler, generator=generator,
+                     journal=generator.journal if generator is not None else None)
+
+
+def _run_batch(config, jobs: List[Dict[str, Any]], parse_workers: Optional[int], resume: Optional[str],
+               context: Dict[str, Any]) -> Dict[str, Any]:
+    """批量生成的主体，context 用于向外层交出生成器以便收集剖析统计"""
+    batch_start = time.perf_counter()
+    # 输出格式在解析和调用大模型之前检查
+    output_handler = OutputHandler(config)
+    output_handler.validate_formats()
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    batch_dir = config.OUTPUTS_DIR / f"batch_{timestamp}"
+    batch_dir.mkdir(parents=True, exist_ok=True)
+    summary = {"started": timestamp, "jobs": []}
+
+    # 章节名称用作输出子目录，重名时追加序号
+    seen = {}
+    for job in jobs:
+        count = seen.get(job["name"], 0)
+        seen[job["name"]] = count + 1
+        if count:
+            job["name"] = f"{job['name']}_{count + 1}"
+
+    # 1. 多进程解析全部章节
+    parse_workers = parse_workers or config.BATCH_PARSE_WORKERS
+    print(f"🔧 正在解析 {len(jobs)} 个章节（{parse_workers} 个进程）...")
+    with ProcessPoolExecutor(max_workers=max(1, min(parse_workers, len(jobs)))) as executor:
+        parsed = list(executor.map(_parse_job, [config] * len(jobs), jobs))
+
+    # 2. 所有章节的请求提交到同一个线程池，由共享的调度器控制并发和速率
+    generator = TestCaseGenerator(config)
+    generator.journal = open_journal(config, resume)
+    context["generator"] = generator
+    states = {}
+    for job, result in zip(jobs, parsed):
+        state = {"job": job, "result": result, "cases": {}, "pending": 0, "start": None, "failed_requests": 0}
+        states[job["name"]] = state
+        if result["error"]:
+            print(f"❌ 章节 {job['name']} 解析失败: {result['error']}")
+            continue
+        if not result["requirements"]:
+            result["error"] = "未识别到功能需求"
+            continue
+        state["requests"], state["signal_index"] = generator.plan_requests(result["requirements"], result["signals"])
+        state["pending"] = len(state["requests"])
+
+    workers = max(1, min(generator.scheduler.max_concurrency, sum(s["pending"] for s in states.values())))
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {}
+            for name, state in states.items():
+                if "requests" not in state:
+                    continue
+                state["start"] = time.perf_counter()
+                for index, request in enumerate(state["requests"]):
+                    future = executor.submit(generator.generate_request, request,
+                                             state["result"]["signals"], state["signal_index"])
+                    futures[future] = (name, index)
+
+            for future in as_completed(futures):
+                name, index = futures[future]
+                state = states[name]
+                try:
+                    state["cases"][index] = future.result()
+                except Exception as e:
+                    print(f"⚠️ 章节 {name} 的第 {index + 1} 个请求失败: {e}")
+                    state["cases"][index] = []
+                if not state["cases"][index]:
+                    state["failed_requests"] += 1
+                state["pending"] -= 1
+                if state["pending"] == 0:
+                    # 章节的全部请求完成后立即输出，不等待其它章节
+                    summary["jobs"].append(_finish_job(config, output_handler, state, batch_dir))
+        # 全部请求成功且结果已保存，不再需要从运行日志恢复
+        if generator.journal is not None and not any(state["failed_requests"] for state in states.values()):
+            generator.journal.discard()
+    finally:
+        if generator.journal is not None:
+            generator.journal.close()
+
+    for state in states.values():
+        if "requests" not in state:
+            summary["jobs"].append(_job_summary(state, 0, {}))
+    order = {job["name"]: index for index, job in enumerate(jobs)}
+    summary["jobs"].sort(key=lambda item: order[item["name"]])
+
+    summary["wall_seconds"] = round(time.perf_counter() - batch_start, 3)
+    summary["scheduler"] = generator.scheduler.stats()
+    if generator.response_cache:
+        summary["cache"] = generator.response_cache.stats()
+    summary_path = batch_dir / "summary.json"
+    with open(summary_path, 'w', encoding='utf-8') as f:
+        json.dump(summary, f, ensure_ascii=False, indent=2, default=str)
+
+    print(f"\n📊 批量生成统计（共 {summary['wall_seconds']} 秒）:")
+    for item in summary["jobs"]:
+        status = item["error"] or f"{item['test_cases']} 个测试用例"
+        print(f"- {item['name']}: {status}")
+    print(f"- 汇总文件: {summary_path}")
+    return summary
+
+
+def _finish_job(config, output_handler: OutputHandler, state: Dict[str, Any], batch_dir: Path) -> Dict[str, Any]:
+    """合并章节各请求的结果，追加本地用例并输出"""
+    name = state["job"]["name"]
+    print(f"\n📁 章节 {name} 生成完成")
+    test_cases = [case for index in sorted(state["cases"]) for case in state["cases"][index]]
+    job_dir = batch_dir / name
+    job_dir.mkdir(parents=True, exist_ok=True)
+    test_cases = finalize_cases(config, test_cases, state["result"]["signals"],
+                                job_dir / "Frames.json", job_dir / "Dedup.json")
+    if test_cases and config.TRACEABILITY_ENABLED:
+        requirements = DocumentParser(config).extract_requirements(state["result"]["requirements"])
+        report_traceability(config, requirements, state["result"]["signals"], test_cases,
+                            job_dir / "Traceability.json", state["signal_index"])
+    output_paths = output_handler.save(test_cases, output_stem=job_dir / "TestCases") if test_cases else {}
+    return _job_summary(state, len(test_cases), output_paths)
+
+
+def _job_summary(state: Dict[str, Any], case_count: int, output_paths: Dict[str, Path]) -> Dict[str, Any]:
+    result = state["result"]
+    return {
+        "name": state["job"]["name"],
+        "pdf": str(state["job"]["pdf"]),
+        "signal_files": [str(path) for path in state["job"]["signals"]],
+        "error": result["error"],
+        "signals": len(result["signals"]),
+        "requests": len(state.get("requests", [])),
+        "failed_requests": state["failed_requests"],
+        "test_cases": case_count,
+        "parse_seconds": result["parse_seconds"],
+        "generate_seconds": round(time.perf_counter() - state["start"], 3) if state["start"] else None,
+        "outputs": {fmt: str(path) for fmt, path in output_paths.items()}
+    }
+
+
+def parse_args(argv=None):
+    arg_parser = argparse.ArgumentParser(description="批量生成多个章节/ECU 的测试用例")
+    source = arg_parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--manifest", help="清单文件（JSON），列出每个章节的 PDF 和信号矩阵")
+    source.add_argument("--glob", help="PDF 通配符（相对输入目录），如 \"功能规范-*.pdf\"")
+    arg_parser.add_argument("--parse-workers", type=int, default=None, help="解析进程数")
+    arg_parser.add_argument("--resume", nargs="?", const="latest", default=None, metavar="JOURNAL",
+                            help="从运行日志恢复，不指定路径时使用最近一次的运行日志")
+    return arg_parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    print("🚀 汽车电子测试用例生成系统 v2.0 (批量模式)")
+    config = Config()
+    jobs = load_manifest(Path(args.manifest)) if args.manifest else pair_inputs(args.glob, config.INPUTS_DIR)
+    if not jobs:
+        print("❌ 没有找到需要处理的章节")
+        return None
+    return run_batch(config, jobs, args.parse_workers, args.resume)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+import math
+from typing import List, Dict, Any, Optional, Tuple
+from signal_utils import to_number, format_number
+
+'''
+定义了 BoundaryCaseGenerator 类，根据 CAN 信号矩阵中的位宽、精度、偏移和取值范围，
+在本地确定性地生成边界值、最小/最大值、越界值和原始值溢出测试用例。
+生成结果与 AI 生成的测试用例结构一致，可直接交给 OutputHandler.save_to_excel，
+AI 只需负责功能行为类测试用例。
+越界值和原始值溢出用例的输入信号本身就超出范围，使用单独的 test_type，信号校验时不作为问题报告。
+有符号信号（is_signed）的原始值按补码取值，负数原始值写为 "-0x..."，与 SignalCodec 的解析方式一致。
+'''
+
+VALID_TEST_TYPE = "边界值"
+OUT_OF_RANGE_TEST_TYPE = "越界值"
+OVERFLOW_TEST_TYPE = "溢出值"
+INVALID_TEST_TYPES = (OUT_OF_RANGE_TEST_TYPE, OVERFLOW_TEST_TYPE)
+
+
+class BoundaryCaseGenerator:
+    def __init__(self, config=None):
+        self.config = config
+
+    def generate(self, signals: Dict[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """为所有可解析位宽的信号生成边界值与异常值测试用例"""
+        test_cases = []
+        for name, info in signals.items():
+            layout = self._signal_layout(info)
+            if layout is None:
+                continue
+            test_cases.extend(self._signal_cases(str(name), info, *layout))
+        return test_cases
+
+    def _signal_layout(self, info: Dict[str, Any]) -> Optional[Tuple[int, float, float, int, int]]:
+        """计算信号的 (位长度, 精度, 偏移, 原始最小值, 原始最大值)，无法计算时返回 None"""
+        bit_length = to_number(info.get("bit_length"))
+        if not bit_length or bit_length <= 0 or bit_length > 64 or not float(bit_length).is_integer():
+            return None
+        bit_length = int(bit_length)
+        factor = to_number(info.get("factor")) or 1
+        offset = to_number(info.get("offset")) or 0
+        raw_low, raw_high = self._raw_bounds(bit_length, bool(info.get("is_signed")))
+
+        # 物理范围优先取矩阵中的最小/最大值，缺失时由位宽推算
+        raw_min, raw_max = raw_low, raw_high
+        value_range = str(info.get("value_range") or "")
+        if "~" in value_range:
+            low, high = (to_number(part) for part in value_range.split("~", 1))
+            low, high = (None if value is None else self._to_raw(value, factor, offset) for value in (low, high))
+            if low is not None:
+                raw_min = low
+            if high is not None:
+                raw_max = high
+        if raw_min > raw_max:  # 精度为负时物理最小值对应原始最大值
+            raw_min, raw_max = raw_max, raw_min
+        raw_min = min(max(raw_min, raw_low), raw_high)
+        raw_max = min(max(raw_max, raw_min), raw_high)
+        return bit_length, factor, offset, raw_min, raw_max
+
+    @staticmethod
+    def _raw_bounds(bit_length: int, signed: bool) -> Tuple[int, int]:
+        """位宽可表示的原始值范围，有符号信号按补码"""
+        if signed:
+            return -(1 << (bit_length - 1)), (1 << (bit_length - 1)) - 1
+        return 0, (1 << bit_length) - 1
+
+    @staticmethod
+    def _to_raw(physical: float, factor: float, offset: float) -> Optional[int]:
+        """物理值换算为原始值，结果溢出为无穷大时返回 None"""
+        raw = (physical - offset) / factor
+        return int(round(raw)) if math.isfinite(raw) else None
+
+    def _signal_cases(self, name: str, info: Dict[str, Any], bit_length: int, factor: float,
+                      offset: float, raw_min: int, raw_max: int) -> List[Dict[str, Any]]:
+        """生成单个信号的测试用例：等价类、边界值、越界值和原始值溢出"""
+        unit = info.get("unit") or ""
+        raw_low, raw_high = self._raw_bounds(bit_length, bool(info.get("is_signed")))
+        stimuli = [
+            ("最小值", raw_min, True),
+            ("最大值", raw_max, True),
+        ]
+        if raw_max - raw_min >= 2:
+            stimuli.append(("最小值+1步长", raw_min + 1, True))
+            stimuli.append(("最大值-1步长", raw_max - 1, True))
+            stimuli.append(("中间值", (raw_min + raw_max) // 2, True))
+        if raw_min > raw_low:
+            stimuli.append(("低于最小值", raw_min - 1, False))
+        if raw_max < raw_high:
+            stimuli.append(("高于最大值", raw_max + 1, False))
+        # 2^位长度 无论按无符号还是补码解释都超出位宽
+        stimuli.append(("原始值溢出", 1 << bit_length, False))
+
+        test_cases = []
+        for label, raw, valid in stimuli:
+            physical = format_number(raw * factor + offset)
+            raw_hex = hex(raw).upper().replace("0X", "0x")
+            overflow = raw > raw_high
+            if valid:
+                test_type = VALID_TEST_TYPE
+                description = f"{name}边界值测试-{label}{physical}{unit}"
+                output_signal = f"{name}={physical}{unit}被正确识别"
+                expected = [f"ECU按{name}={physical}{unit}正常响应", "无故障码产生"]
+            elif overflow:
+                test_type = OVERFLOW_TEST_TYPE
+                description = f"{name}异常值测试-{label}({bit_length}位信号写入{raw_hex})"
+                output_signal = f"{name}原始值超出{bit_length}位宽，应被拒绝或截断"
+                expected = ["ECU不应响应溢出的原始值", "ECU保持上一有效状态或进入失效处理"]
+            else:
+                test_type = OUT_OF_RANGE_TEST_TYPE
+                description = f"{name}异常值测试-{label}{physical}{unit}"
+                output_signal = f"{name}={physical}{unit}超出有效范围，应按无效值处理"
+                expected = [f"ECU识别{name}超出有效范围", "ECU保持上一有效状态或进入失效处理"]
+            test_cases.append({
+                "description": description,
+                "coverage": [name],
+                "input_signal": {name: raw_hex},
+                "output_signal": output_signal,
+                "precondition": [
+                    "车辆处于ON电源模式",
+                    f"{name}所在报文{info.get('message_name') or ''}正常发送"
+                ],
+                "steps": [
+                    "1. 确认车辆处于ON电源模式",
+                    f"2. 设置{name}原始值为{raw_hex}（物理值{physical}{unit}）",
+                    "3. 保持信号发送至少3个报文周期",
+                    "4. 观察ECU响应及输出信号"
+                ],
+                "expected": expected,
+                "test_type": test_type
+            })
+        return test_cases
@@ -0,0 +1,86 @@
+import json
+from typing import Any, Dict, List
+
+'''
+定义了 IncrementalCaseParser 类，用于增量解析大模型流式输出的测试用例JSON。
+解析器逐字符跟踪括号层级和字符串状态，数组中的每个对象一旦闭合就立即解析并返回，
+单个对象格式错误时只跳过该对象，不影响同一响应中的其它测试用例。
+'''
+
+
+class IncrementalCaseParser:
+    def __init__(self):
+        self.parsed = 0
+        self.skipped = 0
+        self._stack: List[str] = []  # 已打开的容器：'[' 或 '{'
+        self._in_string = False
+        self._escape = False
+        self._last_token = ""  # 字符串外最近一个非空白字符
+        self._capture: List[str] = []
+        self._capture_depth = -1  # 正在捕获的对象所在的栈深度，-1 表示未捕获
+
+    def feed(self, text: str) -> List[Dict[str, Any]]:
+        """输入一段增量文本，返回其中新闭合的测试用例对象"""
+        cases = []
+        for char in text:
+            if self._capture_depth >= 0:
+                self._capture.append(char)
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                continue
+
+            if char == '"':
+                if self._stack:
+                    self._in_string = True
+            elif char == "[":
+                self._stack.append(char)
+            elif char == "{":
+                if not self._stack:
+                    # 忽略JSON数组之前的说明文字中的花括号
+                    pass
+                elif self._capture_depth >= 0 and self._stack[-1] == "{" and self._last_token in (",", "{"):
+                    # 对象内出现未经键名引导的新对象，说明上一个对象缺少右括号：丢弃并重新同步
+                    self.skipped += 1
+                    self._stack = self._stack[:self._capture_depth]
+                    self._capture = [char]
+                    self._capture_depth = len(self._stack)
+                    self._stack.append(char)
+                elif self._capture_depth < 0 and self._stack[-1] == "[":
+                    self._capture = [char]
+                    self._capture_depth = len(self._stack)
+                    self._stack.append(char)
+                else:
+                    self._stack.append(char)
+            elif char in "]}":
+                if self._stack:
+                    self._stack.pop()
+                if char == "}" and self._capture_depth >= 0 and len(self._stack) == self._capture_depth:
+                    case = self._finish_capture()
+                    if case is not None:
+                        cases.append(case)
+
+            if not char.isspace():
+                self._last_token = char
+        return cases
+
+    def _finish_capture(self) -> Any:
+        """解析已闭合的对象，格式错误时计入跳过数"""
+        raw = "".join(self._capture)
+        self._capture = []
+        self._capture_depth = -1
+        try:
+            case = json.loads(raw)
+        except ValueError:
+            self.skipped += 1
+            return None
+        if not isinstance(case, dict):
+            self.skipped += 1
+            return None
+        self.parsed += 1
+        return case
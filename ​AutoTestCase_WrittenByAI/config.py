@@ -26,6 +26,89 @@ class Config:
         self.OUTPUTS_DIR = self.BASE_DIR / "outputs"
         self.CONFIG_PATH = self.BASE_DIR / "config"
         
+        # 解析配置
+        self.PDF_WORKERS = 1  # PDF并行提取进程数，1表示串行
+        self.PARSE_CACHE_ENABLED = True  # 是否启用解析结果缓存
+        self.PARSE_CACHE_DIR = self.OUTPUTS_DIR / "cache"  # 解析结果缓存目录
+        self.INCREMENTAL_PARSE_ENABLED = False  # 是否按页面指纹增量解析修订版PDF，只为新增或变化的章节生成测试用例
+        self.EXCEL_WORKERS = 4  # 多工作表信号矩阵的并行解析进程数
+        self.SIGNAL_MATRIX_FILES = []  # 信号矩阵文件列表（xlsx 或 dbc），为空时只解析默认工作簿的当前工作表
+        self.DBC_ENCODING = "utf-8"  # DBC文件编码，国内工具导出的文件常为 gbk
+        self.BATCH_PARSE_WORKERS = 4  # 批量模式下并行解析章节的进程数
+        
+        # 生成配置
+        self.GENERATION_MODE = "single"  # single: 整篇单次调用; chunked: 按章节分块并发调用
+        self.LLM_CONCURRENCY = 4  # 分块模式下的初始并发请求数
+        self.LLM_REQUESTS_PER_MINUTE = 60  # 每分钟最大请求数，0表示不限制
+        self.LLM_MAX_CONCURRENCY = 16  # 自适应并发的上限
+        self.LLM_ADAPTIVE_CONCURRENCY = True  # 按限流响应和延迟自动调整并发数（AIMD）
+        self.LLM_MAX_RETRIES = 5  # 连接错误、超时、429、5xx 的最大重试次数
+        self.LLM_RETRY_BASE_DELAY = 1.0  # 指数退避的初始等待秒数
+        self.LLM_RETRY_MAX_DELAY = 60.0  # 单次重试的最长等待秒数
+        self.LLM_TIMEOUT = 120.0  # 单次请求超时秒数
+        self.LLM_MAX_TOKENS = 4000  # 未启用 token 规划时每次请求的 max_tokens
+        self.TOKEN_PLANNING_ENABLED = True  # 按 token 预算合并/切分请求并设置 max_tokens
+        self.LLM_CONTEXT_TOKENS = 131072  # 模型上下文窗口（qwen-plus）
+        self.LLM_MAX_OUTPUT_TOKENS = 8192  # 模型单次最大输出 token 数
+        self.LLM_OUTPUT_TOKENS_PER_REQUIREMENT = 1200  # 每条功能需求预计输出的 token 数（约 3~4 个测试用例）
+        self.LLM_TOKENIZER_ENCODING = None  # 安装 tiktoken 时可设为 "cl100k_base"，否则使用启发式估算
+        self.SIGNAL_FILTER_ENABLED = True  # 提示词中只写入需求文本提及的信号
+        self.SIGNAL_ALIASES = {}  # 信号别名，如 {"VCU_ActGear": ["实际档位"]}
+        self.LOCAL_BOUNDARY_CASES = True  # 信号边界值/越界值用例由本地规则生成，不再交给AI
+        self.STREAM_OUTPUT = False  # 流式生成：每个测试用例解析完成后立即去重并写入输出文件
+        
+        # 覆盖补充配置
+        self.COVERAGE_LOOP_ENABLED = True  # 生成后针对未覆盖的需求/信号发送小批量补充请求
+        self.COVERAGE_MAX_CALLS = 10  # 补充请求的总调用次数上限
+        self.COVERAGE_MAX_ROUNDS = 3  # 最多补充轮数，覆盖不再提升时提前结束
+        self.COVERAGE_TARGETS_PER_REQUEST = 5  # 每个补充请求包含的缺口条目数
+        self.COVERAGE_REQUIRE_ABNORMAL = True  # 只有正常场景用例的需求也视为覆盖缺口
+
+        # 去重配置
+        self.DEDUP_ENABLED = True  # 合并输入/输出信号相同、描述和步骤相近的重复测试用例
+        self.DEDUP_SIMILARITY = 0.8  # 描述和步骤的相似度阈值（MinHash 估计的 Jaccard 相似度）
+        self.DEDUP_REPORT_EXPORT = False  # 是否将去重合并记录导出为JSON
+
+        # 追溯配置
+        self.TRACEABILITY_ENABLED = True  # 统计需求/信号的测试用例覆盖情况并列出未覆盖条目
+        self.TRACEABILITY_EXPORT = False  # 是否将追溯矩阵统计导出为JSON
+
+        # 信号编解码配置
+        self.SIGNAL_VALIDATION_ENABLED = True  # 按信号矩阵布局校验测试用例的输入信号
+        self.SIGNAL_FRAME_EXPORT = False  # 是否将输入信号打包后的报文数据导出为JSON
+        self.CAN_FD = False  # True 时所有报文按 CAN-FD 64 字节打包
+        
+        # 运行日志配置
+        self.RUN_JOURNAL_ENABLED = True  # 每个生成块完成后写入运行日志，支持中断后恢复
+        self.RUN_JOURNAL_DIR = self.OUTPUTS_DIR / "journal"  # 运行日志目录
+        self.RUN_JOURNAL_KEEP = 5  # 保存失败或中断的运行日志最多保留的个数，成功保存结果的运行日志会被删除
+        
+        # 运行剖析配置
+        self.PROFILE_ENABLED = True  # 记录各阶段耗时、CPU时间、峰值内存、token 用量和缓存命中率
+        self.PROFILE_DIR = self.OUTPUTS_DIR / "profiles"  # 运行剖析结果目录
+        self.PROFILE_CHROME_TRACE = False  # 同时导出 Chrome trace-event 文件（chrome://tracing 或 Perfetto 打开）
+        self.LLM_PROMPT_PRICE_PER_1K = 0.0008  # 每千输入 token 价格（元），用于估算费用
+        self.LLM_COMPLETION_PRICE_PER_1K = 0.002  # 每千输出 token 价格（元）
+        
+        # 输出配置
+        self.OUTPUT_FORMATS = ["xlsx"]  # 输出格式，可同时选择 xlsx / jsonl / csv / parquet（需要 pyarrow）
+        self.TAXONOMY_PATH = self.CONFIG_PATH / "config.json"  # 功能/特性/测试组分类词表（taxonomy 项）
+        
+        # 常驻服务配置
+        self.SERVICE_HOST = "127.0.0.1"  # 服务监听地址，默认只接受本机请求
+        self.SERVICE_PORT = 8765  # 服务监听端口
+        self.SERVICE_JOB_WORKERS = 2  # 同时执行的任务数
+        self.SERVICE_DOCUMENT_CACHE_SIZE = 32  # 内存中保留的已解析文档数
+        self.SERVICE_MAX_JOBS = 100  # 保留的已结束任务记录数
+        
+        # 响应缓存配置
+        self.LLM_CACHE_ENABLED = True  # 是否启用大模型响应缓存
+        self.LLM_CACHE_MODE = "use"  # use: 读写缓存; refresh: 重新请求并覆盖; bypass: 不使用缓存
+        self.LLM_CACHE_PATH = self.OUTPUTS_DIR / "cache" / "llm_responses.sqlite3"  # 缓存数据库路径
+        self.LLM_CACHE_MAX_ENTRIES = 5000  # 最大缓存条目数
+        self.LLM_CACHE_MAX_BYTES = 200 * 1024 * 1024  # 最大缓存字节数
+        self.LLM_CACHE_MAX_AGE_DAYS = 30  # 缓存条目最长保留天数
+        
         # 创建必要目录
         for dir_path in [self.OUTPUTS_DIR, self.INPUTS_DIR, self.CONFIG_PATH]:
             dir_path.mkdir(exist_ok=True)
\ No newline at end of file
@@ -0,0 +1,193 @@
+import re
+import numpy as np
+from typing import List, Dict, Any, Optional, Tuple
+from signal_utils import to_number, format_number
+
+'''
+定义了 CaseDeduplicator 类，对分块并发或多次运行生成的测试用例去重合并。
+两个测试用例的 input_signal / output_signal 规范化后完全相同，
+且描述和测试步骤的相似度（MinHash 估计的字符 3-gram Jaccard 相似度）不低于阈值时，视为重复。
+MinHash 签名对全部测试用例用 NumPy 批量计算，候选对通过 LSH 分桶查找，
+只在同一输入/输出信号组合、同一桶内比较，总耗时随用例数近似线性增长。
+每组重复用例保留内容最完整的一个（步骤、预期结果和前置条件最多），位置取该组首次出现的位置。
+'''
+
+# 描述和步骤中只保留文字和数字，忽略空白、标点及 "1." 一类的步骤编号差异
+NON_WORD_PATTERN = re.compile(r'[\W_]+')
+STEP_NUMBER_PATTERN = re.compile(r'^\s*(?:步骤\s*)?\d+\s*[.、:：)）]\s*')
+SHINGLE_BATCH = 1 << 16  # 每批计算 MinHash 的 shingle 数，控制中间矩阵的内存占用
+
+
+def _canonical_value(value: Any) -> str:
+    number = to_number(value)
+    if number is not None:
+        return format_number(number)
+    return NON_WORD_PATTERN.sub("", str(value)).lower()
+
+
+def canonical_signals(case: Dict[str, Any]) -> Tuple:
+    """input_signal 按信号名排序、数值统一格式，output_signal 去除空白和标点，作为精确匹配键"""
+    input_signal = case.get("input_signal") or {}
+    if isinstance(input_signal, dict):
+        inputs = tuple(sorted((str(name).strip(), _canonical_value(value))
+                              for name, value in input_signal.items()))
+    else:
+        inputs = (_canonical_value(input_signal),)
+    return inputs, _canonical_value(case.get("output_signal") or "")
+
+
+def case_text(case: Dict[str, Any]) -> str:
+    """参与相似度计算的文本：描述和测试步骤"""
+    steps = case.get("steps") or []
+    if isinstance(steps, str):
+        steps = [steps]
+    parts = [str(case.get("description") or "")] + [STEP_NUMBER_PATTERN.sub("", str(step)) for step in steps]
+    return NON_WORD_PATTERN.sub("", "".join(parts)).lower()
+
+
+def _richness(case: Dict[str, Any]) -> int:
+    return sum(len(case.get(field) or []) for field in ("steps", "expected", "precondition"))
+
+
+class CaseDeduplicator:
+    def __init__(self, threshold: float = 0.8, num_perm: int = 64, bands: int = 8,
+                 shingle_size: int = 3, seed: int = 1):
+        if num_perm % bands:
+            raise ValueError("num_perm 必须是 bands 的整数倍")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+
+        # 每个排列为 uint32 上的 (a * x + b) mod 2^32，a 为奇数时是 2^32 上的一个置换，运算自然溢出无需取模
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(0, 1 << 31, size=num_perm).astype(np.uint32) * np.uint32(2) + np.uint32(1)
+        self._b = rng.randint(0, 1 << 32, size=num_perm, dtype=np.int64).astype(np.uint32)
+        self._shingle_weights = (rng.randint(1, 1 << 62, size=shingle_size, dtype=np.int64)
+                                 .astype(np.uint64) | np.uint64(1))
+        self._band_weights = (rng.randint(1, 1 << 62, size=self.rows, dtype=np.int64)
+                              .astype(np.uint64) | np.uint64(1))
+
+        # 已保留的测试用例；多次调用 dedupe 时，后续批次也会与之前保留的用例比较
+        self._kept: List[Dict[str, Any]] = []
+        self._kept_index: List[int] = []  # 保留用例在全部输入中的序号
+        self._signatures: List[np.ndarray] = []
+        self._exact_ids: Dict[Tuple, int] = {}
+        self._buckets: Dict[Tuple[int, int, int], int] = {}
+        self.seen = 0
+        self.merges: List[Dict[str, Any]] = []
+
+    def signatures(self, texts: List[str]) -> np.ndarray:
+        """批量计算文本的 MinHash 签名，返回 (文本数, num_perm) 的 uint32 数组"""
+        k = self.shingle_size
+        # 不足 k 个字符的文本补齐，保证每个文本至少有一个 shingle
+        texts = [text + "\x01" * (k - len(text)) if len(text) < k else text for text in texts]
+        lengths = np.fromiter((len(text) for text in texts), dtype=np.int64, count=len(texts))
+        codes = np.frombuffer("".join(texts).encode("utf-32-le"), dtype=np.uint32).astype(np.uint64)
+
+        # 所有位置的 k-gram 哈希，再只取不跨越文本边界的位置
+        hashes = np.zeros(len(codes) - k + 1, dtype=np.uint64)
+        for offset in range(k):
+            hashes += codes[offset:len(codes) - k + 1 + offset] * self._shingle_weights[offset]
+        hashes = (hashes >> np.uint64(32)).astype(np.uint32)
+
+        counts = lengths - k + 1
+        text_starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+        shingle_starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        positions = np.repeat(text_starts - shingle_starts, counts) + np.arange(counts.sum())
+        hashes = hashes[positions]
+
+        result = np.empty((len(texts), self.num_perm), dtype=np.uint32)
+        buffer = np.empty((self.num_perm, SHINGLE_BATCH), dtype=np.uint32)
+        first = 0
+        while first < len(texts):
+            # 按 shingle 数分批，每批至少一个文本
+            last = int(np.searchsorted(shingle_starts, shingle_starts[first] + SHINGLE_BATCH, side="left"))
+            last = max(last, first + 1)
+            begin = shingle_starts[first]
+            end = shingle_starts[last] if last < len(texts) else len(hashes)
+            if end - begin > buffer.shape[1]:
+                buffer = np.empty((self.num_perm, end - begin), dtype=np.uint32)
+            permuted = buffer[:, :end - begin]
+            np.multiply(self._a[:, None], hashes[None, begin:end], out=permuted)
+            permuted += self._b[:, None]
+            result[first:last] = np.minimum.reduceat(permuted, shingle_starts[first:last] - begin, axis=1).T
+            first = last
+        return result
+
+    def _band_keys(self, signatures: np.ndarray) -> np.ndarray:
+        """将签名按 bands 分段，每段哈希为一个整数，返回 (文本数, bands)"""
+        banded = signatures.astype(np.uint64).reshape(len(signatures), self.bands, self.rows)
+        return (banded * self._band_weights).sum(axis=2, dtype=np.uint64)
+
+    def dedupe(self, test_cases: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """返回去重后的测试用例，保持首次出现的顺序；合并记录追加到 merges"""
+        if not test_cases:
+            return []
+        signatures = self.signatures([case_text(case) for case in test_cases])
+        band_keys = self._band_keys(signatures).tolist()
+
+        result: List[Dict[str, Any]] = []
+        positions: Dict[int, int] = {}  # 本批次保留用例在 _kept 中的序号 -> 在 result 中的位置
+        for index, case in enumerate(test_cases):
+            exact_id = self._exact_ids.setdefault(canonical_signals(case), len(self._exact_ids))
+            keys = [(exact_id, band, key) for band, key in enumerate(band_keys[index])]
+
+            match, similarity = None, 0.0
+            checked = set()
+            for key in keys:
+                kept_id = self._buckets.get(key)
+                if kept_id is None or kept_id in checked:
+                    continue
+                checked.add(kept_id)
+                similarity = float(np.mean(self._signatures[kept_id] == signatures[index]))
+                if similarity >= self.threshold:
+                    match = kept_id
+                    break
+
+            if match is None:
+                kept_id = len(self._kept)
+                self._kept.append(case)
+                self._kept_index.append(self.seen + index)
+                self._signatures.append(signatures[index])
+                for key in keys:
+                    self._buckets.setdefault(key, kept_id)
+                positions[kept_id] = len(result)
+                result.append(case)
+                continue
+
+            # 重复用例内容更完整时替换本批次中保留的用例，之前批次已输出的用例不再改动；
+            # 合并记录始终记录被舍弃的用例
+            merged, merged_index = case, self.seen + index
+            if match in positions and _richness(case) > _richness(self._kept[match]):
+                merged, merged_index = self._kept[match], self._kept_index[match]
+                self._kept[match] = case
+                self._kept_index[match] = self.seen + index
+                result[positions[match]] = case
+            self.merges.append({
+                "index": merged_index,
+                "kept_id": match,
+                "description": merged.get("description", ""),
+                "similarity": round(similarity, 3)
+            })
+
+        self.seen += len(test_cases)
+        return result
+
+    def report(self, limit: Optional[int] = None) -> Dict[str, Any]:
+        """去重统计和合并记录，按保留用例分组"""
+        groups: Dict[int, List[Dict[str, Any]]] = {}
+        for merge in self.merges:
+            groups.setdefault(merge["kept_id"], []).append(
+                {key: merge[key] for key in ("index", "description", "similarity")})
+        items = [{"kept": self._kept[kept_id].get("description", ""), "kept_index": self._kept_index[kept_id],
+                  "merged": merged}
+                 for kept_id, merged in groups.items()]
+        return {
+            "input": self.seen,
+            "kept": self.seen - len(self.merges),
+            "merged": len(self.merges),
+            "threshold": self.threshold,
+            "groups": items[:limit] if limit else items
+        }
@@ -1,49 +1,360 @@
 from pathlib import Path
 import re
+import os
+import json
+import hashlib
 import PyPDF2
-import openpyxl
-from typing import List, Dict, Any, Optional
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Any, Optional, Tuple, Iterator
+from parse_cache import ParseCache, PARSER_VERSION
+from signal_table import SignalTable
+from xlsx_stream import iter_sheet_rows, sheet_names, active_sheet_name
+from taxonomy import load_taxonomy
+from spec_tokenizer import SpecToken, split_sections, tokenize
+from profiler import profiled
 
 '''
 定义了 DocumentParser 类，用于解析功能规范 PDF 文件和 CAN 信号矩阵 Excel 文件。
 它可以从 PDF 文件中提取结构化的功能需求，
 从 Excel 文件中提取 CAN 信号信息，并将这些信息合并返回。
+章节、功能需求和信号定义的识别基于 spec_tokenizer 的单遍分词结果。
 '''
 
+
+def _extract_pages(pdf_path: str, page_numbers: List[int]) -> List[Tuple[Optional[str], Optional[str]]]:
+    """提取指定页的文本，返回与 page_numbers 一一对应的 (页面文本, 异常信息) 列表
+
+    作为进程池任务时每个进程独立打开PDF文件，因此必须定义在模块级别。
+    """
+    results = []
+    with open(pdf_path, 'rb') as f:
+        reader = PyPDF2.PdfReader(f)
+        for page_no in page_numbers:
+            try:
+                results.append((reader.pages[page_no].extract_text(), None))
+            except Exception as e:
+                results.append((None, str(e)))
+    return results
+
+
+def _hash_pdf_object(digest, obj, seen: set) -> None:
+    """将 PDF 对象的完整内容写入哈希：字典按键排序递归，流对象写入原始数据，间接引用只展开一次"""
+    if isinstance(obj, PyPDF2.generic.IndirectObject):
+        key = (obj.idnum, obj.generation)
+        digest.update(f"R{key}".encode("utf-8"))
+        if key in seen:
+            return
+        seen.add(key)
+        obj = obj.get_object()
+    if isinstance(obj, PyPDF2.generic.DictionaryObject):
+        if isinstance(obj, PyPDF2.generic.StreamObject):
+            digest.update(obj.get_data())
+        digest.update(b"<<")
+        for key in sorted(obj.keys()):
+            digest.update(str(key).encode("utf-8"))
+            _hash_pdf_object(digest, obj.raw_get(key), seen)
+        digest.update(b">>")
+    elif isinstance(obj, PyPDF2.generic.ArrayObject):
+        digest.update(b"[")
+        for item in obj:
+            _hash_pdf_object(digest, item, seen)
+        digest.update(b"]")
+    else:
+        digest.update(repr(obj).encode("utf-8"))
+
+
+def _page_fingerprint(page) -> str:
+    """计算页面指纹：页面内容流、所引用字体（含 ToUnicode 映射、编码和字形宽度）和表单 XObject 的哈希
+
+    字体对象决定了提取出的文字，只比较字体名称时替换 ToUnicode 映射的修订版会被误判为未变化。
+    图片 XObject 不影响提取文本，不参与哈希。
+    """
+    digest = hashlib.sha256()
+    contents = page.get_contents()
+    if contents is not None:
+        digest.update(contents.get_data())
+    resources = page.get("/Resources")
+    resources = resources.get_object() if resources is not None else {}
+    seen = set()
+    fonts = resources.get("/Font")
+    if fonts is not None:
+        _hash_pdf_object(digest, fonts, seen)
+    xobjects = resources.get("/XObject")
+    if xobjects is not None:
+        xobjects = xobjects.get_object()
+        for name in sorted(xobjects.keys()):
+            xobject = xobjects[name].get_object()
+            if xobject.get("/Subtype") == "/Form":
+                digest.update(str(name).encode("utf-8"))
+                _hash_pdf_object(digest, xobjects.raw_get(name), seen)
+    return digest.hexdigest()
+
+
+# 映射常见表头变体到标准字段（同一字段的变体按优先级排列）
+HEADER_MAPPING = {
+    "信号名称": ["信号名称", "Signal Name", "信号"],
+    "消息名称": ["消息名称", "Message Name", "报文名称", "Msg Name", "消息"],
+    "起始位": ["起始位", "Start Bit", "位起始"],
+    "位长度": ["位长度", "Bit Length", "信号长度", "长度"],
+    "比例因子": ["比例因子", "Factor", "缩放因子", "Resolution", "精度"],
+    "偏置": ["偏置", "Offset", "偏移"],
+    "单位": ["单位", "Unit"],
+    "最小值": ["最小值", "Min Value", "Min. Value"],
+    "最大值": ["最大值", "Max Value", "Max. Value"],
+    "字节序": ["排列格式", "Byte Order", "字节序"]
+}
+# 信号表标准字段对应的表头名称，用于提示不同信号矩阵文件之间的定义冲突
+STANDARD_FIELD_NAMES = {
+    "message_name": "消息名称", "start_bit": "起始位", "bit_length": "位长度", "factor": "比例因子",
+    "offset": "偏置", "unit": "单位", "value_range": "取值范围"
+}
+# 未识别到表头时使用的默认列序号
+DEFAULT_COLUMNS = {
+    "信号名称": 0, "消息名称": 1, "起始位": 2, "位长度": 3, "比例因子": 4,
+    "偏置": 5, "单位": 6, "最小值": 7, "最大值": 8, "字节序": None
+}
+
+
+# DBC 报文与信号定义
+DBC_MESSAGE_PATTERN = re.compile(r'^BO_\s+(\d+)\s+(\w+)\s*:\s*(\d+)\s+(\w+)')
+DBC_SIGNAL_PATTERN = re.compile(
+    r'^SG_\s+(\w+)\s*(M|m\d+M?)?\s*:\s*(\d+)\|(\d+)@([01])([+-])\s*'
+    r'\(\s*([^,]+?)\s*,\s*([^)]+?)\s*\)\s*\[\s*([^|]*?)\s*\|\s*([^\]]*?)\s*\]\s*"([^"]*)"\s*(.*)$'
+)
+DBC_VALUE_PATTERN = re.compile(r'(-?\d+)\s+"((?:[^"\\]|\\.)*)"')
+DBC_VALUE_HEADER_PATTERN = re.compile(r'^VAL_\s+(\d+)\s+(\w+)\s+(.*?);?\s*$', re.S)
+
+
+def _dbc_number(text: str) -> Any:
+    """解析DBC中的数值，整数保持为 int"""
+    text = text.strip()
+    try:
+        return int(text)
+    except ValueError:
+        pass
+    try:
+        return float(text)
+    except ValueError:
+        return text or None
+
+
+def _detect_columns(header_row: Tuple[Any, ...]) -> Dict[str, Optional[int]]:
+    """根据表头行确定每个标准字段的列序号，每个工作表只需执行一次"""
+    headers = ["" if cell is None else str(cell).lower() for cell in header_row]
+    columns = {}
+    for std_field, alternatives in HEADER_MAPPING.items():
+        columns[std_field] = next(
+            (idx for alt in alternatives for idx, header in enumerate(headers) if alt.lower() in header),
+            None
+        )
+    return columns
+
+
+def _parse_sheet_rows(sheet_rows: Iterator[Tuple[Any, ...]],
+                      require_header: bool = False) -> Optional[List[Tuple[Any, ...]]]:
+    """解析工作表的数据行，返回按 HEADER_MAPPING 字段顺序排列的元组列表
+
+    sheet_rows 的第一行为表头。require_header 为 True 时，未识别到信号名称列的
+    工作表（如封面、修订记录）返回 None。
+    """
+    header_row = next(sheet_rows, None)
+    if header_row is None:
+        return None if require_header else []
+    detected = _detect_columns(header_row)
+    if require_header and detected["信号名称"] is None:
+        return None
+    columns = [detected[field] if detected[field] is not None else DEFAULT_COLUMNS[field]
+               for field in HEADER_MAPPING]
+    name_column = columns[0]
+
+    rows = []
+    for row in sheet_rows:
+        if not row or all(cell is None for cell in row):
+            continue
+        signal_name = row[name_column] if name_column < len(row) else None
+        if not signal_name or not isinstance(signal_name, str):
+            continue
+        rows.append(tuple(row[col] if col is not None and col < len(row) else None for col in columns))
+    return rows
+
+
+def _parse_sheet(excel_path: str, sheet_name: str) -> Optional[List[Tuple[Any, ...]]]:
+    """流式读取并解析单个工作表，作为进程池任务使用"""
+    return _parse_sheet_rows(iter_sheet_rows(Path(excel_path), sheet_name), require_header=True)
+
+
+def _restore_value_tables(signals: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """JSON 缓存中值表的原始值键被存为字符串，读取时恢复为整数，与直接解析的结果一致"""
+    for info in signals.values():
+        value_table = info.get("value_table")
+        if value_table:
+            info["value_table"] = {int(raw): label for raw, label in value_table.items()}
+    return signals
+
+
+def _print_signal_conflicts(conflicts: List[Dict[str, Any]]) -> None:
+    if conflicts:
+        print(f"⚠️ 发现 {len(conflicts)} 处同名信号定义冲突（以先出现的定义为准）:")
+        for conflict in conflicts[:10]:
+            print(f"  - {conflict['signal']}: {conflict['first_source']} 与 {conflict['conflict_source']} "
+                  f"的 {', '.join(conflict['fields'])} 不一致")
+
+
+def _append_signal_row(signals: SignalTable, row: Tuple[Any, ...]) -> None:
+    name, message_name, start_bit, bit_length, factor, offset, unit, min_value, max_value, byte_order = row
+    signals.append_row(name, message_name, start_bit, bit_length, factor, offset, unit,
+                       min_value, max_value, {"byte_order": byte_order} if byte_order else None)
+
+
+# 标题含这些关键词的章节视为功能需求章节
+REQUIREMENT_SECTION_KEYWORDS = ["功能", "需求", "工作条件", "要求", "规范", "specification"]
+# 章节标题开头的阿拉伯数字编号
+SECTION_NUMBER_PATTERN = re.compile(r'(\d+(?:\.\d+)*)')
+
+
+class _FunctionCollector:
+    """按分词结果累积功能需求：需求编号行开始新需求，后续行追加到描述，章节标题或 close 时结束当前需求
+
+    章节标题行本身不是需求，但多级编号的行同时作为需求；"1." 这类只有序号的编号前加上所在章节的编号（如 "4.功能定义" 下为 "4.1"），
+    不同章节的条款编号不会互相覆盖。需求类型在 close 时才分类，未被采用的收集结果不做分类。
+    """
+
+    def __init__(self, classify):
+        self.classify = classify
+        self.functions: List[Dict[str, Any]] = []
+        self._current: Optional[Dict[str, Any]] = None
+        self._lines: List[str] = []
+        self._section_number: Optional[str] = None
+
+    def feed(self, token: SpecToken) -> None:
+        if token.section is not None:
+            self._flush()
+            number = SECTION_NUMBER_PATTERN.match(token.section)
+            self._section_number = number.group(1) if number else None
+        # 多级编号的短行（如 "1.1 倒车灯点亮"）既可能是小节标题也可能是需求条款，两者都记录
+        if token.requirement is not None and (token.section is None or "." in token.requirement[0]):
+            self._flush()
+            requirement_id, first_line = token.requirement
+            if requirement_id.isdigit() and self._section_number:
+                requirement_id = f"{self._section_number}.{requirement_id}"
+            self._current = {"id": requirement_id, "start": token.start, "end": token.end}
+            self._lines = [first_line]
+        elif self._current is not None:
+            self._lines.append(token.text)
+            self._current["end"] = token.end
+
+    def _flush(self) -> None:
+        if self._current is not None:
+            self.functions.append({
+                "id": self._current["id"],
+                "description": "\n".join(self._lines),
+                "type": None,
+                "start": self._current["start"],
+                "end": self._current["end"]
+            })
+        self._current = None
+        self._lines = []
+
+    def close(self) -> List[Dict[str, Any]]:
+        """结束当前需求（如章节结束），返回已收集的全部需求"""
+        self._flush()
+        return self.functions
+
+    def classified(self) -> List[Dict[str, Any]]:
+        """结束当前需求并为尚未分类的需求确定类型"""
+        for function in self.close():
+            if function["type"] is None:
+                function["type"] = self.classify(function["description"])
+        return self.functions
+
+
+def extract_requirements(requirements: List[Dict[str, Any]], classify) -> List[Dict[str, Any]]:
+    """从 parse_pdf 返回的原始文本中提取带编号的功能需求，返回 [{"id", "description", "type", "start", "end"}]
+
+    classify 为需求描述到功能类型的映射（如 Taxonomy.classify_function）。
+    优先提取标题含功能/需求关键词的章节；没有这类章节时对全文提取。同一编号只保留第一次出现。
+    章节和需求在一次分词中同时识别，start / end 为需求在拼接文本中的字符位置。
+    """
+    def pieces():
+        for index, item in enumerate(requirements):
+            if index:
+                yield "\n"
+            yield item.get("content", "")
+
+    sectioned = _FunctionCollector(classify)
+    whole = _FunctionCollector(classify)
+    in_keyword_section = False
+    for token in tokenize(pieces(), kinds=("section", "requirement")):
+        if token.section is not None:
+            sectioned.close()
+            in_keyword_section = any(kw in token.section for kw in REQUIREMENT_SECTION_KEYWORDS)
+        if in_keyword_section:
+            sectioned.feed(token)
+        whole.feed(token)
+    functions = sectioned.classified() if sectioned.close() else whole.classified()
+
+    unique = {}
+    for function in functions:
+        unique.setdefault(function["id"], function)
+    return list(unique.values())
+
+
 class DocumentParser:
     def __init__(self, config):
         self.config = config
         self.signal_cache = {}
+        self.signal_conflicts: List[Dict[str, Any]] = []
+        self.signal_sources: Dict[str, str] = {}  # 合并信号表中每个信号定义的来源（工作簿/工作表或DBC文件名）
+        self.parse_cache = ParseCache(config.PARSE_CACHE_DIR) if config.PARSE_CACHE_ENABLED else None
+        self.taxonomy = load_taxonomy(config.TAXONOMY_PATH)
         
-    def parse_pdf(self, pdf_path: Optional[Path] = None) -> List[Dict[str, Any]]:
-        """解析功能规范PDF文件，返回原始文本内容"""
+    @profiled()
+    def parse_pdf(self, pdf_path: Optional[Path] = None,
+                  workers: Optional[int] = None) -> List[Dict[str, Any]]:
+        """解析功能规范PDF文件，返回原始文本内容
+
+        workers 大于1时按页范围切分到多个进程并行提取，结果按页序拼接，
+        与串行提取的输出完全一致。默认取 config.PDF_WORKERS。
+        """
         pdf_path = pdf_path or self.config.INPUTS_DIR / "功能规范-第七章.pdf"
         if not pdf_path.exists():
             raise FileNotFoundError(f"PDF文件不存在: {pdf_path}")
-            
+
+        # 输入文件内容未变化时直接返回缓存结果
+        cache_key = self.parse_cache.key("pdf", pdf_path) if self.parse_cache else None
+        if cache_key:
+            cached = self.parse_cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        workers = workers if workers is not None else self.config.PDF_WORKERS
         with open(pdf_path, 'rb') as f:
-            reader = PyPDF2.PdfReader(f)
-            # 提取全部文本内容
-            text = ""
-            for page in reader.pages:
-                try:
-                    page_text = page.extract_text()
-                    if page_text:
-                        text += page_text + "\n"
-                except Exception as e:
-                    print(f"⚠️ 页面解析异常: {str(e)}")
-                    continue
+            page_count = len(PyPDF2.PdfReader(f).pages)
+
+        if workers and workers > 1 and page_count > 1:
+            page_results = self._extract_pages_parallel(pdf_path, list(range(page_count)), workers)
+        else:
+            page_results = _extract_pages(str(pdf_path), list(range(page_count)))
+
+        # 提取全部文本内容（按页序输出异常信息，与串行路径保持一致）
+        for _, error in page_results:
+            if error is not None:
+                print(f"⚠️ 页面解析异常: {error}")
+        text = self._join_page_texts(page_results)
         
         # 返回包含原始文本的字典列表
-        return [{
+        result = [{
             "id": "raw_text",
             "description": "PDF原始文本内容",
             "content": text,
             "type": "RawText"
         }]
+        if cache_key:
+            self.parse_cache.put(cache_key, result)
+        return result
         
         # 增强章节分割逻辑
-        sections = self._extract_sections(text)
+        sections = split_sections(text)
         
         # 增强功能需求提取
         requirements = []
@@ -60,210 +371,377 @@ class DocumentParser:
                 
         return requirements
     
-    def parse_excel(self, excel_path: Optional[Path] = None) -> Dict[str, Dict[str, Any]]:
-        """解析CAN信号矩阵Excel文件，返回信号字典"""
+    def parse_pdf_incremental(self, pdf_path: Optional[Path] = None, doc_id: Optional[str] = None,
+                              workers: Optional[int] = None) -> Dict[str, Any]:
+        """增量解析修订版PDF，仅重新提取指纹变化的页面
+
+        每页的指纹与提取文本保存在缓存目录的页面清单中（按 doc_id 区分文档，
+        默认取文件名）。新版本到来时只提取变化页，再对拼接后的全文重新分章，
+        并与上一版本的章节哈希比较，返回变化的章节集合。
+        返回字典包含：
+        - requirements: 与 parse_pdf 相同结构的原始文本列表
+        - changed_pages: 重新提取的页码（从0开始）
+        - changed_sections: 新增或内容变化的章节
+        - removed_sections: 已删除章节的标题
+        - manifest: 本版本的页面清单，由调用方在变化章节处理完成（如测试用例已保存）后交给
+          save_page_manifest 写入；处理失败时不写入，下次运行仍会得到同样的变化章节
+        """
+        pdf_path = pdf_path or self.config.INPUTS_DIR / "功能规范-第七章.pdf"
+        if not pdf_path.exists():
+            raise FileNotFoundError(f"PDF文件不存在: {pdf_path}")
+        doc_id = doc_id or pdf_path.stem
+        workers = workers if workers is not None else self.config.PDF_WORKERS
+
+        self.config.PARSE_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        manifest_path = self.config.PARSE_CACHE_DIR / f"pages-{doc_id}.json"
+        manifest = {}
+        if manifest_path.exists():
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        if manifest.get("parser_version") != PARSER_VERSION:
+            manifest = {}
+        old_pages = manifest.get("pages", [])
+
+        with open(pdf_path, 'rb') as f:
+            fingerprints = [_page_fingerprint(page) for page in PyPDF2.PdfReader(f).pages]
+
+        changed_pages = [
+            page_no for page_no, fingerprint in enumerate(fingerprints)
+            if page_no >= len(old_pages) or old_pages[page_no]["fingerprint"] != fingerprint
+        ]
+        if workers and workers > 1 and len(changed_pages) > 1:
+            extracted = self._extract_pages_parallel(pdf_path, changed_pages, workers)
+        else:
+            extracted = _extract_pages(str(pdf_path), changed_pages)
+
+        page_results = [(page["text"], page["error"]) for page in old_pages[:len(fingerprints)]]
+        page_results.extend([(None, None)] * (len(fingerprints) - len(page_results)))
+        for page_no, (page_text, error) in zip(changed_pages, extracted):
+            if error is not None:
+                print(f"⚠️ 页面解析异常: {error}")
+            page_results[page_no] = (page_text, error)
+        text = self._join_page_texts(page_results)
+
+        # 按章节内容哈希比较新旧版本（同名章节按出现顺序区分）
+        old_hashes = manifest.get("sections", {})
+        new_hashes = {}
+        changed_sections = []
+        for key, section in self._keyed_sections(text):
+            content_hash = hashlib.sha256(section["content"].encode("utf-8")).hexdigest()
+            new_hashes[key] = content_hash
+            if old_hashes.get(key) != content_hash:
+                changed_sections.append(section)
+        removed_sections = [key.rsplit("#", 1)[0] for key in old_hashes if key not in new_hashes]
+
+        manifest = {
+            "parser_version": PARSER_VERSION,
+            "pages": [
+                {"fingerprint": fingerprint, "text": page_text, "error": error}
+                for fingerprint, (page_text, error) in zip(fingerprints, page_results)
+            ],
+            "sections": new_hashes,
+            "path": str(manifest_path)
+        }
+
+        return {
+            "requirements": [{
+                "id": "raw_text",
+                "description": "PDF原始文本内容",
+                "content": text,
+                "type": "RawText"
+            }],
+            "changed_pages": changed_pages,
+            "changed_sections": changed_sections,
+            "removed_sections": removed_sections,
+            "manifest": manifest
+        }
+
+    def save_page_manifest(self, manifest: Dict[str, Any]) -> None:
+        """写入 parse_pdf_incremental 返回的页面清单，此后该版本的章节不再视为变化"""
+        manifest = dict(manifest)
+        manifest_path = Path(manifest.pop("path"))
+        manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = manifest_path.with_name(manifest_path.name + ".tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False)
+        os.replace(tmp_path, manifest_path)
+
+    def _keyed_sections(self, text: str) -> List[Tuple[str, Dict[str, str]]]:
+        """为章节生成稳定的比较键：标题#同名序号"""
+        seen = {}
+        keyed = []
+        for section in split_sections(text):
+            occurrence = seen.get(section["title"], 0)
+            seen[section["title"]] = occurrence + 1
+            keyed.append((f"{section['title']}#{occurrence}", section))
+        return keyed
+
+    def _join_page_texts(self, page_results: List[Tuple[Optional[str], Optional[str]]]) -> str:
+        """按页序拼接页面文本，跳过解析失败和空白页"""
+        return "".join(page_text + "\n" for page_text, error in page_results
+                       if error is None and page_text)
+
+    def _extract_pages_parallel(self, pdf_path: Path, page_numbers: List[int],
+                                workers: int) -> List[Tuple[Optional[str], Optional[str]]]:
+        """将页列表切分给多个进程提取，按页序合并结果"""
+        workers = min(workers, len(page_numbers))
+        step = -(-len(page_numbers) // workers)  # 向上取整
+        batches = [page_numbers[start:start + step] for start in range(0, len(page_numbers), step)]
+
+        page_results = []
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(_extract_pages, str(pdf_path), batch) for batch in batches]
+            for future in futures:
+                page_results.extend(future.result())
+        return page_results
+
+    @profiled()
+    def parse_excel(self, excel_path: Optional[Path] = None) -> SignalTable:
+        """解析CAN信号矩阵Excel文件，返回信号表（支持字典式读取）"""
         excel_path = excel_path or self.config.INPUTS_DIR / "CAN信号矩阵-第七章.xlsx"
         if not excel_path.exists():
             raise FileNotFoundError(f"Excel文件不存在: {excel_path}")
+
+        cache_key = self.parse_cache.key("excel", excel_path) if self.parse_cache else None
+        cached = self.parse_cache.get(cache_key) if cache_key else None
+        if cached is not None:
+            signals = SignalTable(cached)
+            signals.update(self.signal_cache)
+            return signals
             
-        wb = openpyxl.load_workbook(excel_path, read_only=True)
-        ws = wb.active
-        
-        signals = {}
-        
-        # 获取表头行
-        header_row = next(ws.iter_rows(min_row=1, max_row=1, values_only=True))
-        headers = [str(cell) for cell in header_row if cell is not None]
-        
-        # 映射常见表头变体到标准字段
-        header_mapping = {
-            "信号名称": ["信号名称", "Signal Name", "信号"],
-            "消息名称": ["消息名称", "Message Name", "消息"],
-            "起始位": ["起始位", "Start Bit", "位起始"],
-            "位长度": ["位长度", "Bit Length", "长度"],
-            "比例因子": ["比例因子", "Factor", "缩放因子"],
-            "偏置": ["偏置", "Offset", "偏移"],
-            "单位": ["单位", "Unit"],
-            "最小值": ["最小值", "Min Value", "最小值"],
-            "最大值": ["最大值", "Max Value", "最大值"]
-        }
-        
-        # 查找每个标准字段对应的列索引
-        header_indices = {}
-        for std_field, alternatives in header_mapping.items():
-            for idx, header in enumerate(headers):
-                if any(alt.lower() in header.lower() for alt in alternatives):
-                    header_indices[std_field] = idx
-                    break
-        
-        # 解析数据行
-        for row_idx, row in enumerate(ws.iter_rows(min_row=2, values_only=True), start=2):
-            if not row or all(cell is None for cell in row):
-                continue
-                
-            signal_name = row[header_indices.get("信号名称", 0)]
-            if not signal_name or not isinstance(signal_name, str):
-                continue
-                
-            signal_info = {
-                "message_name": row[header_indices.get("消息名称", 1)],
-                "start_bit": row[header_indices.get("起始位", 2)],
-                "bit_length": row[header_indices.get("位长度", 3)],
-                "factor": row[header_indices.get("比例因子", 4)],
-                "offset": row[header_indices.get("偏置", 5)],
-                "unit": row[header_indices.get("单位", 6)],
-                "value_range": f"{row[header_indices.get('最小值', 7)]}~{row[header_indices.get('最大值', 8)]}"
-            }
-            signals[signal_name] = signal_info
+        signals = SignalTable()
+        for row in _parse_sheet_rows(iter_sheet_rows(excel_path, active_sheet_name(excel_path))):
+            _append_signal_row(signals, row)
+
+        if cache_key:
+            self.parse_cache.put(cache_key, signals.to_dict())
             
         # 合并PDF中提取的信号信息
         signals.update(self.signal_cache)
         return signals
     
-    def _extract_sections(self, text: str) -> List[Dict[str, str]]:
-        """将文本按章节分割"""
-        # 匹配章节标题的模式
-        section_patterns = [
-            re.compile(r'第(\d+)\s*章\s*([^\n]+)'),  # 标准章节格式
-            re.compile(r'(\d+)\s*、\s*([^\n]+)'),   # 数字加顿号格式
-            re.compile(r'(\d+)\s*\.(\d+)\s*([^\n]+)'),  # 数字加小数点格式
-        ]
-        
-        sections = []
-        current_title = None
-        current_content = []
-        
-        for line in text.split('\n'):
-            line = line.strip()
-            if not line:
+    def parse_excel_workbooks(self, excel_paths: List[Path],
+                              workers: Optional[int] = None) -> SignalTable:
+        """解析多个CAN信号矩阵工作簿的全部工作表并合并为一个信号表
+
+        每个工作表作为独立任务在进程池中以只读方式流式解析，未识别到信号名称列的
+        工作表会被跳过。同名信号以先出现的定义为准，定义不一致时记录到
+        self.signal_conflicts 并输出提示。默认进程数取 config.EXCEL_WORKERS。
+        """
+        workers = workers if workers is not None else self.config.EXCEL_WORKERS
+        sheet_rows: Dict[Path, List[Tuple[str, Optional[List[Tuple[Any, ...]]]]]] = {}
+        cache_keys = {}
+        tasks = []
+        for excel_path in excel_paths:
+            excel_path = Path(excel_path)
+            if not excel_path.exists():
+                raise FileNotFoundError(f"Excel文件不存在: {excel_path}")
+            cache_key = self.parse_cache.key("excel-sheets", excel_path) if self.parse_cache else None
+            cached = self.parse_cache.get(cache_key) if cache_key else None
+            if cached is not None:
+                sheet_rows[excel_path] = [(sheet, rows and [tuple(row) for row in rows])
+                                          for sheet, rows in cached]
                 continue
-                
-            # 检查是否为新章节
-            section_match = None
-            for pattern in section_patterns:
-                match = pattern.search(line)
-                if match:
-                    section_match = match
-                    break
-                    
-            if section_match:
-                if current_title:
-                    sections.append({
-                        "title": current_title,
-                        "content": "\n".join(current_content)
+            cache_keys[excel_path] = cache_key
+            tasks.extend((excel_path, sheet_name) for sheet_name in sheet_names(excel_path))
+
+        if workers and workers > 1 and len(tasks) > 1:
+            with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as executor:
+                futures = [executor.submit(_parse_sheet, str(path), sheet) for path, sheet in tasks]
+                results = [future.result() for future in futures]
+        else:
+            results = [_parse_sheet(str(path), sheet) for path, sheet in tasks]
+        for (excel_path, sheet_name), rows in zip(tasks, results):
+            sheet_rows.setdefault(excel_path, []).append((sheet_name, rows))
+        for excel_path, cache_key in cache_keys.items():
+            if cache_key:
+                self.parse_cache.put(cache_key, sheet_rows.get(excel_path, []))
+
+        # 按工作簿、工作表顺序合并，检测同名信号的定义冲突
+        signals = SignalTable()
+        sources: Dict[str, Tuple[str, Tuple[Any, ...]]] = {}
+        self.signal_conflicts = []
+        sheet_count = 0
+        for excel_path in map(Path, excel_paths):
+            for sheet_name, rows in sheet_rows.get(excel_path, []):
+                if rows is None:
+                    print(f"ℹ️ 跳过未识别到信号表头的工作表: {excel_path.name}/{sheet_name}")
+                    continue
+                sheet_count += 1
+                source = f"{excel_path.name}/{sheet_name}"
+                for row in rows:
+                    existing = sources.get(row[0])
+                    if existing is None:
+                        sources[row[0]] = (source, row)
+                        _append_signal_row(signals, row)
+                    elif existing[1] != row:
+                        fields = [field for field, old, new in zip(HEADER_MAPPING, existing[1], row) if old != new]
+                        self.signal_conflicts.append({
+                            "signal": row[0],
+                            "first_source": existing[0],
+                            "conflict_source": source,
+                            "fields": fields
+                        })
+
+        self.signal_sources = {name: source for name, (source, _) in sources.items()}
+        print(f"📚 已解析 {len(excel_paths)} 个工作簿、{sheet_count} 个工作表，合并 {len(signals)} 个信号")
+        _print_signal_conflicts(self.signal_conflicts)
+
+        signals.update(self.signal_cache)
+        return signals
+
+    def parse_dbc(self, dbc_path: Path) -> SignalTable:
+        """解析DBC网络定义文件，返回与 parse_excel 结构一致的信号表
+
+        按行流式解析 BO_ / SG_ / VAL_ 语句，除标准字段外还保留字节序（intel / motorola）、
+        有无符号、报文ID、报文长度、发送/接收节点和信号值表。
+        跨行的注释和值表语句会合并到分号结束后再处理。
+        """
+        dbc_path = Path(dbc_path)
+        if not dbc_path.exists():
+            raise FileNotFoundError(f"DBC文件不存在: {dbc_path}")
+
+        cache_key = self.parse_cache.key("dbc", dbc_path) if self.parse_cache else None
+        cached = self.parse_cache.get(cache_key) if cache_key else None
+        if cached is not None:
+            signals = SignalTable(_restore_value_tables(cached))
+            signals.update(self.signal_cache)
+            return signals
+
+        rows: Dict[str, Tuple[Any, ...]] = {}
+        extras: Dict[str, Dict[str, Any]] = {}
+        signal_keys: Dict[Tuple[int, str], str] = {}
+        message = None
+        pending = ""
+        with open(dbc_path, 'r', encoding=self.config.DBC_ENCODING, errors='replace') as f:
+            for line in f:
+                if pending:
+                    # 跨行语句：累积到引号闭合且以分号结束
+                    pending += line
+                    if pending.count('"') % 2 or not pending.rstrip().endswith(";"):
+                        continue
+                    statement, pending = pending, ""
+                else:
+                    statement = line.strip()
+                    # NS_ 段中单独一行的 CM_ / VAL_ 只是关键字声明，不是语句
+                    if statement.startswith(("CM_ ", "VAL_ ")) and (
+                            statement.count('"') % 2 or not statement.endswith(";")):
+                        pending = line
+                        continue
+
+                if statement.startswith("BO_ "):
+                    match = DBC_MESSAGE_PATTERN.match(statement)
+                    message = match.groups() if match else None
+                elif statement.startswith("SG_ ") and message:
+                    match = DBC_SIGNAL_PATTERN.match(statement)
+                    if not match:
+                        continue
+                    (name, multiplex, start_bit, bit_length, byte_order, sign,
+                     factor, offset, minimum, maximum, unit, receivers) = match.groups()
+                    message_id, message_name, dlc, sender = message
+                    if name in rows:
+                        self.signal_conflicts.append({
+                            "signal": name,
+                            "first_source": rows[name][0],
+                            "conflict_source": message_name,
+                            "fields": ["消息名称"]
+                        })
+                        continue
+                    rows[name] = (message_name, int(start_bit), int(bit_length), _dbc_number(factor),
+                                  _dbc_number(offset), unit or None, _dbc_number(minimum), _dbc_number(maximum))
+                    raw_id = int(message_id)
+                    extras[name] = {
+                        "byte_order": "intel" if byte_order == "1" else "motorola",
+                        "is_signed": sign == "-",
+                        "message_id": hex(raw_id & 0x1FFFFFFF),
+                        "extended_id": bool(raw_id & 0x80000000),
+                        "dlc": int(dlc),
+                        "sender": sender,
+                        "receivers": [node.strip() for node in receivers.split(",") if node.strip()]
+                    }
+                    if multiplex:
+                        extras[name]["multiplex"] = multiplex
+                    signal_keys[(raw_id, name)] = name
+                elif statement.startswith("VAL_ "):
+                    match = DBC_VALUE_HEADER_PATTERN.match(statement.strip())
+                    if not match:
+                        continue
+                    name = signal_keys.get((int(match.group(1)), match.group(2)))
+                    if name:
+                        extras[name]["value_table"] = {
+                            int(raw): label for raw, label in DBC_VALUE_PATTERN.findall(match.group(3))
+                        }
+
+        signals = SignalTable()
+        for name, row in rows.items():
+            signals.append_row(name, *row, extra=extras[name])
+        if cache_key:
+            self.parse_cache.put(cache_key, signals.to_dict())
+        print(f"📡 DBC文件 {dbc_path.name} 解析出 {len(signals)} 个信号")
+
+        signals.update(self.signal_cache)
+        return signals
+
+    @profiled()
+    def parse_signal_matrices(self, matrix_paths: List[Path]) -> SignalTable:
+        """按文件类型解析多个信号矩阵（xlsx 工作簿与 DBC 文件）并合并，同名信号以先出现的为准
+
+        DBC 中与已合并信号同名且定义不一致的信号与工作簿之间的冲突一样记录到 self.signal_conflicts 并输出提示。
+        """
+        matrix_paths = [Path(path) for path in matrix_paths]
+        excel_paths = [path for path in matrix_paths if path.suffix.lower() != ".dbc"]
+        self.signal_conflicts = []
+        self.signal_sources = {}
+        merged = self.parse_excel_workbooks(excel_paths) if excel_paths else SignalTable()
+        reported = len(self.signal_conflicts)
+        for dbc_path in (path for path in matrix_paths if path.suffix.lower() == ".dbc"):
+            for name, info in self.parse_dbc(dbc_path).items():
+                if name not in merged:
+                    merged[name] = info
+                    self.signal_sources[name] = dbc_path.name
+                    continue
+                existing = merged[name]
+                fields = [label for field, label in STANDARD_FIELD_NAMES.items()
+                          if field in existing and field in info and existing[field] != info[field]]
+                if fields:
+                    self.signal_conflicts.append({
+                        "signal": name,
+                        "first_source": self.signal_sources.get(name, "信号矩阵"),
+                        "conflict_source": dbc_path.name,
+                        "fields": fields
                     })
-                current_title = section_match.group(0)
-                current_content = [line]
-            else:
-                current_content.append(line)
-                
-        # 添加最后一个章节
-        if current_title and current_content:
-            sections.append({
-                "title": current_title,
-                "content": "\n".join(current_content)
-            })
-            
-        return sections
-    
+        _print_signal_conflicts(self.signal_conflicts[reported:])
+        return merged
+
+    def extract_requirements(self, requirements: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """从 parse_pdf 返回的原始文本中提取带编号的功能需求，见模块函数 extract_requirements"""
+        return extract_requirements(requirements, self._classify_function)
+
     def _extract_functions(self, content: str) -> List[Dict[str, Any]]:
-        """从内容中提取功能需求"""
-        functions = []
-        
-        # 增强模式匹配
-        patterns = [
-            re.compile(r'(\d+\.\d+(?:\.\d+)*)\s*([^\n]+)'),  # 支持多级编号
-            re.compile(r'([A-Z]{2,3}_\d+)\s*([^\n]+)'),  # 支持类似"ECU_001"的编号
-            re.compile(r'(\d+)\s*、\s*([^\n]+)'),  
-            re.compile(r'([A-Z]\d+)\s*([^\n]+)'),
-            re.compile(r'(?:需求|功能)\s*[:：]\s*([^\n]+)')  # 支持"需求："开头的行
-        ]
-        
-        current_id = None
-        current_desc = []
-        
-        for line in content.split('\n'):
-            line = line.strip()
-            if not line:
-                continue
-                
-            # 检查是否为新功能
-            func_match = None
-            for pattern in patterns:
-                match = pattern.search(line)
-                if match:
-                    func_match = match
-                    break
-                    
-            if func_match:
-                if current_id:
-                    functions.append({
-                        "id": current_id,
-                        "description": "\n".join(current_desc),
-                        "type": self._classify_function("\n".join(current_desc))
-                    })
-                current_id = func_match.group(1)
-                current_desc = [func_match.group(2)] if len(func_match.groups()) > 1 else [line]
-            else:
-                current_desc.append(line)
-                
-        # 添加最后一个功能
-        if current_id and current_desc:
-            functions.append({
-                "id": current_id,
-                "description": "\n".join(current_desc),
-                "type": self._classify_function("\n".join(current_desc))
-            })
-            
-        return functions
+        """从内容中提取功能需求，start / end 为需求在 content 中的字符位置"""
+        collector = _FunctionCollector(self._classify_function)
+        for token in tokenize(content, kinds=("section", "requirement")):
+            collector.feed(token)
+        return collector.classified()
     
     def _extract_signals(self, content: str) -> Dict[str, Dict[str, Any]]:
         """从内容中提取信号信息"""
         signals = {}
-        
-        # 匹配信号定义的模式
-        signal_patterns = [
-            re.compile(r'([^\s]+)\s*信号\s*[:：]\s*([^\n]+)'),  # 信号名称:描述 格式
-            re.compile(r'信号\s*[:：]\s*([^\s]+)\s*([^\n]+)'),  # 信号:名称 描述 格式
-            re.compile(r'([^\s]+)\s*:\s*([^\n]+)'),  # 名称:描述 通用格式
-        ]
-        
-        for line in content.split('\n'):
-            line = line.strip()
-            if not line:
+        for token in tokenize(content, kinds=("signal",)):
+            if token.signal is None:
                 continue
+            signal_name, signal_desc = token.signal
+            
+            # 提取信号属性
+            properties = {}
+            for prop in re.findall(r'([^，,:：]+)[:：]([^，,:：]+)', signal_desc):
+                key, value = prop
+                properties[key.strip()] = value.strip()
                 
-            # 尝试匹配信号定义
-            signal_match = None
-            for pattern in signal_patterns:
-                match = pattern.search(line)
-                if match:
-                    signal_match = match
-                    break
-                    
-            if signal_match:
-                signal_name = signal_match.group(1)
-                signal_desc = signal_match.group(2)
-                
-                # 提取信号属性
-                properties = {}
-                for prop in re.findall(r'([^，,:：]+)[:：]([^，,:：]+)', signal_desc):
-                    key, value = prop
-                    properties[key.strip()] = value.strip()
-                    
-                signals[signal_name] = properties
+            signals[signal_name] = properties
                 
         return signals
     
     def _classify_function(self, description: str) -> str:
-        """根据描述对功能进行分类"""
-        if "控制" in description or "调节" in description:
-            return "Control"
-        elif "监测" in description or "检测" in description:
-            return "Monitoring"
-        elif "保护" in description:
-            return "Protection"
-        elif "通信" in description:
-            return "Communication"
-        else:
-            return "Other"
\ No newline at end of file
+        """根据描述对功能进行分类，分类词表见 config.json 的 taxonomy.function_types"""
+        return self.taxonomy.classify_function(description)
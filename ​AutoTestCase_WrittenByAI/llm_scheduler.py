@@ -0,0 +1,223 @@
+import logging
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Tuple
+from openai import APIConnectionError, APIStatusError, APITimeoutError
+
+'''
+定义了调用大模型接口时使用的并发调度工具。
+RateLimiter 按每分钟请求数（RPM）限制请求发出的节奏，
+可在多个线程之间共享，保证并发调用不超过服务商的速率限制。
+RequestScheduler 在其基础上负责失败重试、Retry-After 等待和 AIMD 自适应并发。
+'''
+
+
+class RateLimiter:
+    def __init__(self, requests_per_minute: Optional[float]):
+        self.interval = 60.0 / requests_per_minute if requests_per_minute else 0.0
+        self._lock = threading.Lock()
+        self._next_time = 0.0
+
+    def acquire(self) -> None:
+        """阻塞直到可以发出下一个请求"""
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            wait = self._next_time - now
+            self._next_time = max(now, self._next_time) + self.interval
+        if wait > 0:
+            time.sleep(wait)
+
+
+# 可重试的 HTTP 状态码：请求超时、冲突、限流和服务端错误
+RETRY_STATUS_CODES = {408, 409, 429}
+
+
+def _retry_after(error: Exception) -> Optional[float]:
+    """读取响应头中的 Retry-After（秒数或 HTTP 日期）/ retry-after-ms，返回需等待的秒数"""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    value = headers.get("retry-after-ms")
+    if value:
+        try:
+            return float(value) / 1000
+        except ValueError:
+            pass
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+def _classify_error(error: Exception) -> Tuple[bool, bool]:
+    """返回 (是否可重试, 是否为限流响应)"""
+    if isinstance(error, APIConnectionError):  # 包含 APITimeoutError
+        return True, False
+    if isinstance(error, APIStatusError):
+        status = error.status_code
+        return status in RETRY_STATUS_CODES or status >= 500, status == 429
+    return False, False
+
+
+class RequestScheduler:
+    """大模型请求调度器：重试、退避和自适应并发
+
+    - 连接错误、超时、429 和 5xx 响应按带抖动的指数退避重试，响应带 Retry-After 时按其等待，
+      并在等待期间暂停所有新请求；
+    - 并发上限按 AIMD 调整：请求成功时每轮增加 1，遇到限流减半、请求超时降低 10%，
+      同一拥塞事件在 cooldown 内只降低一次；大模型响应延迟随输出长度变化，不作为拥塞信号；
+    - 每次尝试前经过 RateLimiter，重试同样计入每分钟请求数。
+    """
+
+    def __init__(self, rate_limiter: Optional[RateLimiter] = None, max_retries: int = 5,
+                 base_delay: float = 1.0, max_delay: float = 60.0,
+                 initial_concurrency: int = 4, max_concurrency: int = 16,
+                 adaptive: bool = True):
+        self.rate_limiter = rate_limiter
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.adaptive = adaptive
+        self.max_concurrency = max(1, max_concurrency if adaptive else initial_concurrency)
+        self.requests = 0
+        self.retries = 0
+        self.throttled = 0
+        self._limit = float(max(1, min(initial_concurrency, self.max_concurrency)))
+        self._active = 0
+        self._resume_at = 0.0
+        self._last_decrease = 0.0
+        self._latency_ewma: Optional[float] = None
+        self._cond = threading.Condition()
+
+    @property
+    def concurrency(self) -> int:
+        return max(1, int(self._limit))
+
+    def call(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """执行一次请求，失败时按策略重试，重试耗尽后抛出最后一次的异常"""
+        attempt = 0
+        while True:
+            self._acquire()
+            start = time.monotonic()
+            try:
+                result = func(*args, **kwargs)
+            except Exception as e:
+                self._release()
+                self._handle_error(e, attempt)
+                attempt += 1
+                continue
+            self._release(time.monotonic() - start)
+            return result
+
+    def stream(self, func: Callable[..., Iterable[Any]], *args, **kwargs) -> Iterator[Any]:
+        """执行一次流式请求并逐项产出，流式输出期间占用并发名额
+
+        只有在产出第一项之前失败才会重试，已产出内容后失败直接抛出；
+        延迟按首项到达时间统计。
+        """
+        attempt = 0
+        while True:
+            self._acquire()
+            start = time.monotonic()
+            latency = None
+            try:
+                for item in func(*args, **kwargs):
+                    if latency is None:
+                        latency = time.monotonic() - start
+                    yield item
+            except Exception as e:
+                self._release()
+                if latency is not None:
+                    raise
+                self._handle_error(e, attempt)
+                attempt += 1
+                continue
+            except BaseException:
+                # 调用方提前关闭生成器
+                self._release()
+                raise
+            self._release(latency if latency is not None else time.monotonic() - start)
+            return
+
+    def _acquire(self) -> None:
+        with self._cond:
+            while True:
+                wait = self._resume_at - time.monotonic()
+                if wait > 0:
+                    self._cond.wait(wait)
+                elif self._active < self.concurrency:
+                    break
+                else:
+                    self._cond.wait()
+            self._active += 1
+            self.requests += 1
+        if self.rate_limiter:
+            self.rate_limiter.acquire()
+
+    def _release(self, latency: Optional[float] = None) -> None:
+        """释放并发名额；latency 不为 None 表示请求成功，据此调整并发上限"""
+        with self._cond:
+            self._active -= 1
+            if latency is not None:
+                self._on_success(latency)
+            self._cond.notify_all()
+
+    def _on_success(self, latency: float) -> None:
+        self._latency_ewma = latency if self._latency_ewma is None else 0.8 * self._latency_ewma + 0.2 * latency
+        if self.adaptive:
+            # 加性增长：每完成约一轮（当前并发数个）请求，并发上限加 1
+            self._limit = min(float(self.max_concurrency), self._limit + 1.0 / self._limit)
+
+    def _decrease(self, factor: float) -> None:
+        now = time.monotonic()
+        cooldown = self._latency_ewma or 1.0
+        if now - self._last_decrease < cooldown:
+            return
+        self._limit = max(1.0, self._limit * factor)
+        self._last_decrease = now
+
+    def _handle_error(self, error: Exception, attempt: int) -> None:
+        """不可重试或重试耗尽时抛出异常，否则等待退避时间"""
+        retryable, throttled = _classify_error(error)
+        if not retryable or attempt >= self.max_retries:
+            raise error
+
+        retry_after = _retry_after(error)
+        delay = retry_after if retry_after is not None else \
+            random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+        delay = min(delay, self.max_delay)
+        with self._cond:
+            self.retries += 1
+            if throttled:
+                self.throttled += 1
+                if self.adaptive:
+                    self._decrease(0.5)
+            elif isinstance(error, APITimeoutError) and self.adaptive:
+                self._decrease(0.9)
+            if retry_after is not None:
+                self._resume_at = max(self._resume_at, time.monotonic() + delay)
+        logging.warning(f"请求失败（{type(error).__name__}），{delay:.1f} 秒后进行第 {attempt + 1} 次重试: {error}")
+        time.sleep(delay)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "requests": self.requests,
+                "retries": self.retries,
+                "throttled": self.throttled,
+                "concurrency": self.concurrency,
+                "latency": round(self._latency_ewma, 3) if self._latency_ewma is not None else None
+            }
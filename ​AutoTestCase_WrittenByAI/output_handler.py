@@ -1,163 +1,252 @@
 from pathlib import Path
+import os
 import openpyxl
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Alignment
+from openpyxl.worksheet.datavalidation import DataValidation
 from datetime import datetime
-from typing import List, Dict, Any, Optional
+from itertools import islice
+from typing import List, Dict, Any, Optional, Iterable, Tuple, Type
 import json
+from output_sinks import CaseSink, SINKS, format_precondition, format_input_signal
+from taxonomy import load_taxonomy
+from profiler import profiled
 
 '''
 定义了 OutputHandler 类，负责将生成的测试用例保存到 Excel 文件中。
 根据新的格式要求，将测试用例按照特定的层级结构输出到 Excel 中。
+写入基于只写工作表逐行流式进行，内存占用不随测试用例数量增长。
+同一次运行可按 OUTPUT_FORMATS 同时输出 Excel 与 JSONL / CSV / Parquet 等格式。
+测试用例的功能、特性和测试组由 config.json 中的 taxonomy 词表分类，每批测试用例只扫描一遍。
 '''
 
+CLASSIFY_BATCH = 256  # 保存时每批分类的测试用例数，流式输入时最多延迟这么多个测试用例写出
+
+# 表头与每行的列数保持不变：前 6 列有表头，数据行共 10 列
+HEADERS = [
+    "Object Type", "Name", "Short Description / Action",
+    "Expected Result", "input signal", "output signal"
+]
+ROW_WIDTH = 10
+WRAP_COLUMNS = (2, 4)  # C列 Short Description / Action、E列 input signal 自动换行
+OBJECT_TYPES = '"Function,Feature,Test Group,Test Case,Precondition,Test Step"'
+
+
+class ExcelCaseWriter(CaseSink):
+    """基于 openpyxl 只写工作表的流式 Excel 写入器
+
+    测试用例逐个写入，每行写出后即不再保留在内存中；换行样式在写入单元格时设置，
+    Object Type 列的数据验证在关闭时以单个区域 A2:A<末行> 添加。
+    可作为上下文管理器使用：
+
+        with ExcelCaseWriter(path) as writer:
+            for case in cases:
+                writer.write_case(case, handler.classify_case(case))
+    """
+    suffix = ".xlsx"
+
+    def __init__(self, output_path: Path):
+        super().__init__(output_path)
+        self._row_count = 0
+        self._added_functions = set()
+        self._added_features = set()
+        self._added_test_groups = set()
+
+        self._wb = openpyxl.Workbook(write_only=True)
+        self._ws = self._wb.create_sheet()
+        self._wrap_alignment = Alignment(wrap_text=True)
+        # 只写工作表的列宽必须在写入第一行之前设置
+        for col in 'ABCDEFGHIJ':
+            self._ws.column_dimensions[col].width = 30
+        self._append(HEADERS)
+
+    def _append(self, values: List[Any]) -> None:
+        row = []
+        for col, value in enumerate(values):
+            if col in WRAP_COLUMNS:
+                cell = WriteOnlyCell(self._ws, value=value)
+                cell.alignment = self._wrap_alignment
+                row.append(cell)
+            else:
+                row.append(value)
+        self._ws.append(row)
+        self._row_count += 1
+
+    def _append_object(self, object_type: str, name: str = "", action: str = "", expected: str = "",
+                       input_signal: str = "", output_signal: str = "") -> None:
+        values = [object_type, name, action, expected, input_signal, output_signal]
+        self._append(values + [""] * (ROW_WIDTH - len(values)))
+
+    def _write(self, case: Dict[str, Any], hierarchy: Tuple[str, str, str]) -> None:
+        """按 Function / Feature / Test Group / Test Case / Precondition / Test Step 层级写入一个测试用例"""
+        function_name, feature_name, test_group_name = hierarchy
+        test_case_name = case.get("description", "")
+
+        if function_name not in self._added_functions:
+            self._append_object("Function", function_name)
+            self._added_functions.add(function_name)
+
+        feature_key = (function_name, feature_name)
+        if feature_key not in self._added_features:
+            self._append_object("Feature", feature_name)
+            self._added_features.add(feature_key)
+
+        test_group_key = (feature_name, test_group_name)
+        if test_group_key not in self._added_test_groups:
+            self._append_object("Test Group", test_group_name)
+            self._added_test_groups.add(test_group_key)
+
+        self._append_object("Test Case", test_case_name)
+
+        precondition_str = format_precondition(case)
+        input_signal_str = format_input_signal(case)
+        self._append_object("Precondition", "", precondition_str, "", input_signal_str)
+
+        expected_results = ', '.join(case.get("expected", []))
+        output_signal = case.get("output_signal", "")
+        for step in case.get("steps", []):
+            self._append_object("Test Step", "", step, expected_results, input_signal_str, output_signal)
+
+    def close(self) -> None:
+        """添加数据验证区域并保存工作簿
+
+        先保存到同目录的临时文件再替换目标文件，保存中途失败不会留下损坏的工作簿或覆盖已有文件。
+        """
+        if self._wb is None:
+            return
+        if self._row_count > 1:
+            dv = DataValidation(type="list", formula1=OBJECT_TYPES)
+            dv.add(f"A2:A{self._row_count}")
+            self._ws.data_validations.append(dv)
+        tmp_path = self.output_path.with_name(self.output_path.name + ".tmp")
+        try:
+            self._wb.save(tmp_path)
+            os.replace(tmp_path, self.output_path)
+        finally:
+            self._wb = None
+            tmp_path.unlink(missing_ok=True)
+
+    def abort(self) -> None:
+        """丢弃未完成的工作簿，不写出目标文件
+
+        只写工作表的行数据保存在 openpyxl 的临时文件中，保存到临时路径后删除以清理这些文件。
+        """
+        if self._wb is None:
+            return
+        tmp_path = self.output_path.with_name(self.output_path.name + ".tmp")
+        try:
+            self._wb.save(tmp_path)
+        finally:
+            self._wb = None
+            tmp_path.unlink(missing_ok=True)
+
+
+# OUTPUT_FORMATS 可选择的全部格式
+SINK_CLASSES = {"xlsx": ExcelCaseWriter, **SINKS}
+
+
 class OutputHandler:
     def __init__(self, config):
         self.config = config
-        
-    def save_to_excel(self, test_cases: List[Dict[str, Any]], 
-                     output_path: Optional[Path] = None) -> Path:
-        """保存测试用例到Excel文件"""
-        if not test_cases:
-            print("❌ 没有测试用例可保存")
-            return None
-            
+        self.taxonomy = load_taxonomy(config.TAXONOMY_PATH)
+
+    def classify_case(self, case: Dict[str, Any]) -> Tuple[str, str, str]:
+        """返回测试用例所属的 (功能名称, 特性名称, 测试组名称)"""
+        return self.taxonomy.classify_case(case)
+
+    def classify_batches(self, test_cases: Iterable[Dict[str, Any]],
+                         batch_size: int = CLASSIFY_BATCH) -> Iterable[Tuple[Dict[str, Any], Tuple[str, str, str]]]:
+        """按批分类测试用例，逐个产出 (测试用例, 层级)；输入可以是列表或迭代器"""
+        iterator = iter(test_cases)
+        while True:
+            batch = list(islice(iterator, batch_size))
+            if not batch:
+                return
+            yield from zip(batch, self.taxonomy.classify_cases(batch))
+
+    def open_excel_writer(self, output_path: Optional[Path] = None) -> ExcelCaseWriter:
+        """打开流式 Excel 写入器，测试用例可在生成过程中逐个写入"""
         if not output_path:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             output_path = self.config.OUTPUTS_DIR / f"TestCases_{timestamp}.xlsx"
-            
-        wb = openpyxl.Workbook()
-        ws = wb.active
-        
-        # 表头
-        headers = [
-            "Object Type", "Name", "Short Description / Action", 
-            "Expected Result", "input signal", "output signal"
-        ]
-        ws.append(headers)
-        
-        # 设置数据验证
-        dv = openpyxl.worksheet.datavalidation.DataValidation(type="list", formula1='"Function,Feature,Test Group,Test Case,Precondition,Test Step"')
-        ws.add_data_validation(dv)
-
-        # 临时存储已添加的 Function、Feature 和 Test Group
-        added_functions = set()
-        added_features = set()
-        added_test_groups = set()
-
-        for case in test_cases:
-            function_name = self._extract_function_name(case.get("description", ""))
-            feature_name = self._extract_feature(case.get("coverage", []))
-            test_group_name = self._extract_test_group(case.get("coverage", []))
-            test_case_name = case.get("description", "")
-
-            # 添加 Function 行
-            if function_name not in added_functions:
-                ws.append(["Function", function_name, "", "", "", "", "", "", "", ""])
-                dv.add(f'A{ws.max_row}')
-                added_functions.add(function_name)
-
-            # 添加 Feature 行
-            feature_key = (function_name, feature_name)
-            if feature_key not in added_features:
-                ws.append(["Feature", feature_name, "", "", "", "", "", "", "", ""])
-                dv.add(f'A{ws.max_row}')
-                added_features.add(feature_key)
-
-            # 添加 Test Group 行
-            test_group_key = (feature_name, test_group_name)
-            if test_group_key not in added_test_groups:
-                ws.append(["Test Group", test_group_name, "", "", "", "", "", "", "", ""])
-                dv.add(f'A{ws.max_row}')
-                added_test_groups.add(test_group_key)
-
-            # 添加 Test Case 行
-            ws.append(["Test Case", test_case_name, "", "", "", "", "", "", "", ""])
-            dv.add(f'A{ws.max_row}')
-
-            # 添加 Precondition 行
-            preconditions = case.get("precondition", [])
-            precondition_str = ',\n'.join([f"{i + 1}. {p}" for i, p in enumerate(preconditions)])
-            input_signal_dict = case.get("input_signal", {})
-            input_signal_str = ',\n'.join([f"{key}={value}" for key, value in input_signal_dict.items()])
-            ws.append(["Precondition", "", precondition_str, "", input_signal_str, "", "", "", "", ""])
-            dv.add(f'A{ws.max_row}')
-
-            # 添加 Test Step 行
-            steps = case.get("steps", [])
-            expected_results = case.get("expected", [])
-            output_signal = case.get("output_signal", "")
-            for step in steps:
-                ws.append([
-                    "Test Step",
-                    "",
-                    step,
-                    ', '.join(expected_results),
-                    input_signal_str,
-                    output_signal,
-                    "",
-                    "",
-                    "",
-                    ""
-                ])
-                dv.add(f'A{ws.max_row}')
-
-        # 设置自动换行样式
-        from openpyxl.styles import Alignment
-        wrap_alignment = Alignment(wrap_text=True)
-        
-        # 为Short Description / Action列(C列)设置自动换行
-        for row in ws.iter_rows(min_col=3, max_col=3):
-            for cell in row:
-                cell.alignment = wrap_alignment
-                
-        # 为input signal列(E列)设置自动换行
-        for row in ws.iter_rows(min_col=5, max_col=5):
-            for cell in row:
-                cell.alignment = wrap_alignment
-
-        # 统一设置所有列宽为30
-        for col in 'ABCDEFGHIJ':  # 假设表格有10列
-            ws.column_dimensions[col].width = 30
-
-        # 保存文件
-        wb.save(output_path)
-        print(f"✅ 测试用例已保存至: {output_path}")
-        return output_path
-    
-    def _extract_function_name(self, description: str) -> str:
-        """从描述中提取功能名称"""
-        if "倒车灯" in description:
-            return "外灯控制"
-        elif "门锁" in description:
-            return "门锁控制"
-        elif "雨刮" in description:
-            return "雨刮控制"
-        elif "电源" in description:
-            return "电源管理"
-        else:
-            return "功能控制"
-    
-    def _extract_feature(self, coverage: List[str]) -> str:
-        """从覆盖项中提取特性名称"""
-        for item in coverage:
-            if "倒车灯" in item:
-                return "倒车灯功能"
-            elif "门锁" in item:
-                return "门锁功能"
-            elif "雨刮" in item:
-                return "雨刮功能"
-            elif "电源" in item:
-                return "电源管理功能"
-        return "其他功能"
-    
-    def _extract_test_group(self, coverage: List[str]) -> str:
-        """从覆盖项中提取测试组名称"""
-        for item in coverage:
-            if "倒车灯" in item:
-                return "倒车灯"
-            elif "门锁" in item:
-                return "门锁"
-            elif "雨刮" in item:
-                return "雨刮"
-            elif "电源" in item:
-                return "电源"
-        return "其他"
\ No newline at end of file
+        return ExcelCaseWriter(output_path)
+
+    def validate_formats(self, formats: Optional[List[str]] = None) -> List[Type[CaseSink]]:
+        """检查输出格式名称及其依赖，返回对应的写入器类；格式不可用时抛出 ValueError
+
+        应在调用大模型之前执行，避免生成完成（或已写出部分格式）后才发现无法输出。
+        """
+        sink_classes = []
+        for name in formats or self.config.OUTPUT_FORMATS:
+            sink_class = SINK_CLASSES.get(str(name).lower().lstrip("."))
+            if sink_class is None:
+                raise ValueError(f"不支持的输出格式: {name}")
+            sink_class.check_available()
+            sink_classes.append(sink_class)
+        return sink_classes
+
+    def open_sinks(self, formats: Optional[List[str]] = None,
+                   output_stem: Optional[Path] = None) -> List[CaseSink]:
+        """按格式名称打开多个写入器，文件名共用同一时间戳，仅扩展名不同"""
+        sink_classes = self.validate_formats(formats)
+        if not output_stem:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            output_stem = self.config.OUTPUTS_DIR / f"TestCases_{timestamp}"
+        sinks = []
+        try:
+            for sink_class in sink_classes:
+                sinks.append(sink_class(Path(output_stem).with_suffix(sink_class.suffix)))
+        except Exception:
+            for sink in sinks:
+                sink.close()
+            raise
+        return sinks
+
+    @profiled()
+    def save(self, test_cases: Iterable[Dict[str, Any]], formats: Optional[List[str]] = None,
+             output_stem: Optional[Path] = None, batch_size: int = CLASSIFY_BATCH) -> Dict[str, Path]:
+        """一次遍历测试用例，同时写出多种格式，返回 {格式: 文件路径}
+
+        test_cases 为流式生成的迭代器时，batch_size 设为 1 可使每个测试用例到达后立即写出。
+        """
+        sinks = self.open_sinks(formats, output_stem)
+        try:
+            for case, hierarchy in self.classify_batches(test_cases, batch_size):
+                for sink in sinks:
+                    sink.write_case(case, hierarchy)
+        except BaseException:
+            # 生成或写入中途失败：Excel 不保存半成品，逐行格式保留已写入的记录
+            for sink in sinks:
+                sink.abort()
+            raise
+        for sink in sinks:
+            sink.close()
+
+        if not sinks or not sinks[0].case_count:
+            for sink in sinks:
+                sink.output_path.unlink(missing_ok=True)
+            print("❌ 没有测试用例可保存")
+            return {}
+        for sink in sinks:
+            print(f"✅ 测试用例已保存至: {sink.output_path}")
+        return {sink.suffix.lstrip("."): sink.output_path for sink in sinks}
+
+    @profiled()
+    def save_to_excel(self, test_cases: Iterable[Dict[str, Any]],
+                     output_path: Optional[Path] = None) -> Path:
+        """保存测试用例到Excel文件，test_cases 可以是列表或逐个产出测试用例的迭代器"""
+        if isinstance(test_cases, list) and not test_cases:
+            print("❌ 没有测试用例可保存")
+            return None
+
+        with self.open_excel_writer(output_path) as writer:
+            for case, hierarchy in self.classify_batches(test_cases):
+                writer.write_case(case, hierarchy)
+
+        if not writer.case_count:
+            writer.output_path.unlink(missing_ok=True)
+            print("❌ 没有测试用例可保存")
+            return None
+        print(f"✅ 测试用例已保存至: {writer.output_path}")
+        return writer.output_path
+
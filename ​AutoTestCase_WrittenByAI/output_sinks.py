@@ -0,0 +1,192 @@
+import csv
+import json
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import List, Dict, Any, Iterator, Tuple
+
+'''
+定义了测试用例输出接口 CaseSink 及 JSONL、CSV、Parquet 三种机器可读格式的写入器。
+各写入器将 save_to_excel 中的 Function / Feature / Test Group / Test Case /
+Precondition / Test Step 层级展平为每个测试步骤一条记录，层级名称作为记录的列，
+便于测试管理系统导入、看板统计和按行比较差异。
+所有写入器都逐个接收测试用例，OutputHandler 可在一次遍历中同时写出多种格式。
+'''
+
+# 展平后每条记录的字段，顺序即 CSV / Parquet 的列顺序
+RECORD_FIELDS = (
+    "function", "feature", "test_group", "test_case", "test_type", "case_index",
+    "step_index", "precondition", "input_signal", "step", "expected", "output_signal"
+)
+
+
+def format_precondition(case: Dict[str, Any]) -> str:
+    preconditions = case.get("precondition", [])
+    return ',\n'.join([f"{i + 1}. {p}" for i, p in enumerate(preconditions)])
+
+
+def format_input_signal(case: Dict[str, Any]) -> str:
+    input_signal_dict = case.get("input_signal", {})
+    return ',\n'.join([f"{key}={value}" for key, value in input_signal_dict.items()])
+
+
+class CaseSink(ABC):
+    """测试用例输出接口：write_case 逐个写入，close 完成输出
+
+    hierarchy 为 OutputHandler.classify_case 返回的 (功能名称, 特性名称, 测试组名称)。
+    子类必须实现 _write；依赖可选库的子类重写 check_available。
+    可作为上下文管理器使用，退出时发生异常则调用 abort 而不是 close。
+    """
+    suffix = ""
+
+    @classmethod
+    def check_available(cls) -> None:
+        """检查写入器的依赖是否可用，不可用时抛出 ValueError；在生成之前调用，避免生成完成后才发现无法输出"""
+
+    def __init__(self, output_path: Path):
+        self.output_path = Path(output_path)
+        self.case_count = 0
+
+    def __enter__(self) -> "CaseSink":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def write_case(self, case: Dict[str, Any], hierarchy: Tuple[str, str, str]) -> None:
+        self._write(case, hierarchy)
+        self.case_count += 1
+
+    @abstractmethod
+    def _write(self, case: Dict[str, Any], hierarchy: Tuple[str, str, str]) -> None:
+        """写入一个测试用例"""
+
+    def close(self) -> None:
+        pass
+
+    def abort(self) -> None:
+        """写入过程中出错时结束输出；逐行写出的格式保留已写入的完整记录"""
+        self.close()
+
+    def flatten(self, case: Dict[str, Any], hierarchy: Tuple[str, str, str]) -> Iterator[Dict[str, Any]]:
+        """将测试用例展平为每个测试步骤一条记录；没有步骤的测试用例输出一条步骤为空的记录"""
+        function_name, feature_name, test_group_name = hierarchy
+        base = {
+            "function": function_name,
+            "feature": feature_name,
+            "test_group": test_group_name,
+            "test_case": case.get("description", ""),
+            "test_type": case.get("test_type", ""),
+            "case_index": self.case_count,
+            "step_index": 0,
+            "precondition": format_precondition(case),
+            "input_signal": format_input_signal(case),
+            "step": "",
+            "expected": ', '.join(case.get("expected", [])),
+            "output_signal": case.get("output_signal", "")
+        }
+        for step_index, step in enumerate(case.get("steps", []) or [""]):
+            record = dict(base)
+            record["step_index"] = step_index
+            record["step"] = step
+            yield record
+
+
+class JsonlCaseSink(CaseSink):
+    """JSON Lines 输出，每行一条记录，写入后立即可被下游逐行读取"""
+    suffix = ".jsonl"
+
+    def __init__(self, output_path: Path):
+        super().__init__(output_path)
+        self._file = open(self.output_path, 'w', encoding='utf-8')
+
+    def _write(self, case: Dict[str, Any], hierarchy: Tuple[str, str, str]) -> None:
+        for record in self.flatten(case, hierarchy):
+            self._file.write(json.dumps(record, ensure_ascii=False, default=str))
+            self._file.write("\n")
+        self._file.flush()
+
+    def close(self) -> None:
+        if not self._file.closed:
+            self._file.close()
+
+
+class CsvCaseSink(CaseSink):
+    """CSV 输出，使用 utf-8-sig 编码以便 Excel 直接打开时正确识别中文"""
+    suffix = ".csv"
+
+    def __init__(self, output_path: Path):
+        super().__init__(output_path)
+        self._file = open(self.output_path, 'w', encoding='utf-8-sig', newline='')
+        self._writer = csv.DictWriter(self._file, fieldnames=RECORD_FIELDS)
+        self._writer.writeheader()
+
+    def _write(self, case: Dict[str, Any], hierarchy: Tuple[str, str, str]) -> None:
+        self._writer.writerows(self.flatten(case, hierarchy))
+
+    def close(self) -> None:
+        if not self._file.closed:
+            self._file.close()
+
+
+class ParquetCaseSink(CaseSink):
+    """Parquet 列式输出，记录按列缓存，每满 row_group_size 条写出一个行组
+
+    依赖 pyarrow，未安装时 check_available 和创建写入器时报错。
+    """
+    suffix = ".parquet"
+
+    @classmethod
+    def check_available(cls) -> None:
+        try:
+            import pyarrow.parquet
+        except ImportError as e:
+            raise ValueError("Parquet 输出需要安装 pyarrow: pip install pyarrow") from e
+
+    def __init__(self, output_path: Path, row_group_size: int = 10000):
+        self.check_available()
+        super().__init__(output_path)
+        import pyarrow
+        import pyarrow.parquet
+        self._pa = pyarrow
+        self._schema = pyarrow.schema([
+            (field, pyarrow.int64() if field in ("case_index", "step_index") else pyarrow.string())
+            for field in RECORD_FIELDS
+        ])
+        self._writer = pyarrow.parquet.ParquetWriter(str(self.output_path), self._schema)
+        self._row_group_size = row_group_size
+        self._columns: Dict[str, List[Any]] = {field: [] for field in RECORD_FIELDS}
+        self._pending = 0
+
+    def _write(self, case: Dict[str, Any], hierarchy: Tuple[str, str, str]) -> None:
+        for record in self.flatten(case, hierarchy):
+            for field in RECORD_FIELDS:
+                value = record[field]
+                self._columns[field].append(value if isinstance(value, int) else str(value))
+            self._pending += 1
+        if self._pending >= self._row_group_size:
+            self._flush()
+
+    def _flush(self) -> None:
+        if not self._pending:
+            return
+        self._writer.write_table(self._pa.table(self._columns, schema=self._schema))
+        self._columns = {field: [] for field in RECORD_FIELDS}
+        self._pending = 0
+
+    def close(self) -> None:
+        if self._writer is None:
+            return
+        self._flush()
+        self._writer.close()
+        self._writer = None
+
+
+# 输出格式名称到写入器的映射；Excel 写入器定义在 output_handler 中，由 OutputHandler 合并到可选格式
+SINKS = {
+    "jsonl": JsonlCaseSink,
+    "csv": CsvCaseSink,
+    "parquet": ParquetCaseSink,
+}
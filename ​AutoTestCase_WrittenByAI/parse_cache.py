@@ -0,0 +1,58 @@
+from pathlib import Path
+import hashlib
+import json
+import os
+from typing import Any, Optional
+
+'''
+定义了 ParseCache 类，为文档解析结果提供基于内容哈希的磁盘缓存。
+缓存键由输入文件内容的 SHA-256、解析类型和解析器版本共同组成，
+输入文件未变化时直接读取缓存，跳过 PyPDF2 / openpyxl 的解析过程。
+'''
+
+# 解析逻辑或输出结构变化时递增，使旧缓存自动失效
+PARSER_VERSION = "2"
+
+
+def file_sha256(path: Path, chunk_size: int = 1 << 20) -> str:
+    """分块计算文件内容的 SHA-256"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ParseCache:
+    def __init__(self, cache_dir: Path):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, kind: str, path: Path) -> str:
+        """生成缓存键：解析类型 + 解析器版本 + 文件内容哈希"""
+        return f"{kind}-v{PARSER_VERSION}-{file_sha256(path)}"
+
+    def get(self, key: str) -> Optional[Any]:
+        """读取缓存，不存在或已损坏时返回 None"""
+        cache_path = self.cache_dir / f"{key}.json"
+        if not cache_path.exists():
+            self.misses += 1
+            return None
+        try:
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                value = json.load(f)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return value
+
+    def put(self, key: str, value: Any) -> None:
+        """写入缓存（先写临时文件再原子替换，避免并发运行读到半个文件）"""
+        cache_path = self.cache_dir / f"{key}.json"
+        tmp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(value, f, ensure_ascii=False, default=str)
+        os.replace(tmp_path, cache_path)
@@ -0,0 +1,78 @@
+from collections import deque
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+
+'''
+定义了 AhoCorasick 类，实现多模式字符串匹配自动机。
+所有关键字一次性编译为自动机后，只需对文本扫描一遍即可找出全部命中，
+耗时与文本长度和命中数量相关，而与关键字数量无关。
+'''
+
+
+class AhoCorasick:
+    def __init__(self, patterns: Iterable[Tuple[str, Any]] = (), case_sensitive: bool = False):
+        self.case_sensitive = case_sensitive
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[Tuple[int, Any]]] = [[]]
+        self._out_link: List[int] = [-1]  # 指向最近的有输出的失败链节点
+        self._built = False
+        for pattern, value in patterns:
+            self.add(pattern, value)
+
+    def add(self, pattern: str, value: Any) -> None:
+        """添加关键字及其关联值，同一关键字可关联多个值"""
+        if not pattern:
+            return
+        if not self.case_sensitive:
+            pattern = pattern.lower()
+        node = 0
+        for char in pattern:
+            next_node = self._goto[node].get(char)
+            if next_node is None:
+                next_node = len(self._goto)
+                self._goto[node][char] = next_node
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+                self._out_link.append(-1)
+            node = next_node
+        self._out[node].append((len(pattern), value))
+        self._built = False
+
+    def build(self) -> "AhoCorasick":
+        """按广度优先顺序计算失败指针和输出链"""
+        queue = deque()
+        for node in self._goto[0].values():
+            self._fail[node] = 0
+            self._out_link[node] = -1
+            queue.append(node)
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                fail = self._goto[fail].get(char, 0)
+                self._fail[child] = fail
+                self._out_link[child] = fail if self._out[fail] else self._out_link[fail]
+        self._built = True
+        return self
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int, Any]]:
+        """扫描文本，按结束位置依次产出 (起始位置, 结束位置, 关联值)"""
+        if not self._built:
+            self.build()
+        if not self.case_sensitive:
+            text = text.lower()
+        goto, fail, out, out_link = self._goto, self._fail, self._out, self._out_link
+        node = 0
+        for end, char in enumerate(text, start=1):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            match_node = node if out[node] else out_link[node]
+            while match_node > 0:
+                for length, value in out[match_node]:
+                    yield end - length, end, value
+                match_node = out_link[match_node]
@@ -0,0 +1,225 @@
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from functools import wraps
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Iterator
+
+try:
+    import resource
+except ImportError:  # Windows 没有 resource 模块，峰值内存记为 None
+    resource = None
+
+'''
+定义了运行剖析器 Profiler，记录各阶段（span）的墙钟时间、CPU 时间和进程峰值内存的增长，
+以及大模型接口返回的 usage（输入/输出 token 数）和各类缓存的命中率。
+进程峰值内存（ru_maxrss）只增不减，阶段记录的是该阶段运行期间峰值抬升的量（peak_rss_growth_mb），
+即由该阶段（或与其并发的阶段）推高的内存峰值；整个进程的峰值内存只在汇总中给出。
+被 @profiled 装饰的函数在没有激活的剖析器时直接调用，开销只有一次全局变量读取；
+激活后每个阶段只读取两次计时器和两次 getrusage，可在生产运行中常开。
+CPU 时间取当前线程的 CPU 时间，并发请求中的阶段互不干扰。
+运行结束后可导出 JSON 汇总，以及可在 chrome://tracing 或 Perfetto 中打开的 trace-event 文件。
+'''
+
+
+def peak_rss_mb() -> Optional[float]:
+    """进程到目前为止的峰值常驻内存（MB），平台不支持时返回 None"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 下单位为 KB，macOS 下为字节
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+class Profiler:
+    def __init__(self, max_events: int = 100000):
+        self.max_events = max_events  # 保留的阶段明细上限，超出后只更新汇总，常驻服务中内存不会无限增长
+        self.started_at = time.time()
+        self._origin = time.perf_counter()
+        self._cpu_origin = time.process_time()
+        self.events: List[Dict[str, Any]] = []
+        self.dropped_events = 0
+        self.stages: Dict[str, Dict[str, Any]] = {}
+        self.usage = {"requests": 0, "prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
+        self.caches: Dict[str, Dict[str, Any]] = {}
+        self._threads: Dict[int, str] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _stack(self) -> List[Dict[str, Any]]:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    @contextmanager
+    def span(self, name: str, **args) -> Iterator[Dict[str, Any]]:
+        """记录一个阶段，产出该阶段的附加信息字典，可在阶段内补充内容"""
+        stack = self._stack()
+        stack.append(args)
+        peak_start = peak_rss_mb()
+        start = time.perf_counter()
+        cpu_start = time.thread_time()
+        try:
+            yield args
+        finally:
+            wall = time.perf_counter() - start
+            cpu = time.thread_time() - cpu_start
+            stack.pop()
+            self._record(name, start, wall, cpu, peak_start, args)
+
+    def _record(self, name: str, start: float, wall: float, cpu: float, peak_start: Optional[float],
+                args: Dict[str, Any]) -> None:
+        peak = peak_rss_mb()
+        thread = threading.current_thread()
+        with self._lock:
+            stage = self.stages.get(name)
+            if stage is None:
+                stage = self.stages[name] = {"calls": 0, "wall_s": 0.0, "cpu_s": 0.0, "max_wall_s": 0.0,
+                                             "peak_rss_growth_mb": None}
+            stage["calls"] += 1
+            stage["wall_s"] += wall
+            stage["cpu_s"] += cpu
+            stage["max_wall_s"] = max(stage["max_wall_s"], wall)
+            if peak is not None and peak_start is not None:
+                stage["peak_rss_growth_mb"] = (stage["peak_rss_growth_mb"] or 0.0) + peak - peak_start
+            if len(self.events) < self.max_events:
+                self.events.append({"name": name, "tid": thread.ident, "start": start - self._origin,
+                                    "wall": wall, "cpu": cpu, "args": args})
+                self._threads.setdefault(thread.ident, thread.name)
+            else:
+                self.dropped_events += 1
+
+    def annotate(self, **args) -> None:
+        """为当前线程最内层的阶段补充附加信息（如 token 数、是否命中缓存）"""
+        stack = self._stack()
+        if stack:
+            stack[-1].update(args)
+
+    def record_usage(self, usage: Any) -> None:
+        """累计一次接口调用的 usage，usage 为接口返回的对象或字典"""
+        counts = {}
+        for field in ("prompt_tokens", "completion_tokens", "total_tokens"):
+            value = usage.get(field) if isinstance(usage, dict) else getattr(usage, field, None)
+            counts[field] = int(value or 0)
+        if not counts["total_tokens"]:
+            counts["total_tokens"] = counts["prompt_tokens"] + counts["completion_tokens"]
+        with self._lock:
+            self.usage["requests"] += 1
+            for field, value in counts.items():
+                self.usage[field] += value
+        self.annotate(**counts)
+
+    def record_cache(self, name: str, hits: int, misses: int) -> None:
+        """记录一个缓存的命中统计"""
+        lookups = hits + misses
+        self.caches[name] = {"hits": hits, "misses": misses,
+                             "hit_rate": round(hits / lookups, 4) if lookups else 0.0}
+
+    def summary(self, prompt_price: float = 0.0, completion_price: float = 0.0) -> Dict[str, Any]:
+        """运行汇总；prompt_price / completion_price 为每千 token 价格，用于估算费用"""
+        with self._lock:
+            stages = {
+                name: {
+                    "calls": stage["calls"],
+                    "wall_s": round(stage["wall_s"], 4),
+                    "cpu_s": round(stage["cpu_s"], 4),
+                    "max_wall_s": round(stage["max_wall_s"], 4),
+                    "peak_rss_growth_mb": None if stage["peak_rss_growth_mb"] is None
+                    else round(stage["peak_rss_growth_mb"], 1)
+                }
+                for name, stage in sorted(self.stages.items(), key=lambda item: -item[1]["wall_s"])
+            }
+            usage = dict(self.usage)
+        peak = peak_rss_mb()
+        usage["estimated_cost"] = round(usage["prompt_tokens"] / 1000 * prompt_price
+                                        + usage["completion_tokens"] / 1000 * completion_price, 4)
+        return {
+            "started_at": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(self.started_at)),
+            "wall_s": round(time.perf_counter() - self._origin, 4),
+            "cpu_s": round(time.process_time() - self._cpu_origin, 4),
+            "peak_rss_mb": None if peak is None else round(peak, 1),
+            "stages": stages,
+            "usage": usage,
+            "caches": dict(self.caches),
+            "dropped_events": self.dropped_events
+        }
+
+    def save(self, output_path: Path, **summary_args) -> Path:
+        """将运行汇总写为 JSON"""
+        output_path = Path(output_path)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(output_path, 'w', encoding='utf-8') as f:
+            json.dump(self.summary(**summary_args), f, ensure_ascii=False, indent=2, default=str)
+        return output_path
+
+    def save_chrome_trace(self, output_path: Path) -> Path:
+        """将阶段明细写为 Chrome trace-event 格式（时间单位为微秒）"""
+        pid = os.getpid()
+        with self._lock:
+            events = list(self.events)
+            threads = dict(self._threads)
+        trace = [{"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": name}}
+                 for tid, name in threads.items()]
+        for event in events:
+            trace.append({
+                "name": event["name"], "cat": "stage", "ph": "X", "pid": pid, "tid": event["tid"],
+                "ts": round(event["start"] * 1e6, 1), "dur": round(event["wall"] * 1e6, 1),
+                "args": dict(event["args"], cpu_ms=round(event["cpu"] * 1000, 3))
+            })
+        output_path = Path(output_path)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(output_path, 'w', encoding='utf-8') as f:
+            json.dump({"traceEvents": trace, "displayTimeUnit": "ms"}, f, ensure_ascii=False, default=str)
+        return output_path
+
+
+# 当前激活的剖析器，为 None 时 @profiled 和各记录函数不做任何事
+_active: Optional[Profiler] = None
+
+
+def activate(profiler: Optional[Profiler]) -> Optional[Profiler]:
+    """激活剖析器（传入 None 为停用），返回之前激活的剖析器"""
+    global _active
+    previous, _active = _active, profiler
+    return previous
+
+
+def get_profiler() -> Optional[Profiler]:
+    return _active
+
+
+def profiled(name: Optional[str] = None):
+    """将函数调用记录为阶段，阶段名默认为函数名"""
+    def decorator(func):
+        stage = name or func.__name__
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            profiler = _active
+            if profiler is None:
+                return func(*args, **kwargs)
+            with profiler.span(stage):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def span(name: str, **args):
+    """在激活的剖析器上记录阶段，没有激活的剖析器时返回空的上下文"""
+    if _active is None:
+        return nullcontext(args)
+    return _active.span(name, **args)
+
+
+def annotate(**args) -> None:
+    if _active is not None:
+        _active.annotate(**args)
+
+
+def record_usage(usage: Any) -> None:
+    if _active is not None and usage is not None:
+        _active.record_usage(usage)
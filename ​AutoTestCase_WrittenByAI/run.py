@@ -2,23 +2,264 @@ from config import Config
 from document_parser import DocumentParser
 from test_case_generator import TestCaseGenerator
 from output_handler import OutputHandler
+from boundary_case_generator import BoundaryCaseGenerator, INVALID_TEST_TYPES
+from signal_codec import SignalCodec, RAW_OUT_OF_RANGE, PHYSICAL_OUT_OF_RANGE
+from dedup import CaseDeduplicator
+from traceability import TraceabilityEngine
+from run_journal import RunJournal, prune_journals
+import profiler
+from datetime import datetime
+from pathlib import Path
+import argparse
+import json
 
 '''
 项目的入口文件，定义了 main 函数。
 程序运行时，会依次完成解析文档、生成测试用例和保存结果的操作，
 同时会输出相应的执行信息和错误信息。
+使用 --resume 可从运行日志恢复中断的运行，已完成的生成块不再重复调用大模型。
+启用 STREAM_OUTPUT 时测试用例以流式方式生成，每个测试用例解析完成后立即写入输出文件。
+启用运行剖析时，各阶段的耗时、token 用量和缓存命中率在运行结束后写入 outputs/profiles。
 '''
 
-def main():
+def parse_args(argv=None):
+    arg_parser = argparse.ArgumentParser(description="汽车电子测试用例生成系统")
+    arg_parser.add_argument("--resume", nargs="?", const="latest", default=None, metavar="JOURNAL",
+                            help="从运行日志恢复，不指定路径时使用最近一次的运行日志")
+    return arg_parser.parse_args(argv)
+
+
+def open_journal(config, resume=None):
+    """打开本次运行的日志：恢复时沿用已有日志，否则新建"""
+    if resume == "latest":
+        journals = sorted(Path(config.RUN_JOURNAL_DIR).glob("run-*.jsonl"), key=lambda p: p.stat().st_mtime)
+        if not journals:
+            print("⚠️ 未找到可恢复的运行日志，将重新开始")
+        else:
+            resume = journals[-1]
+    if resume and resume != "latest":
+        journal = RunJournal(resume)
+        print(f"📒 从运行日志恢复: {journal.journal_path} (已完成 {len(journal)} 个生成块)")
+        return journal
+    if not config.RUN_JOURNAL_ENABLED:
+        return None
+    # 新建日志前清理旧日志，为本次运行留出一个名额
+    prune_journals(config.RUN_JOURNAL_DIR, config.RUN_JOURNAL_KEEP - 1)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    return RunJournal(Path(config.RUN_JOURNAL_DIR) / f"run-{timestamp}.jsonl")
+
+
+def start_profile(config):
+    """创建并激活本次运行的剖析器，未启用时返回 None"""
+    if not config.PROFILE_ENABLED:
+        return None
+    run_profiler = profiler.Profiler()
+    profiler.activate(run_profiler)
+    return run_profiler
+
+
+def save_profile(config, run_profiler, parser=None, generator=None, journal=None):
+    """收集缓存命中统计，写出运行剖析结果并输出耗时最多的阶段"""
+    if run_profiler is None:
+        return None
+    profiler.activate(None)
+    if parser is not None and parser.parse_cache is not None:
+        run_profiler.record_cache("parse_cache", parser.parse_cache.hits, parser.parse_cache.misses)
+    if generator is not None and generator.response_cache is not None:
+        stats = generator.response_cache.stats()
+        run_profiler.record_cache("llm_response_cache", stats["hits"], stats["misses"])
+    if journal is not None:
+        run_profiler.record_cache("run_journal", journal.replayed, journal.recorded)
+
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    profile_path = run_profiler.save(Path(config.PROFILE_DIR) / f"Profile_{timestamp}.json",
+                                     prompt_price=config.LLM_PROMPT_PRICE_PER_1K,
+                                     completion_price=config.LLM_COMPLETION_PRICE_PER_1K)
+    summary = run_profiler.summary(config.LLM_PROMPT_PRICE_PER_1K, config.LLM_COMPLETION_PRICE_PER_1K)
+    print(f"⏱️ 运行剖析: 总耗时 {summary['wall_s']:.1f}s, CPU {summary['cpu_s']:.1f}s"
+          + (f", 峰值内存 {summary['peak_rss_mb']:.0f}MB" if summary["peak_rss_mb"] is not None else ""))
+    for name, stage in list(summary["stages"].items())[:5]:
+        print(f"  - {name}: {stage['calls']} 次, 共 {stage['wall_s']:.2f}s")
+    usage = summary["usage"]
+    if usage["requests"]:
+        print(f"🪙 token 用量: 输入 {usage['prompt_tokens']}, 输出 {usage['completion_tokens']}, "
+              f"估算费用 {usage['estimated_cost']:.4f} 元")
+    print(f"📄 运行剖析已保存至: {profile_path}")
+    if config.PROFILE_CHROME_TRACE:
+        trace_path = run_profiler.save_chrome_trace(profile_path.with_name(f"Trace_{timestamp}.json"))
+        print(f"📄 trace 文件已保存至: {trace_path}")
+    return summary
+
+
+def stream_cases(config, generator, requirements, signals, journal=None, collected=None):
+    """流式生成测试用例：每个测试用例解析完成后立即去重并产出，交给 OutputHandler.save 写出
+
+    依次产出大模型生成的测试用例、覆盖补充用例和本地边界值用例；
+    产出的测试用例同时追加到 collected，供写出后做信号校验和覆盖统计。
+    """
+    collected = collected if collected is not None else []
+    deduplicator = CaseDeduplicator(threshold=config.DEDUP_SIMILARITY) if config.DEDUP_ENABLED else None
+
+    def emit(cases):
+        for case in deduplicator.dedupe(cases) if deduplicator else cases:
+            collected.append(case)
+            yield case
+
+    generated = []
+    with profiler.span("generate"):
+        for case in generator.generate_stream(requirements, signals, journal=journal):
+            generated.append(case)
+            yield from emit([case])
+    if config.COVERAGE_LOOP_ENABLED and generated:
+        with profiler.span("improve_coverage"):
+            improved = generator.improve_coverage(requirements, signals, generated)
+        yield from emit(improved[len(generated):])
+    if config.LOCAL_BOUNDARY_CASES:
+        boundary_cases = BoundaryCaseGenerator(config).generate(signals)
+        print(f"📐 本地生成 {len(boundary_cases)} 个信号边界值/异常值测试用例")
+        yield from emit(boundary_cases)
+    if deduplicator:
+        report = deduplicator.report()
+        print(f"🧹 去重: 合并 {report['merged']} 个重复测试用例，保留 {report['kept']} 个")
+
+
+def finalize_cases(config, test_cases, signals, frames_path=None, dedup_report_path=None):
+    """追加本地边界值用例、合并重复用例，并按信号矩阵布局校验输入信号；没有测试用例时返回空列表"""
+    if config.LOCAL_BOUNDARY_CASES:
+        boundary_cases = BoundaryCaseGenerator(config).generate(signals)
+        print(f"📐 本地生成 {len(boundary_cases)} 个信号边界值/异常值测试用例")
+        test_cases = test_cases + boundary_cases
+    
+    if not test_cases:
+        print("❌ 未能生成任何测试用例")
+        return []
+    
+    if config.DEDUP_ENABLED:
+        test_cases = dedupe_cases(config, test_cases, dedup_report_path)
+        
+    print(f"✅ 成功生成 {len(test_cases)} 个测试用例")
+    
+    if config.SIGNAL_VALIDATION_ENABLED:
+        validate_signals(config, test_cases, signals, frames_path)
+    return test_cases
+
+
+def validate_signals(config, test_cases, signals, frames_path=None):
+    """按信号矩阵布局校验输入信号并打包为报文数据，返回非预期的问题列表"""
+    encoded = SignalCodec(signals, can_fd=config.CAN_FD).encode_cases(test_cases)
+    # 本地越界/溢出用例的输入本来就超出范围，标记为预期问题，不计入校验结果
+    issues = []
+    for issue in encoded["issues"]:
+        issue["expected"] = test_cases[issue["case"]].get("test_type") in INVALID_TEST_TYPES \
+            and issue["reason"] in (RAW_OUT_OF_RANGE, PHYSICAL_OUT_OF_RANGE)
+        if not issue["expected"]:
+            issues.append(issue)
+    print(f"🔎 输入信号校验: 生成 {len(encoded['frames'])} 帧报文, 发现 {len(issues)} 个问题"
+          f" (另有 {len(encoded['issues']) - len(issues)} 个为越界用例的预期越界)")
+    for issue in issues[:10]:
+        print(f"  - 用例{issue['case'] + 1} {issue['signal']}={issue['value']}: {issue['reason']}")
+    if config.SIGNAL_FRAME_EXPORT:
+        if not frames_path:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            frames_path = config.OUTPUTS_DIR / f"Frames_{timestamp}.json"
+        with open(frames_path, 'w', encoding='utf-8') as f:
+            json.dump(encoded, f, ensure_ascii=False, indent=2, default=str)
+        print(f"📦 报文数据已保存至: {frames_path}")
+    return issues
+
+
+def dedupe_cases(config, test_cases, report_path=None):
+    """合并重复测试用例并输出合并统计"""
+    deduplicator = CaseDeduplicator(threshold=config.DEDUP_SIMILARITY)
+    test_cases = deduplicator.dedupe(test_cases)
+    report = deduplicator.report()
+    print(f"🧹 去重: 合并 {report['merged']} 个重复测试用例，保留 {report['kept']} 个")
+    for group in report["groups"][:5]:
+        print(f"  - {group['kept']} ← {len(group['merged'])} 个相似用例")
+    if report["merged"] and config.DEDUP_REPORT_EXPORT:
+        if not report_path:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            report_path = config.OUTPUTS_DIR / f"Dedup_{timestamp}.json"
+        with open(report_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2, default=str)
+        print(f"📄 去重记录已保存至: {report_path}")
+    return test_cases
+
+
+def parse_changed_sections(parser):
+    """增量解析修订版PDF，返回 (只包含新增或变化章节文本的需求列表, 待写入的页面清单)
+
+    没有变化时需求列表为空。页面清单应在测试用例保存成功后交给 parser.save_page_manifest，
+    生成或保存失败时不写入，下次运行会重新生成这些章节。
+    """
+    result = parser.parse_pdf_incremental()
+    changed = result["changed_sections"]
+    print(f"📝 重新提取 {len(result['changed_pages'])} 页，{len(changed)} 个章节新增或有变化")
+    if result["removed_sections"]:
+        print(f"  - 已删除章节: {', '.join(result['removed_sections'])}")
+    if not changed:
+        return [], result["manifest"]
+    return [{
+        "id": "raw_text",
+        "description": "PDF变化章节文本",
+        "content": "\n\n".join(section["content"] for section in changed),
+        "type": "RawText"
+    }], result["manifest"]
+
+
+def report_traceability(config, requirements, signals, test_cases, report_path=None, signal_index=None):
+    """统计需求/信号覆盖情况并输出未覆盖条目，返回 TraceabilityEngine
+
+    signal_index 为生成时使用的信号名称索引，传入后用例中的信号按索引匹配，避免逐个信号名扫描用例文本。
+    """
+    engine = TraceabilityEngine(requirements, signals, signal_index)
+    engine.add_cases(test_cases)
+    report = engine.report()
+    for kind, title in (("requirements", "需求"), ("signals", "信号")):
+        item = report[kind]
+        print(f"🧭 {title}覆盖: {item['covered']}/{item['total']} ({item['ratio']:.1%})")
+    if report["requirements"]["uncovered"]:
+        print(f"  - 未覆盖需求: {', '.join(report['requirements']['uncovered'][:10])}")
+    if config.TRACEABILITY_EXPORT:
+        if not report_path:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            report_path = config.OUTPUTS_DIR / f"Traceability_{timestamp}.json"
+        with open(report_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2, default=str)
+        print(f"📄 追溯统计已保存至: {report_path}")
+    return engine
+
+
+def main(argv=None):
+    args = parse_args(argv)
     print("🚀 汽车电子测试用例生成系统 v2.0 (通用框架)")
     config = Config()
+    journal = None
+    parser = generator = None
+    page_manifest = None
+    run_profiler = start_profile(config)
     
     try:
+        # 输出格式在调用大模型之前检查，避免生成完成后才发现无法输出
+        output_handler = OutputHandler(config)
+        output_handler.validate_formats()
+        
         # 1. 解析文档
         print("🔧 正在解析输入文档...")
         parser = DocumentParser(config)
-        requirements = parser.parse_pdf()
-        signals = parser.parse_excel()
+        if config.INCREMENTAL_PARSE_ENABLED:
+            requirements, page_manifest = parse_changed_sections(parser)
+            if not requirements:
+                # 只有删除的章节时同样记录本版本
+                parser.save_page_manifest(page_manifest)
+                print("✅ 功能规范没有新增或变化的章节，无需重新生成")
+                return
+        else:
+            requirements = parser.parse_pdf()
+        if config.SIGNAL_MATRIX_FILES:
+            signals = parser.parse_signal_matrices(config.SIGNAL_MATRIX_FILES)
+        else:
+            signals = parser.parse_excel()
         
         print(f"📑 识别到 {len(requirements)} 条功能需求")
         print(f"📶 识别到 {len(signals)} 个CAN信号")
@@ -26,27 +267,66 @@ def main():
         # 2. 生成测试用例
         print("⚡ 正在智能生成测试用例...")
         generator = TestCaseGenerator(config)
-        test_cases = generator.generate(requirements, signals)
-        
-        if not test_cases:
-            print("❌ 未能生成任何测试用例")
-            return
+        journal = open_journal(config, args.resume)
+        if config.STREAM_OUTPUT:
+            # 流式模式：测试用例边生成边写出，写出完成后再做信号校验
+            test_cases = []
+            output_paths = output_handler.save(
+                stream_cases(config, generator, requirements, signals, journal, test_cases), batch_size=1)
+            if not test_cases:
+                return
+            print(f"✅ 成功生成 {len(test_cases)} 个测试用例")
+            if config.SIGNAL_VALIDATION_ENABLED:
+                with profiler.span("validate_signals"):
+                    validate_signals(config, test_cases, signals)
+        else:
+            with profiler.span("generate"):
+                test_cases = generator.generate(requirements, signals, journal=journal)
+            if config.COVERAGE_LOOP_ENABLED and test_cases:
+                with profiler.span("improve_coverage"):
+                    test_cases = generator.improve_coverage(requirements, signals, test_cases)
             
-        print(f"✅ 成功生成 {len(test_cases)} 个测试用例")
+            with profiler.span("finalize_cases"):
+                test_cases = finalize_cases(config, test_cases, signals)
+            if not test_cases:
+                return
+        
+        if config.TRACEABILITY_ENABLED:
+            with profiler.span("report_traceability"):
+                report_traceability(config, parser.extract_requirements(requirements), signals, test_cases,
+                                    signal_index=generator._build_signal_index(signals))
         
         # 3. 保存结果
-        output_handler = OutputHandler(config)
-        output_path = output_handler.save_to_excel(test_cases)
+        if not config.STREAM_OUTPUT:
+            output_paths = output_handler.save(test_cases)
         
-        if output_path:
+        if output_paths:
             print(f"\n📊 生成统计:")
             print(f"- 生成测试用例数量: {len(test_cases)}")
-            print(f"- 输出文件: {output_path}")
+            for output_path in output_paths.values():
+                print(f"- 输出文件: {output_path}")
+            # 全部请求成功且结果已保存，不再需要从运行日志恢复，本版本的章节也不再需要重新生成；
+            # 有请求失败时保留运行日志和上一版本的页面清单，下次运行（或 --resume）补齐缺失的结果
+            if generator.failed_calls:
+                print(f"⚠️ {generator.failed_calls} 个请求调用失败，测试用例可能不完整")
+                if journal is not None and journal.recorded:
+                    print(f"💡 已完成的生成块已记录在 {journal.journal_path}，可使用 --resume 补齐")
+            else:
+                if journal is not None:
+                    journal.discard()
+                if page_manifest is not None:
+                    parser.save_page_manifest(page_manifest)
         
     except Exception as e:
         print(f"❌ 执行过程中发生错误: {str(e)}")
         import traceback
         traceback.print_exc()
+        if journal is not None and journal.recorded:
+            print(f"💡 已完成的生成块已记录在 {journal.journal_path}，可使用 --resume 继续")
+    finally:
+        save_profile(config, run_profiler, parser, generator, journal)
+        if journal is not None:
+            journal.close()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,96 @@
+from pathlib import Path
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+'''
+定义了 RunJournal 类，以预写日志（JSON Lines）的形式记录每个生成块解析后的测试用例。
+每个生成块完成后立即追加一行并 fsync 落盘，进程中途退出也不会丢失已完成的结果；
+恢复运行时按提示词哈希识别已完成的生成块，直接从日志回放，不再重复调用大模型。
+运行结果成功保存后日志即可删除（discard）；prune_journals 只保留最近的若干个未删除日志。
+'''
+
+
+class RunJournal:
+    def __init__(self, journal_path: Path):
+        self.journal_path = Path(journal_path)
+        self.journal_path.parent.mkdir(parents=True, exist_ok=True)
+        self.replayed = 0
+        self.recorded = 0
+        self._lock = threading.Lock()
+        self._entries: Dict[str, List[Dict[str, Any]]] = self._load()
+        # 上次中断时留下不完整的最后一行时，第一次追加前先补换行
+        self._needs_newline = self._ends_without_newline()
+        self._file = open(self.journal_path, 'a', encoding='utf-8')
+
+    def _ends_without_newline(self) -> bool:
+        if not self.journal_path.exists() or self.journal_path.stat().st_size == 0:
+            return False
+        with open(self.journal_path, 'rb') as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) != b"\n"
+
+    def _load(self) -> Dict[str, List[Dict[str, Any]]]:
+        """读取已有日志；进程被终止时最后一行可能不完整，跳过无法解析的行"""
+        entries = {}
+        if not self.journal_path.exists():
+            return entries
+        with open(self.journal_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                    entries[record["key"]] = record["cases"]
+                except (ValueError, KeyError, TypeError):
+                    continue
+        return entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[List[Dict[str, Any]]]:
+        """返回已完成生成块的测试用例，未完成时返回 None"""
+        with self._lock:
+            cases = self._entries.get(key)
+            if cases is not None:
+                self.replayed += 1
+            return cases
+
+    def record(self, key: str, chunk_id: str, cases: List[Dict[str, Any]]) -> None:
+        """追加一个已完成生成块的测试用例并立即落盘"""
+        line = json.dumps({
+            "key": key,
+            "chunk": chunk_id,
+            "time": time.time(),
+            "cases": cases
+        }, ensure_ascii=False, default=str)
+        with self._lock:
+            # 先补换行，避免与上次中断时留下的不完整行拼接
+            if self._needs_newline:
+                self._file.write("\n")
+                self._needs_newline = False
+            self._file.write(line + "\n")
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._entries[key] = cases
+            self.recorded += 1
+
+    def close(self) -> None:
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+
+    def discard(self) -> None:
+        """关闭并删除日志，运行结果已成功保存、不再需要恢复时调用"""
+        self.close()
+        self.journal_path.unlink(missing_ok=True)
+
+
+def prune_journals(journal_dir: Path, keep: int) -> List[Path]:
+    """按修改时间只保留最近的 keep 个运行日志（run-*.jsonl），返回被删除的日志路径"""
+    journals = sorted(Path(journal_dir).glob("run-*.jsonl"), key=lambda p: p.stat().st_mtime, reverse=True)
+    removed = journals[max(0, keep):]
+    for path in removed:
+        path.unlink(missing_ok=True)
+    return removed
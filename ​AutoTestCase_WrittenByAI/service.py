@@ -0,0 +1,297 @@
+from config import Config
+from document_parser import DocumentParser
+from test_case_generator import TestCaseGenerator
+from output_handler import OutputHandler
+from parse_cache import file_sha256
+from llm_cache import CACHE_MODES
+from run import finalize_cases, start_profile, save_profile
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Tuple
+import argparse
+import json
+import threading
+import time
+import uuid
+
+'''
+常驻生成服务，提供本地 HTTP/JSON 接口。
+进程启动时创建一次 TestCaseGenerator（复用同一个 OpenAI 客户端连接池、请求调度器和响应缓存），
+解析过的功能规范、信号矩阵及其信号索引按文件内容哈希保存在内存中，
+重复提交相同文档的任务只需等待大模型响应。
+
+接口：
+- POST /jobs           提交任务 {"pdf": 路径, "signals": [路径], "formats": ["xlsx"], "cache_mode": "use"}，返回 job_id
+                       （formats、cache_mode 可省略，默认取配置）
+- GET  /jobs/<job_id>  查询任务状态、耗时和输出文件
+- GET  /jobs/<job_id>/cases  获取生成的测试用例
+- GET  /health         服务状态、文档缓存和请求调度统计
+'''
+
+
+class DocumentCache:
+    """按文件内容哈希缓存解析结果的内存 LRU 缓存"""
+
+    def __init__(self, max_entries: int = 32):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Tuple[str, ...], Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._key_locks: Dict[Tuple[str, ...], threading.Lock] = {}
+
+    def get_or_load(self, key: Tuple[str, ...], loader) -> Tuple[Any, bool]:
+        """返回 (缓存值, 是否命中)；同一键并发请求时只解析一次"""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key], True
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            try:
+                with self._lock:
+                    if key in self._entries:
+                        self.hits += 1
+                        return self._entries[key], True
+                value = loader()
+                with self._lock:
+                    self.misses += 1
+                    self._entries[key] = value
+                    while len(self._entries) > self.max_entries:
+                        self._entries.popitem(last=False)
+                return value, False
+            finally:
+                # 解析失败时也要释放键锁，等待中的请求会重新尝试解析
+                with self._lock:
+                    self._key_locks.pop(key, None)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+class GenerationService:
+    def __init__(self, config):
+        self.config = config
+        self.generator = TestCaseGenerator(config)
+        self.output_handler = OutputHandler(config)
+        self.documents = DocumentCache(config.SERVICE_DOCUMENT_CACHE_SIZE)
+        self.jobs: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        # 任务字典由任务线程修改、由请求线程读取，所有修改和快照都在该锁内进行
+        self._jobs_lock = threading.Lock()
+        # 任务线程负责解析和汇总，请求线程池在所有任务之间共享，实际并发由调度器控制
+        self._job_pool = ThreadPoolExecutor(max_workers=config.SERVICE_JOB_WORKERS)
+        self._request_pool = ThreadPoolExecutor(max_workers=self.generator.scheduler.max_concurrency)
+        self.started = time.time()
+        # 启用剖析时在服务的整个生命周期内累计各阶段耗时和 token 用量，停止服务时写出
+        self.profiler = start_profile(config)
+
+    def submit(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """校验任务参数并加入队列"""
+        pdf_path = Path(payload.get("pdf") or "")
+        signal_paths = payload.get("signals") or []
+        if isinstance(signal_paths, str):
+            signal_paths = [signal_paths]
+        signal_paths = [Path(path) for path in signal_paths]
+        missing = [str(path) for path in [pdf_path] + signal_paths if not path.is_file()]
+        if missing or not signal_paths:
+            raise ValueError(f"输入文件不存在: {', '.join(missing)}" if missing else "缺少信号矩阵文件 signals")
+        formats = payload.get("formats") or self.config.OUTPUT_FORMATS
+        self.output_handler.validate_formats(formats)
+        cache_mode = payload.get("cache_mode") or self.config.LLM_CACHE_MODE
+        if cache_mode not in CACHE_MODES:
+            raise ValueError(f"不支持的缓存模式 cache_mode: {cache_mode}")
+
+        job = {
+            "id": uuid.uuid4().hex[:12],
+            "status": "queued",
+            "pdf": str(pdf_path),
+            "signals": [str(path) for path in signal_paths],
+            "formats": formats,
+            "cache_mode": cache_mode,
+            "created": time.time(),
+            "timings": {},
+            "document_cache_hit": None,
+            "requests": 0,
+            "test_cases": 0,
+            "outputs": {},
+            "error": None
+        }
+        with self._jobs_lock:
+            self.jobs[job["id"]] = job
+            self._trim_jobs()
+        self._job_pool.submit(self._run_job, job, pdf_path, signal_paths)
+        return self.snapshot(job["id"])
+
+    def _trim_jobs(self) -> None:
+        """只保留最近的 SERVICE_MAX_JOBS 个已结束任务"""
+        finished = [job_id for job_id, job in self.jobs.items() if job["status"] in ("done", "failed")]
+        for job_id in finished[:max(0, len(self.jobs) - self.config.SERVICE_MAX_JOBS)]:
+            del self.jobs[job_id]
+
+    def _update(self, job: Dict[str, Any], timings: Optional[Dict[str, float]] = None, **fields) -> None:
+        """在锁内修改任务字段和耗时"""
+        with self._jobs_lock:
+            job.update(fields)
+            if timings:
+                job["timings"].update(timings)
+
+    def _load_documents(self, pdf_path: Path, signal_paths: List[Path]) -> Tuple[Dict[str, Any], bool]:
+        """按文件哈希读取或解析需求文本、信号矩阵和信号索引"""
+        pdf_key = ("pdf", file_sha256(pdf_path))
+        signals_key = ("signals",) + tuple(file_sha256(path) for path in signal_paths)
+        # 每个任务使用独立的解析器，signal_conflicts 等解析状态不会被并发任务覆盖
+        parser = DocumentParser(self.config)
+
+        requirements, pdf_hit = self.documents.get_or_load(pdf_key, lambda: parser.parse_pdf(pdf_path))
+
+        def load_signals():
+            signals = parser.parse_signal_matrices(signal_paths)
+            return signals, self.generator._build_signal_index(signals)
+
+        (signals, signal_index), signals_hit = self.documents.get_or_load(signals_key, load_signals)
+        return {"requirements": requirements, "signals": signals, "signal_index": signal_index}, \
+            pdf_hit and signals_hit
+
+    def _run_job(self, job: Dict[str, Any], pdf_path: Path, signal_paths: List[Path]) -> None:
+        start = time.perf_counter()
+        try:
+            self._update(job, status="parsing")
+            documents, cache_hit = self._load_documents(pdf_path, signal_paths)
+            self._update(job, document_cache_hit=cache_hit, status="generating",
+                         timings={"parse": round(time.perf_counter() - start, 3)})
+
+            generate_start = time.perf_counter()
+            test_cases = []
+            if documents["requirements"]:
+                requests, _ = self.generator.plan_requests(
+                    documents["requirements"], documents["signals"], documents["signal_index"]
+                )
+                self._update(job, requests=len(requests))
+                futures = [self._request_pool.submit(self.generator.generate_request, request,
+                                                     documents["signals"], documents["signal_index"],
+                                                     job["cache_mode"])
+                           for request in requests]
+                test_cases = [case for future in futures for case in future.result()]
+            self._update(job, timings={"generate": round(time.perf_counter() - generate_start, 3)})
+
+            test_cases = finalize_cases(self.config, test_cases, documents["signals"])
+            job_dir = self.config.OUTPUTS_DIR / "service" / job["id"]
+            job_dir.mkdir(parents=True, exist_ok=True)
+            outputs = {}
+            if test_cases:
+                outputs = {fmt: str(path) for fmt, path in self.output_handler.save(
+                    test_cases, job["formats"], job_dir / "TestCases").items()}
+            self._update(job, outputs=outputs, cases=test_cases, test_cases=len(test_cases), status="done",
+                         timings={"total": round(time.perf_counter() - start, 3)})
+        except Exception as e:
+            self._update(job, error=f"{type(e).__name__}: {e}", status="failed",
+                         timings={"total": round(time.perf_counter() - start, 3)})
+
+    def snapshot(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """任务状态的副本（不含测试用例），任务不存在时返回 None"""
+        with self._jobs_lock:
+            job = self.jobs.get(job_id)
+            if job is None:
+                return None
+            public = {key: value for key, value in job.items() if key != "cases"}
+            public["timings"] = dict(job["timings"])
+            public["outputs"] = dict(job["outputs"])
+            return public
+
+    def cases(self, job_id: str) -> Tuple[Optional[str], Optional[List[Dict[str, Any]]]]:
+        """返回 (任务状态, 测试用例)，任务不存在时状态为 None，未完成时测试用例为 None"""
+        with self._jobs_lock:
+            job = self.jobs.get(job_id)
+            if job is None:
+                return None, None
+            return job["status"], job.get("cases")
+
+    def health(self) -> Dict[str, Any]:
+        with self._jobs_lock:
+            statuses = [job["status"] for job in self.jobs.values()]
+        return {
+            "status": "ok",
+            "uptime": round(time.time() - self.started, 1),
+            "jobs": {status: statuses.count(status) for status in set(statuses)},
+            "documents": self.documents.stats(),
+            "scheduler": self.generator.scheduler.stats(),
+            "cache": self.generator.response_cache.stats() if self.generator.response_cache else None,
+            "profile": self.profiler.summary(self.config.LLM_PROMPT_PRICE_PER_1K,
+                                             self.config.LLM_COMPLETION_PRICE_PER_1K) if self.profiler else None
+        }
+
+    def shutdown(self) -> None:
+        self._job_pool.shutdown(wait=False)
+        self._request_pool.shutdown(wait=False)
+        save_profile(self.config, self.profiler, generator=self.generator)
+        self.profiler = None
+
+
+def make_handler(service: GenerationService):
+    class ServiceHandler(BaseHTTPRequestHandler):
+        def _send(self, status: int, body: Any) -> None:
+            data = json.dumps(body, ensure_ascii=False, default=str).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            parts = [part for part in self.path.split("?")[0].split("/") if part]
+            if parts == ["health"]:
+                return self._send(200, service.health())
+            if len(parts) in (2, 3) and parts[0] == "jobs":
+                job = service.snapshot(parts[1])
+                if job is None:
+                    return self._send(404, {"error": "任务不存在"})
+                if len(parts) == 2:
+                    return self._send(200, job)
+                if parts[2] == "cases":
+                    status, cases = service.cases(parts[1])
+                    if status != "done":
+                        return self._send(409, {"error": f"任务状态为 {status}"})
+                    return self._send(200, cases)
+            self._send(404, {"error": "未知接口"})
+
+        def do_POST(self):
+            if self.path.split("?")[0].rstrip("/") != "/jobs":
+                return self._send(404, {"error": "未知接口"})
+            try:
+                length = int(self.headers.get("Content-Length") or 0)
+                payload = json.loads(self.rfile.read(length) or b"{}")
+                return self._send(202, service.submit(payload))
+            except (ValueError, TypeError) as e:
+                return self._send(400, {"error": str(e)})
+
+        def log_message(self, format, *args):
+            pass
+
+    return ServiceHandler
+
+
+def main(argv=None):
+    config = Config()
+    arg_parser = argparse.ArgumentParser(description="测试用例生成常驻服务")
+    arg_parser.add_argument("--host", default=config.SERVICE_HOST)
+    arg_parser.add_argument("--port", type=int, default=config.SERVICE_PORT)
+    args = arg_parser.parse_args(argv)
+
+    service = GenerationService(config)
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(service))
+    print(f"🚀 测试用例生成服务已启动: http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n🛑 服务已停止")
+    finally:
+        server.server_close()
+        service.shutdown()
+
+
+if __name__ == "__main__":
+    main()
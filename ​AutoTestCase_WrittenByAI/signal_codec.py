@@ -0,0 +1,259 @@
+import numpy as np
+from typing import List, Dict, Any, Optional, Tuple
+from signal_utils import to_number
+
+'''
+定义了 SignalCodec 类，根据 CAN 信号矩阵的起始位、位长度、精度和偏移，
+将测试用例中的 input_signal 物理值/原始值打包为 CAN（8字节）或 CAN-FD（64字节）报文数据，
+并支持将报文数据批量解包为物理值。
+每个信号的位位置在构造时预先计算，编解码阶段对整套测试用例使用 NumPy 批量运算，
+不再逐信号、逐位进行 Python 循环。
+原始值以整数参与打包和解包，64 位信号的原始值不经过 float64，不会丢失精度。
+'''
+
+MAX_FRAME_BITS = 512  # CAN-FD 最大 64 字节
+# 取值越界类问题的说明
+RAW_OUT_OF_RANGE = "原始值超出信号位宽"
+PHYSICAL_OUT_OF_RANGE = "物理值超出信号取值范围"
+
+
+def _normalize_byte_order(value: Any) -> str:
+    """将矩阵中的排列格式统一为 intel / motorola（起始位为MSB）/ motorola_lsb（起始位为LSB）"""
+    text = str(value or "").lower()
+    if "motorola" in text or "big" in text:
+        return "motorola_lsb" if "lsb" in text else "motorola"
+    return "intel"
+
+
+def _bit_positions(start_bit: int, bit_length: int, byte_order: str) -> List[int]:
+    """计算信号各位在报文中的位置（字节序号*8+字节内位号），按权重从低到高排列"""
+    if byte_order == "intel":
+        return [start_bit + k for k in range(bit_length)]
+    positions = []
+    position = start_bit
+    if byte_order == "motorola_lsb":
+        for _ in range(bit_length):
+            positions.append(position)
+            position = position - 15 if position % 8 == 7 else position + 1
+        return positions
+    for _ in range(bit_length):
+        positions.append(position)
+        position = position + 15 if position % 8 == 0 else position - 1
+    return positions[::-1]
+
+
+class SignalCodec:
+    def __init__(self, signals: Dict[str, Dict[str, Any]], can_fd: bool = False):
+        self.names: List[str] = []
+        self.index: Dict[str, int] = {}
+        self.messages: Dict[str, List[int]] = {}
+        self.skipped: Dict[str, str] = {}
+        self.value_tables: List[Dict[str, int]] = []
+
+        messages, lengths, factors, offsets, signed = [], [], [], [], []
+        phys_min, phys_max, bit_start = [], [], []
+        bit_pos, bit_weight = [], []
+        for name, info in signals.items():
+            start_bit = to_number(info.get("start_bit"))
+            bit_length = to_number(info.get("bit_length"))
+            if start_bit is None or not bit_length or not 0 < bit_length <= 64:
+                self.skipped[name] = "缺少有效的起始位或位长度"
+                continue
+            positions = _bit_positions(int(start_bit), int(bit_length),
+                                       _normalize_byte_order(info.get("byte_order")))
+            if min(positions) < 0 or max(positions) >= MAX_FRAME_BITS:
+                self.skipped[name] = "信号位置超出CAN-FD报文长度"
+                continue
+
+            signal_idx = len(self.names)
+            self.names.append(name)
+            self.index[name] = signal_idx
+            message_name = str(info.get("message_name") or "")
+            self.messages.setdefault(message_name, []).append(signal_idx)
+            messages.append(message_name)
+            lengths.append(int(bit_length))
+            factors.append(to_number(info.get("factor")) or 1)
+            offsets.append(to_number(info.get("offset")) or 0)
+            signed.append(bool(info.get("is_signed")))
+
+            low = high = None
+            value_range = str(info.get("value_range") or "")
+            if "~" in value_range:
+                low, high = (to_number(part) for part in value_range.split("~", 1))
+            phys_min.append(np.nan if low is None else low)
+            phys_max.append(np.nan if high is None else high)
+
+            bit_start.append(len(bit_pos))
+            bit_pos.extend(positions)
+            bit_weight.extend(range(int(bit_length)))
+            value_table = info.get("value_table") or {}
+            self.value_tables.append({str(label).strip().lower(): int(raw)
+                                      for raw, label in value_table.items()})
+
+        self.message_of = np.array(messages, dtype=object)
+        self.bit_length = np.array(lengths, dtype=np.int64)
+        self.factor = np.array(factors, dtype=np.float64)
+        self.offset = np.array(offsets, dtype=np.float64)
+        self.signed = np.array(signed, dtype=bool)
+        self.phys_min = np.array(phys_min, dtype=np.float64)
+        self.phys_max = np.array(phys_max, dtype=np.float64)
+        self.bit_start = np.array(bit_start, dtype=np.int64)
+        self.bit_pos = np.array(bit_pos, dtype=np.int64)
+        self.bit_weight = np.array(bit_weight, dtype=np.uint64)
+
+        # 原始值的有效范围（有符号信号按补码）
+        self.raw_min = np.where(self.signed, -(2.0 ** (self.bit_length - 1)), 0.0)
+        self.raw_max = np.where(self.signed, 2.0 ** (self.bit_length - 1) - 1, 2.0 ** self.bit_length - 1)
+
+        # 报文长度：全部信号位于前64位且非CAN-FD时为8字节，否则为64字节
+        self.frame_bytes: Dict[str, int] = {}
+        for message_name, signal_ids in self.messages.items():
+            last_bit = max(int(self.bit_pos[self.bit_start[i]:self.bit_start[i] + self.bit_length[i]].max())
+                           for i in signal_ids)
+            self.frame_bytes[message_name] = 64 if can_fd or last_bit >= 64 else 8
+
+    def physical_to_raw(self, signal_ids: np.ndarray, physical: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """批量将物理值转换为原始值，返回 (原始值, 是否可由位宽表示)"""
+        raw = np.round((physical - self.offset[signal_ids]) / self.factor[signal_ids])
+        return raw, (raw >= self.raw_min[signal_ids]) & (raw <= self.raw_max[signal_ids])
+
+    def pack(self, frame_ids: np.ndarray, signal_ids: np.ndarray, raw: np.ndarray,
+             frame_count: int) -> np.ndarray:
+        """批量打包：将 (报文序号, 信号序号, 原始值) 三元组写入 frame_count 个 64 字节报文
+
+        raw 为 uint64 时视为已截取的补码位模式，否则按有符号整数转换。
+        """
+        counts = self.bit_length[signal_ids]
+        repeat = np.repeat(np.arange(len(signal_ids)), counts)
+        first = np.cumsum(counts) - counts
+        flat = self.bit_start[signal_ids][repeat] + (np.arange(counts.sum()) - np.repeat(first, counts))
+
+        # 有符号值按补码截取到信号位宽
+        raw_bits = raw if raw.dtype == np.uint64 else raw.astype(np.int64).view(np.uint64)
+        bit_values = (raw_bits[repeat] >> self.bit_weight[flat]) & np.uint64(1)
+        set_bits = bit_values.astype(bool)
+
+        bits = np.zeros((frame_count, MAX_FRAME_BITS), dtype=np.uint8)
+        bits[frame_ids[repeat][set_bits], self.bit_pos[flat][set_bits]] = 1
+        return np.packbits(bits, axis=1, bitorder="little")
+
+    def decode(self, message_name: str, payloads: np.ndarray) -> Dict[str, np.ndarray]:
+        """批量解包同一报文的多帧数据，返回 {信号名称: 物理值数组}"""
+        payloads = np.atleast_2d(np.asarray(payloads, dtype=np.uint8))
+        bits = np.zeros((payloads.shape[0], MAX_FRAME_BITS), dtype=np.uint64)
+        unpacked = np.unpackbits(payloads, axis=1, bitorder="little")
+        bits[:, :unpacked.shape[1]] = unpacked
+
+        signal_ids = np.array(self.messages.get(message_name, []), dtype=np.int64)
+        if not len(signal_ids):
+            return {}
+        counts = self.bit_length[signal_ids]
+        first = np.cumsum(counts) - counts
+        flat = np.repeat(self.bit_start[signal_ids] - first, counts) + np.arange(counts.sum())
+
+        weighted = bits[:, self.bit_pos[flat]] << self.bit_weight[flat]
+        raw = np.add.reduceat(weighted, first, axis=1)
+        # 有符号信号左移到最高位后算术右移，完成补码的符号扩展
+        shift = (64 - counts).astype(np.uint64)
+        signed_raw = (raw << shift).view(np.int64) >> shift.astype(np.int64)
+        raw = np.where(self.signed[signal_ids], signed_raw.astype(np.float64), raw.astype(np.float64))
+        physical = raw * self.factor[signal_ids] + self.offset[signal_ids]
+        return {self.names[signal_id]: physical[:, column] for column, signal_id in enumerate(signal_ids)}
+
+    def _parse_value(self, signal_idx: int, value: Any) -> Tuple[Optional[str], Any]:
+        """解析 input_signal 的取值：十六进制视为原始值（整数），数字视为物理值，其余查信号值表"""
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return "physical", float(value)
+        text = str(value).strip()
+        if text.lower().startswith(("0x", "-0x")):
+            number = to_number(text)
+            return ("raw", number) if number is not None else (None, 0.0)
+        number = to_number(text)
+        if number is not None:
+            return "physical", float(number)
+        raw = self.value_tables[signal_idx].get(text.lower())
+        return ("raw", raw) if raw is not None else (None, 0.0)
+
+    def encode_cases(self, test_cases: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """将整套测试用例的 input_signal 打包为报文数据，并校验取值
+
+        返回字典包含：
+        - frames: [{"case": 用例序号, "message": 报文名称, "length": 字节数, "data": 十六进制数据}]
+        - issues: [{"case": 用例序号, "signal": 信号名称, "value": 原始取值, "reason": 问题说明}]
+        """
+        issues = []
+        frame_keys: Dict[Tuple[int, str], int] = {}
+        frame_ids, signal_ids, values, raw_ints, is_raw, origins = [], [], [], [], [], []
+        for case_idx, case in enumerate(test_cases):
+            input_signal = case.get("input_signal") or {}
+            if not isinstance(input_signal, dict):
+                continue
+            for name, value in input_signal.items():
+                signal_idx = self.index.get(name)
+                if signal_idx is None:
+                    issues.append({"case": case_idx, "signal": name, "value": value,
+                                   "reason": self.skipped.get(name, "信号不在信号矩阵中")})
+                    continue
+                kind, number = self._parse_value(signal_idx, value)
+                if kind is None:
+                    issues.append({"case": case_idx, "signal": name, "value": value,
+                                   "reason": "无法解析的信号取值"})
+                    continue
+                key = (case_idx, self.message_of[signal_idx])
+                frame_ids.append(frame_keys.setdefault(key, len(frame_keys)))
+                signal_ids.append(signal_idx)
+                values.append(float(number) if kind == "physical" else 0.0)
+                raw_ints.append(int(number) if kind == "raw" else None)
+                is_raw.append(kind == "raw")
+                origins.append((case_idx, name, value))
+
+        if not signal_ids:
+            return {"frames": [], "issues": issues}
+
+        frame_ids = np.array(frame_ids, dtype=np.int64)
+        signal_ids = np.array(signal_ids, dtype=np.int64)
+        values = np.array(values, dtype=np.float64)
+        is_raw = np.array(is_raw, dtype=bool)
+
+        raw, encodable = self.physical_to_raw(signal_ids, values)
+        raw_bits = np.zeros(len(signal_ids), dtype=np.uint64)
+        from_physical = ~is_raw & encodable
+        raw_bits[from_physical] = raw[from_physical].astype(np.int64).view(np.uint64)
+        # 直接给出的原始值按整数精确校验和截取
+        for position in np.flatnonzero(is_raw):
+            value = raw_ints[position]
+            length = int(self.bit_length[signal_ids[position]])
+            if self.signed[signal_ids[position]]:
+                # 按无符号十六进制给出时，转换为补码对应的负数
+                if 1 << (length - 1) <= value < 1 << length:
+                    value -= 1 << length
+                low, high = -(1 << (length - 1)), (1 << (length - 1)) - 1
+            else:
+                low, high = 0, (1 << length) - 1
+            encodable[position] = low <= value <= high
+            raw[position] = value
+            if encodable[position]:
+                raw_bits[position] = value & 0xFFFFFFFFFFFFFFFF
+
+        physical = np.where(is_raw, raw * self.factor[signal_ids] + self.offset[signal_ids], values)
+        in_range = ~((physical < self.phys_min[signal_ids]) | (physical > self.phys_max[signal_ids]))
+        for position in np.flatnonzero(~encodable | ~in_range):
+            case_idx, name, value = origins[position]
+            reason = RAW_OUT_OF_RANGE if not encodable[position] else PHYSICAL_OUT_OF_RANGE
+            issues.append({"case": case_idx, "signal": name, "value": value, "reason": reason})
+
+        payloads = self.pack(frame_ids[encodable], signal_ids[encodable], raw_bits[encodable], len(frame_keys))
+        frames = []
+        for (case_idx, message_name), frame_idx in frame_keys.items():
+            length = self.frame_bytes[message_name]
+            frames.append({
+                "case": case_idx,
+                "message": message_name,
+                "length": length,
+                "data": payloads[frame_idx, :length].tobytes().hex().upper()
+            })
+        return {"frames": frames, "issues": issues}
+
+    def validate_cases(self, test_cases: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """校验测试用例 input_signal 是否与信号矩阵布局一致，返回问题列表"""
+        return self.encode_cases(test_cases)["issues"]
@@ -0,0 +1,76 @@
+from typing import Any, Dict, List, Optional
+from pattern_matcher import AhoCorasick
+
+'''
+定义了 SignalIndex 类，基于 parse_excel 的输出建立信号倒排索引。
+索引以信号名称、报文名称及可选别名为关键字编译成多模式匹配自动机，
+对每个需求块只扫描一遍文本即可找出实际提及的信号，
+并以紧凑的表格形式序列化，替代整份信号矩阵写入提示词。
+'''
+
+# 紧凑序列化时输出的信号字段及表头
+COMPACT_FIELDS = [
+    ("message_name", "报文"),
+    ("start_bit", "起始位"),
+    ("bit_length", "长度"),
+    ("factor", "因子"),
+    ("offset", "偏置"),
+    ("unit", "单位"),
+    ("value_range", "范围"),
+]
+
+
+def _is_word_char(char: str) -> bool:
+    return char.isascii() and (char.isalnum() or char == "_")
+
+
+class SignalIndex:
+    def __init__(self, signals: Dict[str, Dict[str, Any]],
+                 aliases: Optional[Dict[str, List[str]]] = None):
+        self.signals = signals
+        self.matcher = AhoCorasick()
+        self.message_signals: Dict[str, List[str]] = {}
+
+        for name, info in signals.items():
+            self.matcher.add(str(name), ("signal", name))
+            message_name = info.get("message_name") if isinstance(info, dict) else None
+            if message_name:
+                self.message_signals.setdefault(str(message_name), []).append(name)
+        for message_name in self.message_signals:
+            self.matcher.add(message_name, ("message", message_name))
+        for name, alias_list in (aliases or {}).items():
+            if name in signals:
+                for alias in alias_list:
+                    self.matcher.add(alias, ("signal", name))
+        self.matcher.build()
+
+    def lookup(self, text: str) -> List[str]:
+        """返回文本中提及的信号名称（报文名称命中时包含该报文的全部信号），按首次出现顺序"""
+        found: Dict[str, None] = {}
+        for start, end, (kind, name) in self.matcher.iter_matches(text):
+            # 英文标识符要求完整匹配，避免 VCU_ActGear 命中 VCU_ActGear_VD
+            if _is_word_char(text[start]) and start > 0 and _is_word_char(text[start - 1]):
+                continue
+            if _is_word_char(text[end - 1]) and end < len(text) and _is_word_char(text[end]):
+                continue
+            if kind == "signal":
+                found.setdefault(name, None)
+            else:
+                for signal_name in self.message_signals[name]:
+                    found.setdefault(signal_name, None)
+        return list(found)
+
+    def select(self, text: str) -> Dict[str, Dict[str, Any]]:
+        """返回文本中提及的信号子集"""
+        return {name: self.signals[name] for name in self.lookup(text)}
+
+    @staticmethod
+    def format_compact(signals: Dict[str, Dict[str, Any]]) -> str:
+        """以“|”分隔的表格形式序列化信号，比缩进JSON节省大量输入token"""
+        if not signals:
+            return "（未检测到相关信号）"
+        lines = ["信号|" + "|".join(title for _, title in COMPACT_FIELDS)]
+        for name, info in signals.items():
+            values = ["" if info.get(field) is None else str(info.get(field)) for field, _ in COMPACT_FIELDS]
+            lines.append(f"{name}|" + "|".join(values))
+        return "\n".join(lines)
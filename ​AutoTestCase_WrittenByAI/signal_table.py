@@ -0,0 +1,219 @@
+import sys
+from array import array
+from collections.abc import MutableMapping
+from typing import Any, Dict, Iterator, List, Optional
+
+'''
+定义了 SignalTable 类，以列式结构保存 CAN 信号矩阵。
+数值字段（起始位、位长度、精度、偏移、最小/最大值）保存在类型化数组中，
+信号名称、报文名称和单位使用驻留字符串，按名称查找为 O(1)。
+SignalTable 提供与原 Dict[str, Dict[str, Any]] 相同的字典式读取接口，
+读取时才按需组装单个信号的字典，因此现有调用方无需修改；
+内存占用约为嵌套字典的四分之一，跨进程传递时也只需序列化少量数组对象。
+'''
+
+# 与 parse_excel 原有输出一致的标准字段顺序
+STANDARD_FIELDS = ("message_name", "start_bit", "bit_length", "factor", "offset", "unit", "value_range")
+NUMERIC_FIELDS = ("start_bit", "bit_length", "factor", "offset", "min_value", "max_value")
+INTEGER_FIELDS = ("start_bit", "bit_length")
+
+# 数值列的类型标记：原值为浮点 / 整数 / 其它（None、字符串等，保存在 overrides 中）
+_FLOAT, _INT, _OTHER = 0, 1, 2
+
+
+def _intern(value: Any) -> Any:
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def _parse_range_part(text: str) -> Any:
+    """将 value_range 字符串中的一端还原为原始单元格值，保证重新格式化后与原字符串一致"""
+    if text == "None":
+        return None
+    try:
+        return int(text)
+    except ValueError:
+        pass
+    try:
+        number = float(text)
+        if repr(number) == text:
+            return number
+    except ValueError:
+        pass
+    return text
+
+
+class _NumericColumn:
+    """数值列：类型化数组 + 类型标记，无法用该数组表示的单元格保存在稀疏字典中
+
+    typecode 为 'i' 时只存整数（起始位、位长度），为 'd' 时存整数和浮点数。
+    """
+    __slots__ = ("typecode", "values", "kinds", "overrides")
+
+    def __init__(self, typecode: str = 'd'):
+        self.typecode = typecode
+        self.values = array(typecode)
+        self.kinds = bytearray()
+        self.overrides: Dict[int, Any] = {}
+
+    def append(self, value: Any) -> None:
+        self.values.append(0)
+        self.kinds.append(_OTHER)
+        self.set(len(self.kinds) - 1, value)
+
+    def set(self, row: int, value: Any) -> None:
+        self.overrides.pop(row, None)
+        if isinstance(value, int) and not isinstance(value, bool) and self._fits(value):
+            self.values[row] = value
+            self.kinds[row] = _INT
+        elif isinstance(value, float) and self.typecode == 'd':
+            self.values[row] = value
+            self.kinds[row] = _FLOAT
+        else:
+            self.values[row] = 0
+            self.kinds[row] = _OTHER
+            self.overrides[row] = _intern(value)
+
+    def _fits(self, value: int) -> bool:
+        if self.typecode == 'i':
+            return -(1 << 31) <= value < (1 << 31)
+        return -(1 << 53) <= value <= (1 << 53)
+
+    def get(self, row: int) -> Any:
+        kind = self.kinds[row]
+        if kind == _INT:
+            return int(self.values[row])
+        if kind == _FLOAT:
+            return self.values[row]
+        return self.overrides.get(row)
+
+
+class SignalTable(MutableMapping):
+    __slots__ = ("names", "message_names", "units", "columns", "extras", "standard", "_index")
+
+    def __init__(self, signals: Optional[Dict[str, Dict[str, Any]]] = None):
+        self.names: List[str] = []
+        self.message_names: List[Any] = []
+        self.units: List[Any] = []
+        self.columns: Dict[str, _NumericColumn] = {
+            field: _NumericColumn('i' if field in INTEGER_FIELDS else 'd') for field in NUMERIC_FIELDS
+        }
+        self.extras: Dict[int, Dict[str, Any]] = {}  # 非标准字段（值表、字节序等），稀疏保存
+        self.standard = bytearray()  # 1 表示该行包含标准字段
+        self._index: Dict[str, int] = {}
+        if signals:
+            self.update(signals)
+
+    @classmethod
+    def from_dict(cls, signals: Dict[str, Dict[str, Any]]) -> "SignalTable":
+        return cls(signals)
+
+    def to_dict(self) -> Dict[str, Dict[str, Any]]:
+        return {name: self[name] for name in self}
+
+    def append_row(self, name: str, message_name: Any, start_bit: Any, bit_length: Any,
+                   factor: Any, offset: Any, unit: Any, min_value: Any, max_value: Any,
+                   extra: Optional[Dict[str, Any]] = None) -> None:
+        """按列写入一个信号；同名信号覆盖原有数据并保留原位置，与字典赋值语义一致"""
+        row = self._index.get(name)
+        if row is None:
+            row = len(self.names)
+            self._index[_intern(name)] = row
+            self.names.append(_intern(name))
+            self.message_names.append(_intern(message_name))
+            self.units.append(_intern(unit))
+            for field, value in zip(NUMERIC_FIELDS, (start_bit, bit_length, factor, offset, min_value, max_value)):
+                self.columns[field].append(value)
+            self.standard.append(1)
+        else:
+            self.message_names[row] = _intern(message_name)
+            self.units[row] = _intern(unit)
+            for field, value in zip(NUMERIC_FIELDS, (start_bit, bit_length, factor, offset, min_value, max_value)):
+                self.columns[field].set(row, value)
+            self.standard[row] = 1
+        if extra:
+            self.extras[row] = dict(extra)
+        else:
+            self.extras.pop(row, None)
+
+    def field(self, name: str, field: str) -> Any:
+        """读取单个字段，不组装整行字典"""
+        row = self._index[name]
+        if field == "message_name":
+            return self.message_names[row]
+        if field == "unit":
+            return self.units[row]
+        if field in self.columns:
+            return self.columns[field].get(row)
+        if field == "value_range":
+            return self[name].get("value_range")
+        return self.extras.get(row, {}).get(field)
+
+    def __getitem__(self, name: str) -> Dict[str, Any]:
+        row = self._index[name]
+        extra = self.extras.get(row)
+        if not self.standard[row]:
+            return dict(extra or {})
+        columns = self.columns
+        info = {
+            "message_name": self.message_names[row],
+            "start_bit": columns["start_bit"].get(row),
+            "bit_length": columns["bit_length"].get(row),
+            "factor": columns["factor"].get(row),
+            "offset": columns["offset"].get(row),
+            "unit": self.units[row],
+            "value_range": f"{columns['min_value'].get(row)}~{columns['max_value'].get(row)}"
+        }
+        if extra:
+            info.update(extra)
+        return info
+
+    def __setitem__(self, name: str, info: Dict[str, Any]) -> None:
+        """以字典形式写入信号；缺少标准字段的信号（如PDF中提取的信号属性）整体保存为附加字段"""
+        if not any(field in info for field in STANDARD_FIELDS):
+            row = self._index.get(name)
+            if row is None:
+                self.append_row(name, None, None, None, None, None, None, None, None)
+                row = self._index[name]
+            self.standard[row] = 0
+            self.extras[row] = dict(info)
+            return
+
+        min_value = max_value = None
+        value_range = info.get("value_range")
+        if isinstance(value_range, str) and "~" in value_range:
+            low, high = value_range.split("~", 1)
+            min_value, max_value = _parse_range_part(low), _parse_range_part(high)
+        extra = {key: value for key, value in info.items() if key not in STANDARD_FIELDS}
+        self.append_row(name, info.get("message_name"), info.get("start_bit"), info.get("bit_length"),
+                        info.get("factor"), info.get("offset"), info.get("unit"),
+                        min_value, max_value, extra)
+
+    def __delitem__(self, name: str) -> None:
+        # 只移除索引，列数据保留为不可达行，避免整体搬移数组
+        row = self._index.pop(name)
+        self.extras.pop(row, None)
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._index
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._index)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __repr__(self) -> str:
+        return f"SignalTable({len(self)} signals)"
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # 名称索引可由名称列重建，不参与序列化；仅在有删除时记录存活行
+        state = {slot: getattr(self, slot) for slot in self.__slots__ if slot != "_index"}
+        state["_live"] = None if len(self._index) == len(self.names) else list(self._index.values())
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        live = state.pop("_live")
+        for slot, value in state.items():
+            setattr(self, slot, value)
+        rows = range(len(self.names)) if live is None else live
+        self._index = {self.names[row]: row for row in rows}
@@ -0,0 +1,31 @@
+import math
+from typing import Any, Optional
+
+'''
+信号矩阵数值处理的公共函数。
+矩阵单元格中的数值可能是整数、浮点数、十进制或十六进制字符串，
+这里统一转换为数值，供边界值生成、信号编解码等模块使用。
+'''
+
+
+def to_number(value: Any) -> Optional[float]:
+    """将表格单元格内容转换为数值，支持十六进制字符串，无法转换或不是有限值（nan、inf、1e400）时返回 None"""
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return None if isinstance(value, float) and not math.isfinite(value) else value
+    text = str(value).strip()
+    try:
+        if text.lower().startswith(("0x", "-0x")):
+            return int(text, 16)
+        number = float(text)
+        if not math.isfinite(number):
+            return None
+        return int(number) if number.is_integer() else number
+    except ValueError:
+        return None
+
+
+def format_number(value: float) -> str:
+    """格式化物理值，整数不带小数部分"""
+    return str(int(value)) if float(value).is_integer() else f"{value:.6g}"
@@ -0,0 +1,167 @@
+import re
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+'''
+功能规范文本的单遍分词器。
+章节标题、功能需求编号和信号定义三组模式合并为一个带命名分组的正则表达式，
+每行只匹配一次即可得到该行的全部分类结果；各组内部按模式列表的先后顺序取第一个命中的模式。
+章节标题和功能需求编号必须从行首开始（与逐个模式调用 match 的结果一致），
+避免把行中间的 "IGN1" 之类的信号名、引脚号识别为需求编号；信号定义可出现在行内任意位置（与逐个模式调用 search 一致）。
+编号标题只接受不含句读的短行，"1.同时满足以下条件时，……：" 这类编号条款是需求而不是章节。
+tokenize 为生成器，输入可以是完整文本，也可以是逐页产出的文本片段，内存占用与单页大小相关；
+每个标记都带有该行在源文本中的字符位置，便于需求追溯。
+调用方可只指定需要的分组（kinds），只编译和匹配这些分组；不含数字、冒号和顿号的行不可能命中任何模式，直接跳过匹配。
+split_sections 基于分词结果将文本按章节标题切分，供文档解析和按章节分块生成共用。
+'''
+
+
+def _first_of(*patterns: str, anchored: bool = False) -> str:
+    """组合同一组的多个模式并按列表顺序尝试：anchored 为真时只在行首匹配，
+    否则每个模式取行内最靠左的命中，与依次调用 search 一致"""
+    if anchored:
+        return "|".join(f"(?:{pattern})" for pattern in patterns)
+    return "|".join(f".*?(?:{pattern})" for pattern in patterns)
+
+
+# 编号标题的标题文本：不以数字开头、不含句读的短行
+_TITLE = r'[^\d\s.．，,。；;：:][^，,。；;：:\n]{0,40}$'
+# 章节标题：标题为整行文本
+SECTION_PATTERNS = (
+    r'(?P<section_1>第\d+\s*章\s*[^\n]+)',                  # 标准章节格式
+    rf'(?P<section_2>[一二三四五六七八九十]+\s*、\s*{_TITLE})',  # 中文数字加顿号格式
+    rf'(?P<section_3>\d+\s*、\s*{_TITLE})',                   # 数字加顿号格式
+    rf'(?P<section_4>\d+(?:\.\d+)+\s*{_TITLE})',              # 多级编号格式
+    rf'(?P<section_5>\d+\s*[.．]\s*{_TITLE})',                 # 数字加小数点格式
+)
+# 功能需求：编号和描述首行；"需求：" 格式以冒号后的文本作为编号，整行作为描述
+REQUIREMENT_PATTERNS = (
+    r'(?P<req_1>\d+\.\d+(?:\.\d+)*)\s*(?P<req_1_desc>[^\n]+)',  # 多级编号
+    r'(?P<req_2>[A-Z]{2,3}_\d+)\s*(?P<req_2_desc>[^\n]+)',      # 类似 "ECU_001" 的编号
+    r'(?P<req_3>\d+)\s*、\s*(?P<req_3_desc>[^\n]+)',
+    r'(?P<req_4>\d+)\s*[.．]\s*(?P<req_4_desc>[^\d\s][^\n]*)', # "1.同时满足……" 编号条款
+    r'(?:需求|功能)\s*[:：]\s*(?P<req_5>[^\n]+)',                # "需求：" 开头的行
+)
+# 信号定义：信号名称和描述
+SIGNAL_PATTERNS = (
+    r'(?P<signal_1>[^\s]+)\s*信号\s*[:：]\s*(?P<signal_1_desc>[^\n]+)',  # 信号名称:描述 格式
+    r'信号\s*[:：]\s*(?P<signal_2>[^\s]+)\s*(?P<signal_2_desc>[^\n]+)',  # 信号:名称 描述 格式
+    r'(?P<signal_3>[^\s]+)\s*:\s*(?P<signal_3_desc>[^\n]+)',             # 名称:描述 通用格式
+)
+
+KINDS = ("section", "requirement", "signal")
+# 只在行首匹配的分组
+ANCHORED_KINDS = ("section", "requirement")
+_KIND_PATTERNS = {"section": SECTION_PATTERNS, "requirement": REQUIREMENT_PATTERNS, "signal": SIGNAL_PATTERNS}
+# 所有模式都要求行内有数字、冒号或顿号（中文数字章节标题）
+CANDIDATE_PATTERN = re.compile(r'[\d:：、]')
+
+
+class SpecToken(NamedTuple):
+    """非空文本行的分词结果，start / end 为去除首尾空白后的行在源文本中的位置"""
+    start: int
+    end: int
+    text: str
+    section: Optional[str] = None                  # 章节标题
+    requirement: Optional[Tuple[str, str]] = None  # (需求编号, 描述首行)
+    signal: Optional[Tuple[str, str]] = None       # (信号名称, 描述)
+
+
+class _Grammar(NamedTuple):
+    pattern: "re.Pattern"
+    # 每个分组的候选模式，按列表顺序为 (名称所在分组序号, 描述所在分组序号)；
+    # 描述为 None 表示取名称本身（章节标题），为 -1 表示取整行
+    fields: Tuple[Tuple[str, Tuple[Tuple[int, Optional[int]], ...]], ...]
+
+
+@lru_cache(maxsize=None)
+def _compile(kinds: Tuple[str, ...]) -> _Grammar:
+    """各组模式分别放在可选的先行断言中，同一行可同时是章节标题、需求和信号定义"""
+    pattern = re.compile("".join(
+        f"(?:(?={_first_of(*_KIND_PATTERNS[kind], anchored=kind in ANCHORED_KINDS)})|)" for kind in kinds
+    ))
+    index = {name: number - 1 for name, number in pattern.groupindex.items()}
+    fields = []
+    if "section" in kinds:
+        fields.append(("section", tuple((index[f"section_{n}"], None) for n in range(1, len(SECTION_PATTERNS) + 1))))
+    if "requirement" in kinds:
+        alternatives = [(index[f"req_{n}"], index[f"req_{n}_desc"]) for n in range(1, len(REQUIREMENT_PATTERNS))]
+        fields.append(("requirement", tuple(alternatives + [(index[f"req_{len(REQUIREMENT_PATTERNS)}"], -1)])))
+    if "signal" in kinds:
+        fields.append(("signal", tuple((index[f"signal_{n}"], index[f"signal_{n}_desc"]) for n in range(1, len(SIGNAL_PATTERNS) + 1))))
+    return _Grammar(pattern, tuple(fields))
+
+
+TOKEN_PATTERN = _compile(KINDS).pattern
+
+
+def _classify(grammar: _Grammar, text: str, start: int) -> SpecToken:
+    if not CANDIDATE_PATTERN.search(text):
+        return SpecToken(start, start + len(text), text)
+    match = grammar.pattern.match(text)
+    if match.lastindex is None:
+        return SpecToken(start, start + len(text), text)
+    values = match.groups()
+    found = {}
+    for field, alternatives in grammar.fields:
+        for value_index, desc_index in alternatives:
+            value = values[value_index]
+            if value is not None:
+                if desc_index is None:
+                    found[field] = value
+                else:
+                    found[field] = (value, text if desc_index < 0 else values[desc_index])
+                break
+    return SpecToken(start, start + len(text), text, **found)
+
+
+def _tokenize_lines(grammar: _Grammar, buffer: str, offset: int) -> Iterator[SpecToken]:
+    """分词 buffer 中的各行，offset 为 buffer 在源文本中的起始位置"""
+    position = offset
+    for line in buffer.split("\n"):
+        text = line.strip()
+        if text:
+            start = position if text[0] == line[0] else position + len(line) - len(line.lstrip())
+            yield _classify(grammar, text, start)
+        position += len(line) + 1
+
+
+def tokenize(source: Union[str, Iterable[str]], kinds: Iterable[str] = KINDS) -> Iterator[SpecToken]:
+    """逐行产出功能规范文本的分词结果，跳过空行
+
+    source 为字符串，或按顺序产出文本片段的可迭代对象（如逐页文本，片段可在行中间切分），
+    位置按所有片段首尾相接计算。kinds 为需要识别的分组，未指定的分组在标记中始终为 None。
+    """
+    kinds = set(kinds)
+    grammar = _compile(tuple(kind for kind in KINDS if kind in kinds))
+    if isinstance(source, str):
+        yield from _tokenize_lines(grammar, source, 0)
+        return
+    carry, offset = "", 0
+    for piece in source:
+        buffer = carry + piece
+        consumed = buffer.rfind("\n") + 1
+        if consumed:
+            yield from _tokenize_lines(grammar, buffer[:consumed - 1], offset)
+        carry, offset = buffer[consumed:], offset + consumed
+    if carry:
+        yield from _tokenize_lines(grammar, carry, offset)
+
+
+def split_sections(source: Union[str, Iterable[str]],
+                   preamble_title: Optional[str] = None) -> List[Dict[str, str]]:
+    """将文本按章节标题切分，返回 [{"title", "content"}]，标题行计入章节内容
+
+    第一个标题之前的内容默认丢弃；指定 preamble_title 时作为以该名称为标题的独立章节放在最前面。
+    """
+    sections = []
+    title, lines = preamble_title, []
+    for token in tokenize(source, kinds=("section",)):
+        if token.section is not None:
+            if title is not None and lines:
+                sections.append({"title": title, "content": "\n".join(lines)})
+            title, lines = token.section, []
+        lines.append(token.text)
+    if title is not None and lines:
+        sections.append({"title": title, "content": "\n".join(lines)})
+    return sections
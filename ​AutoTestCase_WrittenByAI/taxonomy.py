@@ -0,0 +1,140 @@
+import json
+import threading
+from bisect import bisect_right
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Tuple
+from pattern_matcher import AhoCorasick
+
+'''
+定义了 Taxonomy 类，按 config/config.json 中的 "taxonomy" 词表对功能需求和测试用例分类：
+功能需求的类型（Control / Monitoring 等），以及测试用例所属的功能、特性和测试组。
+词表中的全部关键字在加载时一次性编译为 Aho-Corasick 自动机，每段文本只扫描一遍；
+一批测试用例的文本拼接后整体扫描一次，再按位置分回各测试用例。
+
+命中多个关键字时按优先规则选择：priority 大者优先，其次关键字更长者优先（更具体），
+最后按词表中的先后顺序。测试组与特性取 coverage 中第一个有命中的覆盖项。
+配置文件中没有 taxonomy 时使用与原有判断一致的内置词表。
+'''
+
+DEFAULT_TAXONOMY = {
+    "function_types": [
+        {"name": "Control", "keywords": ["控制", "调节"]},
+        {"name": "Monitoring", "keywords": ["监测", "检测"]},
+        {"name": "Protection", "keywords": ["保护"]},
+        {"name": "Communication", "keywords": ["通信"]}
+    ],
+    "function_type_default": "Other",
+    "features": [
+        {"function": "外灯控制", "feature": "倒车灯功能", "test_group": "倒车灯", "keywords": ["倒车灯"]},
+        {"function": "门锁控制", "feature": "门锁功能", "test_group": "门锁", "keywords": ["门锁"]},
+        {"function": "雨刮控制", "feature": "雨刮功能", "test_group": "雨刮", "keywords": ["雨刮"]},
+        {"function": "电源管理", "feature": "电源管理功能", "test_group": "电源", "keywords": ["电源"]}
+    ],
+    "defaults": {"function": "功能控制", "feature": "其他功能", "test_group": "其他"}
+}
+
+# 拼接批量文本时使用的分隔符，不会出现在关键字中
+SEPARATOR = "\x00"
+
+
+class _RuleMatcher:
+    """将一组分类规则的关键字编译为自动机，命中值为 (排序键, 规则序号)"""
+
+    def __init__(self, rules: List[Dict[str, Any]]):
+        self.rules = rules
+        self.matcher = AhoCorasick()
+        for index, rule in enumerate(rules):
+            priority = rule.get("priority", 0)
+            for keyword in rule.get("keywords", []):
+                self.matcher.add(str(keyword), ((-priority, -len(keyword), index), index))
+        self.matcher.build()
+
+    def best(self, text: str) -> Optional[int]:
+        """返回文本命中的最优规则序号，没有命中时返回 None"""
+        best = None
+        for _, _, value in self.matcher.iter_matches(text):
+            if best is None or value[0] < best[0]:
+                best = value
+        return None if best is None else best[1]
+
+    def best_per_segment(self, segments: List[str]) -> List[Optional[int]]:
+        """将多段文本拼接后扫描一次，返回每段的最优规则序号"""
+        starts, offset = [], 0
+        for segment in segments:
+            starts.append(offset)
+            offset += len(segment) + 1
+        best: List[Optional[Tuple]] = [None] * len(segments)
+        for start, _, value in self.matcher.iter_matches(SEPARATOR.join(segments)):
+            segment = bisect_right(starts, start) - 1
+            if best[segment] is None or value[0] < best[segment][0]:
+                best[segment] = value
+        return [None if value is None else value[1] for value in best]
+
+
+class Taxonomy:
+    def __init__(self, taxonomy: Optional[Dict[str, Any]] = None):
+        taxonomy = taxonomy or DEFAULT_TAXONOMY
+        self.function_types = _RuleMatcher(taxonomy.get("function_types", []))
+        self.function_type_default = taxonomy.get("function_type_default", "Other")
+        self.features = _RuleMatcher(taxonomy.get("features", []))
+        self.defaults = dict(DEFAULT_TAXONOMY["defaults"], **taxonomy.get("defaults", {}))
+
+    @classmethod
+    def from_file(cls, config_path: Path) -> "Taxonomy":
+        """从配置文件读取 taxonomy 词表，文件不存在或没有该项时使用内置词表"""
+        config_path = Path(config_path)
+        if not config_path.exists():
+            return cls()
+        with open(config_path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f).get("taxonomy"))
+
+    def classify_function(self, description: str) -> str:
+        """功能需求的类型"""
+        index = self.function_types.best(description)
+        return self.function_type_default if index is None else self.function_types.rules[index]["name"]
+
+    def classify_case(self, case: Dict[str, Any]) -> Tuple[str, str, str]:
+        """返回测试用例的 (功能名称, 特性名称, 测试组名称)"""
+        return self.classify_cases([case])[0]
+
+    def classify_cases(self, test_cases: List[Dict[str, Any]]) -> List[Tuple[str, str, str]]:
+        """批量分类：所有描述拼接后扫描一次，所有覆盖项拼接后扫描一次"""
+        descriptions = [str(case.get("description", "")) for case in test_cases]
+        function_rules = self.features.best_per_segment(descriptions)
+
+        coverage_items, owners = [], []
+        for case_index, case in enumerate(test_cases):
+            coverage = case.get("coverage", [])
+            for item in [coverage] if isinstance(coverage, str) else coverage:
+                coverage_items.append(str(item))
+                owners.append(case_index)
+        coverage_rules: List[Optional[int]] = [None] * len(test_cases)
+        for owner, rule in zip(owners, self.features.best_per_segment(coverage_items)):
+            if coverage_rules[owner] is None:
+                coverage_rules[owner] = rule
+
+        rules = self.features.rules
+        results = []
+        for function_rule, coverage_rule in zip(function_rules, coverage_rules):
+            function = self.defaults["function"] if function_rule is None else rules[function_rule]["function"]
+            if coverage_rule is None:
+                results.append((function, self.defaults["feature"], self.defaults["test_group"]))
+            else:
+                results.append((function, rules[coverage_rule]["feature"], rules[coverage_rule]["test_group"]))
+        return results
+
+
+_cache: Dict[Tuple[str, float], Taxonomy] = {}
+_cache_lock = threading.Lock()
+
+
+def load_taxonomy(config_path: Path) -> Taxonomy:
+    """按路径和修改时间缓存已编译的词表，同一进程内只编译一次"""
+    config_path = Path(config_path)
+    mtime = config_path.stat().st_mtime if config_path.exists() else 0.0
+    key = (str(config_path), mtime)
+    with _cache_lock:
+        taxonomy = _cache.get(key)
+        if taxonomy is None:
+            taxonomy = _cache[key] = Taxonomy.from_file(config_path)
+        return taxonomy
@@ -1,53 +1,496 @@
 from openai import OpenAI
-from typing import List, Dict, Any, Optional
+from concurrent.futures import ThreadPoolExecutor
+from queue import Queue
+from typing import List, Dict, Any, Optional, Iterator, Tuple
 import json
+import threading
+from document_parser import extract_requirements
+from llm_scheduler import RateLimiter, RequestScheduler
+from llm_cache import LLMResponseCache
+from signal_index import SignalIndex
+from case_stream_parser import IncrementalCaseParser
+from run_journal import RunJournal
+from token_planner import TokenPlanner
+from traceability import TraceabilityEngine
+from spec_tokenizer import split_sections
+from taxonomy import load_taxonomy
+from profiler import profiled, annotate, record_usage
 
 '''
 定义了 TestCaseGenerator 类，其主要功能是根据输入的功能需求和 CAN 信号矩阵生成汽车电子测试用例。
 具体流程包括构建提示词、调用 AI 生成测试用例、解析 AI 响应等，
 当没有检测到功能需求时，会生成示例测试用例。
+improve_coverage 根据已生成测试用例的覆盖情况，只将未覆盖或缺少异常/边界用例的需求和信号
+以小批量的补充提示词重新交给 AI，直到覆盖不再提升或调用次数用完。
 '''
 
 
 class TestCaseGenerator:
     def __init__(self, config):
         self.config = config
+        # 重试由 RequestScheduler 统一负责，关闭客户端自带的重试
         self.client = OpenAI(
             api_key=config.API_KEY,
-            base_url=config.BASE_URL
+            base_url=config.BASE_URL,
+            timeout=config.LLM_TIMEOUT,
+            max_retries=0
         )
+        self.taxonomy = load_taxonomy(config.TAXONOMY_PATH)
+        self.rate_limiter = RateLimiter(config.LLM_REQUESTS_PER_MINUTE)
+        self.scheduler = RequestScheduler(
+            self.rate_limiter,
+            max_retries=config.LLM_MAX_RETRIES,
+            base_delay=config.LLM_RETRY_BASE_DELAY,
+            max_delay=config.LLM_RETRY_MAX_DELAY,
+            initial_concurrency=config.LLM_CONCURRENCY,
+            max_concurrency=config.LLM_MAX_CONCURRENCY,
+            adaptive=config.LLM_ADAPTIVE_CONCURRENCY
+        )
+        self.response_cache = LLMResponseCache(
+            config.LLM_CACHE_PATH,
+            max_entries=config.LLM_CACHE_MAX_ENTRIES,
+            max_bytes=config.LLM_CACHE_MAX_BYTES,
+            max_age_days=config.LLM_CACHE_MAX_AGE_DAYS
+        ) if config.LLM_CACHE_ENABLED else None
+        self.token_planner = TokenPlanner(
+            context_tokens=config.LLM_CONTEXT_TOKENS,
+            max_output_tokens=config.LLM_MAX_OUTPUT_TOKENS,
+            tokens_per_requirement=config.LLM_OUTPUT_TOKENS_PER_REQUIREMENT,
+            encoding=config.LLM_TOKENIZER_ENCODING
+        )
+        self.journal: Optional[RunJournal] = None
+        self.failed_calls = 0  # 调用失败（重试耗尽或流式中断）的请求数，调用方据此判断本次结果是否完整
+        self._failed_lock = threading.Lock()
         
     def generate(self, requirements: List[Dict[str, Any]], 
-                 signals: Dict[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """根据需求和信号生成测试用例"""
+                 signals: Dict[str, Dict[str, Any]],
+                 mode: Optional[str] = None,
+                 cache_mode: Optional[str] = None,
+                 journal: Optional[RunJournal] = None) -> List[Dict[str, Any]]:
+        """根据需求和信号生成测试用例
+
+        mode 为 "chunked" 时按章节分块并发生成，默认取 config.GENERATION_MODE。
+        cache_mode 控制本次运行的响应缓存：use / refresh / bypass，默认取 config.LLM_CACHE_MODE；
+        缓存模式逐次调用传递，同一生成器上并发的任务可以使用不同的缓存模式。
+        journal 为运行日志时，每个生成块完成后立即记录，日志中已完成的生成块直接回放。
+        """
         if not requirements:
             print("⚠️ 警告：没有检测到功能需求，将使用示例测试用例")
             return self._generate_example_test_cases(signals)
+
+        cache_mode = cache_mode or self.config.LLM_CACHE_MODE
+        self.journal = journal
+        mode = mode or self.config.GENERATION_MODE
+        max_tokens = None
+        if mode != "chunked":
+            # 构建提示词
+            prompt = self._build_prompt(requirements, signals, self._build_signal_index(signals))
+            raw_text = requirements[0]["content"]
+            if self.config.TOKEN_PLANNING_ENABLED:
+                if self.token_planner.fits(raw_text, self._prompt_tokens(prompt)):
+                    max_tokens = self.token_planner.max_tokens_for(raw_text)
+                else:
+                    # 整篇文档的预计输出超过单次请求上限，按章节分块以免响应被截断
+                    print("📏 文档预计输出超出单次请求的最大输出长度，改为按章节分块生成")
+                    mode = "chunked"
+        if mode == "chunked":
+            test_cases = self.generate_chunked(requirements, signals, cache_mode)
+            self._report_cache_stats(cache_mode)
+            self._report_scheduler_stats()
+            self._report_journal_stats()
+            return test_cases
             
-        # 构建提示词
-        prompt = self._build_prompt(requirements, signals)
+        journal_key = self._journal_key(prompt, max_tokens)
+        if journal_key:
+            replayed = self.journal.get(journal_key)
+            if replayed is not None:
+                self._report_journal_stats()
+                return replayed
         
         # 调用AI生成测试用例
-        response = self._call_ai(prompt)
+        response = self._call_ai(prompt, max_tokens, cache_mode)
+        self._report_cache_stats(cache_mode)
+        self._report_scheduler_stats()
         if not response:
             return []
             
         # 解析AI响应
         try:
             test_cases = self._parse_response(response, requirements, signals)
-            return test_cases
         except Exception as e:
             print(f"⚠️ 解析AI响应失败: {str(e)}")
             print(f"原始响应内容:\n{response[:500]}...")
             return []
+        if journal_key and test_cases:
+            self.journal.record(journal_key, requirements[0].get("id", ""), test_cases)
+        return test_cases
+
+    def _report_cache_stats(self, cache_mode: str) -> None:
+        """输出响应缓存命中统计"""
+        if self.response_cache and cache_mode != "bypass":
+            stats = self.response_cache.stats()
+            print(f"💾 响应缓存: 命中 {stats['hits']} 次, 未命中 {stats['misses']} 次, "
+                  f"共 {stats['entries']} 条")
+
+    def _report_scheduler_stats(self) -> None:
+        """输出请求调度统计，仅在发生重试时输出"""
+        stats = self.scheduler.stats()
+        if stats["retries"]:
+            print(f"🔁 请求调度: 共 {stats['requests']} 次请求, 重试 {stats['retries']} 次 "
+                  f"(限流 {stats['throttled']} 次), 当前并发上限 {stats['concurrency']}")
+
+    def _report_journal_stats(self) -> None:
+        """输出运行日志回放统计"""
+        if self.journal is not None and self.journal.replayed:
+            print(f"📒 运行日志: 回放 {self.journal.replayed} 个已完成的生成块, "
+                  f"本次新记录 {self.journal.recorded} 个")
+
+    def _journal_key(self, prompt: str, max_tokens: Optional[int] = None) -> Optional[str]:
+        """按完整请求参数计算运行日志键，未启用运行日志时返回 None"""
+        if self.journal is None:
+            return None
+        params = self._request_params(prompt, max_tokens)
+        return LLMResponseCache.make_key(
+            params["model"], params["temperature"], params["max_tokens"], params["messages"]
+        )
+
+    def generate_chunked(self, requirements: List[Dict[str, Any]],
+                         signals: Dict[str, Dict[str, Any]],
+                         cache_mode: Optional[str] = None) -> List[Dict[str, Any]]:
+        """按章节分块并发生成测试用例，结果按章节顺序合并
+
+        并发数由 config.LLM_CONCURRENCY 限制，请求节奏由 config.LLM_REQUESTS_PER_MINUTE 限制。
+        """
+        cache_mode = cache_mode or self.config.LLM_CACHE_MODE
+        chunks, signal_index = self.plan_requests(requirements, signals)
+
+        # 线程数取调度器的并发上限，实际同时进行的请求数由调度器按 AIMD 控制
+        workers = max(1, min(self.scheduler.max_concurrency, len(chunks)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(self._generate_chunk, chunk, signals, signal_index, cache_mode)
+                       for chunk in chunks]
+            results = [future.result() for future in futures]
+
+        return [case for chunk_cases in results for case in chunk_cases]
+
+    def plan_requests(self, requirements: List[Dict[str, Any]],
+                      signals: Dict[str, Dict[str, Any]],
+                      signal_index: Optional[SignalIndex] = None) -> Tuple[List[Dict[str, Any]], Optional[SignalIndex]]:
+        """将文档切分并规划为请求列表，返回 (请求列表, 信号索引)
+
+        返回的请求可逐个交给 generate_request，供批量模式在共享线程池中调度多个文档。
+        已为同一信号矩阵构建过索引时可通过 signal_index 传入，避免重复构建。
+        """
+        if signal_index is None:
+            signal_index = self._build_signal_index(signals)
+        return self._plan_chunks(self._split_into_chunks(requirements), signals, signal_index), signal_index
+
+    def generate_request(self, chunk: Dict[str, Any],
+                         signals: Dict[str, Dict[str, Any]],
+                         signal_index: Optional[SignalIndex] = None,
+                         cache_mode: Optional[str] = None) -> List[Dict[str, Any]]:
+        """为 plan_requests 规划出的单个请求生成测试用例，可在多个线程中并发调用
+
+        cache_mode 默认取 config.LLM_CACHE_MODE。
+        """
+        return self._generate_chunk(chunk, signals, signal_index, cache_mode or self.config.LLM_CACHE_MODE)
+
+    def _split_into_chunks(self, requirements: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """按章节标题将原始文本拆分为生成块，第一个标题之前的内容（如概述、术语）单独作为一个生成块"""
+        raw_text = requirements[0]["content"] if requirements else ""
+        sections = split_sections(raw_text, preamble_title="前言")
+        if not sections:
+            return [requirements[0]]
+        return [{
+            "id": section["title"],
+            "description": section["title"],
+            "content": section["content"],
+            "type": "Section"
+        } for section in sections]
+
+    def _plan_chunks(self, chunks: List[Dict[str, Any]],
+                     signals: Dict[str, Dict[str, Any]],
+                     signal_index: Optional[SignalIndex] = None) -> List[Dict[str, Any]]:
+        """按 token 预算合并/切分章节块，并为每个请求设置 max_tokens"""
+        if not self.config.TOKEN_PLANNING_ENABLED:
+            print(f"🧩 文档已按章节切分为 {len(chunks)} 个生成块")
+            return chunks
+        planned = self.token_planner.pack(
+            chunks, lambda chunk: self._prompt_tokens(self._build_prompt([chunk], signals, signal_index))
+        )
+        print(f"🧩 文档已按章节切分为 {len(chunks)} 个生成块，按 token 预算规划为 {len(planned)} 个请求")
+        return planned
+
+    def _prompt_tokens(self, prompt: str) -> int:
+        """估算请求的输入 token 数（系统消息 + 用户提示词）"""
+        return sum(self.token_planner.count(message["content"])
+                   for message in self._request_params(prompt)["messages"])
+
+    def _build_signal_index(self, signals: Dict[str, Dict[str, Any]]) -> Optional[SignalIndex]:
+        """构建信号倒排索引，未启用信号过滤时返回 None"""
+        if not self.config.SIGNAL_FILTER_ENABLED:
+            return None
+        return SignalIndex(signals, self.config.SIGNAL_ALIASES)
+
+    def _generate_chunk(self, chunk: Dict[str, Any],
+                        signals: Dict[str, Dict[str, Any]],
+                        signal_index: Optional[SignalIndex] = None,
+                        cache_mode: str = "use") -> List[Dict[str, Any]]:
+        """为单个章节块生成测试用例，运行日志中已完成的章节块直接回放"""
+        prompt = self._build_prompt([chunk], signals, signal_index)
+        journal_key = self._journal_key(prompt, chunk.get("max_tokens"))
+        if journal_key:
+            replayed = self.journal.get(journal_key)
+            if replayed is not None:
+                return replayed
+
+        response = self._call_ai(prompt, chunk.get("max_tokens"), cache_mode)
+        if not response:
+            print(f"⚠️ 章节 [{chunk['id']}] 未获得AI响应")
+            return []
+        test_cases = self._parse_response(response, [chunk], signals)
+        if journal_key and test_cases:
+            self.journal.record(journal_key, chunk["id"], test_cases)
+        return test_cases
+
+    def improve_coverage(self, requirements: List[Dict[str, Any]],
+                         signals: Dict[str, Dict[str, Any]],
+                         test_cases: List[Dict[str, Any]],
+                         max_calls: Optional[int] = None,
+                         max_rounds: Optional[int] = None,
+                         cache_mode: Optional[str] = None) -> List[Dict[str, Any]]:
+        """针对覆盖缺口补充生成测试用例，返回追加了补充用例的测试用例列表
+
+        需求编号由 document_parser.extract_requirements 提取，信号只统计需求文本中提及的信号
+        （未启用信号过滤时为全部信号）。每轮将缺口按 config.COVERAGE_TARGETS_PER_REQUEST
+        分组并发请求；某一轮没有减少缺口、调用次数达到 max_calls 或轮数达到 max_rounds 时停止。
+        """
+        if not requirements:
+            return test_cases
+        max_calls = max_calls if max_calls is not None else self.config.COVERAGE_MAX_CALLS
+        max_rounds = max_rounds if max_rounds is not None else self.config.COVERAGE_MAX_ROUNDS
+        cache_mode = cache_mode or self.config.LLM_CACHE_MODE
+        raw_text = "\n".join(item.get("content", "") for item in requirements)
+        signal_index = self._build_signal_index(signals)
+        relevant_signals = signal_index.lookup(raw_text) if signal_index is not None else list(signals)
+        engine = TraceabilityEngine(extract_requirements(requirements, self.taxonomy.classify_function),
+                                    relevant_signals, signal_index)
+        engine.add_cases(test_cases)
+        # 启用本地边界值用例时，信号的边界/异常场景由 BoundaryCaseGenerator 负责
+        gap_options = (self.config.COVERAGE_REQUIRE_ABNORMAL,
+                       self.config.COVERAGE_REQUIRE_ABNORMAL and not self.config.LOCAL_BOUNDARY_CASES)
+
+        test_cases = list(test_cases)
+        gaps = engine.gaps(*gap_options)
+        initial_gaps = len(gaps)
+        calls = 0
+        for round_index in range(max_rounds):
+            if not gaps or calls >= max_calls:
+                break
+            size = max(1, self.config.COVERAGE_TARGETS_PER_REQUEST)
+            batches = [gaps[i:i + size] for i in range(0, len(gaps), size)][:max_calls - calls]
+            calls += len(batches)
+            print(f"🎯 第 {round_index + 1} 轮覆盖补充: {len(gaps)} 个缺口，发送 {len(batches)} 个补充请求")
+
+            workers = max(1, min(self.scheduler.max_concurrency, len(batches)))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(
+                    lambda batch: self._generate_followup(batch, signals, signal_index, cache_mode), batches
+                ))
+            new_cases = [case for batch_cases in results for case in batch_cases]
+            engine.add_cases(new_cases)
+            test_cases.extend(new_cases)
+
+            remaining = engine.gaps(*gap_options)
+            if len(remaining) >= len(gaps):
+                gaps = remaining
+                print("🎯 本轮未减少覆盖缺口，停止补充")
+                break
+            gaps = remaining
+
+        if initial_gaps:
+            print(f"🎯 覆盖补充: {calls} 次调用，缺口 {initial_gaps} → {len(gaps)}")
+            for gap in gaps[:10]:
+                label = "需求" if gap["kind"] == "requirement" else "信号"
+                missing = "无测试用例" if gap["missing"] == "cases" else "缺少异常/边界用例"
+                print(f"  - {label} {gap['id']}: {missing}")
+        self._report_scheduler_stats()
+        return test_cases
+
+    def _generate_followup(self, gaps: List[Dict[str, Any]],
+                           signals: Dict[str, Dict[str, Any]],
+                           signal_index: Optional[SignalIndex] = None,
+                           cache_mode: str = "use") -> List[Dict[str, Any]]:
+        """为一组覆盖缺口生成补充测试用例，与章节块一样使用运行日志回放"""
+        prompt = self._build_coverage_prompt(gaps, signals, signal_index)
+        max_tokens = min(self.config.LLM_MAX_OUTPUT_TOKENS,
+                         len(gaps) * self.config.LLM_OUTPUT_TOKENS_PER_REQUIREMENT + self.token_planner.output_overhead)
+        chunk_id = "覆盖补充: " + ", ".join(gap["id"] for gap in gaps)
+        journal_key = self._journal_key(prompt, max_tokens)
+        if journal_key:
+            replayed = self.journal.get(journal_key)
+            if replayed is not None:
+                return replayed
+
+        response = self._call_ai(prompt, max_tokens, cache_mode)
+        if not response:
+            print(f"⚠️ [{chunk_id}] 未获得AI响应")
+            return []
+        test_cases = self._parse_response(response, [], signals)
+        if journal_key and test_cases:
+            self.journal.record(journal_key, chunk_id, test_cases)
+        return test_cases
+
+    def _build_coverage_prompt(self, gaps: List[Dict[str, Any]],
+                               signals: Dict[str, Dict[str, Any]],
+                               signal_index: Optional[SignalIndex] = None) -> str:
+        """构建只包含覆盖缺口的补充提示词"""
+        lines = []
+        related_text = []
+        for gap in gaps:
+            missing = "尚无测试用例" if gap["missing"] == "cases" else "缺少异常/边界测试用例"
+            if gap["kind"] == "requirement":
+                description = gap["requirement"].get("description", "")
+                lines.append(f"- 需求 {gap['id']}（{missing}）：{description}")
+                related_text.append(description)
+            else:
+                lines.append(f"- 信号 {gap['id']}（{missing}）")
+            related_text.append(gap["id"])
+
+        if signal_index is not None:
+            signal_text = SignalIndex.format_compact(signal_index.select("\n".join(related_text)))
+        else:
+            names = [gap["id"] for gap in gaps if gap["kind"] == "signal" and gap["id"] in signals]
+            signal_text = SignalIndex.format_compact({name: signals[name] for name in names})
+        gap_text = "\n".join(lines)
+
+        return f"""
+你是一位专业的汽车电子测试工程师。以下需求和信号在已生成的测试用例中覆盖不足，请只针对这些条目补充测试用例：
+
+【待补充条目】
+{gap_text}
+
+【相关CAN信号】
+{signal_text}
+
+【详细要求】
+1. 标注“尚无测试用例”的条目生成2个测试用例：1个正常场景、1个异常场景；标注“缺少异常/边界测试用例”的条目生成1~2个异常或边界场景测试用例。
+2. `coverage` 必须包含对应条目的需求编号或信号名称，写法与上面列出的完全一致。
+3. 异常或边界场景的测试用例增加字段 `test_type`，取值为 "异常值" 或 "边界值"。
+4. 其余字段与常规测试用例相同：`description`、`input_signal`、`output_signal`、`precondition`、`steps`（使用序号开头）、`expected`。
+5. 只输出JSON数组，不要输出其它内容。
+        """
     
 
+    def generate_stream(self, requirements: List[Dict[str, Any]],
+                        signals: Dict[str, Dict[str, Any]],
+                        mode: Optional[str] = None,
+                        cache_mode: Optional[str] = None,
+                        journal: Optional[RunJournal] = None) -> Iterator[Dict[str, Any]]:
+        """流式生成测试用例，每个测试用例对象闭合后立即产出
+
+        分块模式下各章节并发流式请求，测试用例按到达顺序产出；
+        格式错误的单个对象会被跳过，不影响其它测试用例。
+        """
+        if not requirements:
+            print("⚠️ 警告：没有检测到功能需求，将使用示例测试用例")
+            yield from self._generate_example_test_cases(signals)
+            return
+
+        cache_mode = cache_mode or self.config.LLM_CACHE_MODE
+        self.journal = journal
+        signal_index = self._build_signal_index(signals)
+        if (mode or self.config.GENERATION_MODE) == "chunked":
+            chunks = self._split_into_chunks(requirements)
+        else:
+            chunks = [requirements[0]]
+        chunks = self._plan_chunks(chunks, signals, signal_index)
+
+        if len(chunks) == 1:
+            yield from self._stream_chunk(chunks[0], signals, signal_index, cache_mode)
+            self._report_cache_stats(cache_mode)
+            self._report_scheduler_stats()
+            self._report_journal_stats()
+            return
+
+        done = object()
+        queue = Queue()
+
+        def stream_worker(chunk):
+            try:
+                for case in self._stream_chunk(chunk, signals, signal_index, cache_mode):
+                    queue.put(case)
+            finally:
+                queue.put(done)
+
+        # 线程数取调度器的并发上限，实际同时进行的请求数由调度器按 AIMD 控制
+        workers = max(1, min(self.scheduler.max_concurrency, len(chunks)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(stream_worker, chunk) for chunk in chunks]
+            remaining = len(chunks)
+            while remaining:
+                item = queue.get()
+                if item is done:
+                    remaining -= 1
+                else:
+                    yield item
+        # 与 generate_chunked 一致，章节块的异常在其余章节产出完毕后抛出，不会被静默丢弃
+        for chunk, future in zip(chunks, futures):
+            if future.exception() is not None:
+                print(f"⚠️ 章节 [{chunk.get('id', '')}] 流式生成失败: {future.exception()}")
+        for future in futures:
+            future.result()
+        self._report_cache_stats(cache_mode)
+        self._report_scheduler_stats()
+        self._report_journal_stats()
+
+    def _stream_chunk(self, chunk: Dict[str, Any],
+                      signals: Dict[str, Dict[str, Any]],
+                      signal_index: Optional[SignalIndex] = None,
+                      cache_mode: str = "use") -> Iterator[Dict[str, Any]]:
+        """流式生成单个章节块的测试用例，章节块完整结束后写入运行日志"""
+        prompt = self._build_prompt([chunk], signals, signal_index)
+        journal_key = self._journal_key(prompt, chunk.get("max_tokens"))
+        if journal_key:
+            replayed = self.journal.get(journal_key)
+            if replayed is not None:
+                yield from replayed
+                return
+
+        parser = IncrementalCaseParser()
+        test_cases = []
+        status = {}
+        for delta in self._call_ai_stream(prompt, status, chunk.get("max_tokens"), cache_mode):
+            for case in parser.feed(delta):
+                test_cases.append(case)
+                yield case
+        # 流式请求中途失败时已产出的测试用例不完整，不写入运行日志
+        if journal_key and test_cases and status.get("complete"):
+            self.journal.record(journal_key, chunk.get("id", ""), test_cases)
+        if parser.skipped:
+            print(f"⚠️ 章节 [{chunk.get('id', '')}] 跳过 {parser.skipped} 个格式错误的测试用例")
+
+    @profiled()
     def _build_prompt(self, requirements: List[Dict[str, Any]], 
-                     signals: Dict[str, Dict[str, Any]]) -> str:
-        """构建AI生成测试用例的提示词"""
+                     signals: Dict[str, Dict[str, Any]],
+                     signal_index: Optional[SignalIndex] = None) -> str:
+        """构建AI生成测试用例的提示词
+
+        提供 signal_index 时只写入文本中实际提及的信号，并使用紧凑表格格式。
+        """
         # 提取原始文本内容
         raw_text = requirements[0]["content"] if requirements else ""
+        if signal_index is not None:
+            signal_text = SignalIndex.format_compact(signal_index.select(raw_text))
+        else:
+            signal_text = json.dumps(dict(signals), indent=2, ensure_ascii=False)
         
+        if self.config.LOCAL_BOUNDARY_CASES:
+            # 信号边界值、越界值用例已由 BoundaryCaseGenerator 在本地生成
+            abnormal_rule = "4. **异常处理**：信号的最小/最大值、越界值和原始值溢出用例已由本地规则生成，请勿重复生成；针对每个功能需求，生成至少1个功能层面的异常情况测试用例，如信号无效、条件不满足等。"
+        else:
+            abnormal_rule = "4. **异常处理**：针对每个功能需求，生成至少1个异常情况的测试用例，如信号无效、超出边界值等。"
+
         # 定义示例格式
         example_format = """
 [
@@ -84,7 +527,7 @@ class TestCaseGenerator:
 {raw_text}
 
 【CAN信号矩阵】
-{json.dumps(signals, indent=2, ensure_ascii=False)}
+{signal_text}
 
 【详细要求】
 1. **测试用例描述**：简洁明了，直接说明测试场景和验证内容，如"挂R档，倒车灯点亮"。
@@ -97,33 +540,133 @@ class TestCaseGenerator:
    - `precondition`：执行测试前必须满足的条件，确保测试环境的正确性。
    - `steps`：详细测试步骤，使用序号开头，如"1. 操作内容"，步骤需具有可操作性。
    - `expected`：明确的预期行为，与输出信号和测试目的一致。
-4. **异常处理**：针对每个功能需求，生成至少1个异常情况的测试用例，如信号无效、超出边界值等。
+{abnormal_rule}
 5. **格式要求**：输出必须为符合以下格式的JSON数组：
 {example_format}
         """
         return prompt
-    def _call_ai(self, prompt: str) -> Optional[str]:
-        """调用AI生成测试用例"""
+    def _request_params(self, prompt: str, max_tokens: Optional[int] = None) -> Dict[str, Any]:
+        """构建对话补全请求参数，max_tokens 未指定时使用 config.LLM_MAX_TOKENS"""
+        return {
+            "model": self.config.MODEL,
+            "messages": [
+                {"role": "system", "content": "你是一个专业的汽车电子测试工程师，擅长根据功能规范和CAN信号矩阵生成全面的测试用例。请严格按照用户提供的详细要求生成测试用例。"},
+                {"role": "user", "content": prompt}
+            ],
+            "temperature": 0.3,  # 降低随机性，提高确定性
+            "max_tokens": max_tokens or self.config.LLM_MAX_TOKENS
+        }
+
+    def _cache_key(self, params: Dict[str, Any], cache_mode: str) -> Optional[str]:
+        """按缓存模式计算缓存键，不使用缓存时返回 None"""
+        if not self.response_cache or cache_mode == "bypass":
+            return None
+        return self.response_cache.make_key(
+            params["model"], params["temperature"], params["max_tokens"], params["messages"]
+        )
+
+    @profiled()
+    def _call_ai(self, prompt: str, max_tokens: Optional[int] = None, cache_mode: str = "use") -> Optional[str]:
+        """调用AI生成测试用例
+
+        启用响应缓存时，相同模型、参数和消息内容的请求直接返回缓存结果；
+        cache_mode 为 "refresh" 时重新请求并覆盖缓存，为 "bypass" 时不读写缓存。
+        因达到 max_tokens 被截断的响应不写入缓存，下次运行会重新请求。
+        """
+        params = self._request_params(prompt, max_tokens)
+        cache_key = self._cache_key(params, cache_mode)
+        if cache_key and cache_mode == "use":
+            cached = self.response_cache.get(cache_key)
+            if cached is not None:
+                annotate(cached=True)
+                return cached
+
         try:
             import logging
             logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
             logging.info("正在调用AI生成测试用例...")
-            completion = self.client.chat.completions.create(
-                model=self.config.MODEL,
-                messages=[
-                    {"role": "system", "content": "你是一个专业的汽车电子测试工程师，擅长根据功能规范和CAN信号矩阵生成全面的测试用例。请严格按照用户提供的详细要求生成测试用例。"},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.3,  # 降低随机性，提高确定性
-                max_tokens=4000
-            )
-            return completion.choices[0].message.content
+            completion = self.scheduler.call(self.client.chat.completions.create, **params)
+            content = completion.choices[0].message.content
+            usage = getattr(completion, "usage", None)
+            record_usage(usage)
+            if usage is not None:
+                self.token_planner.calibrate(
+                    "".join(message["content"] for message in params["messages"]), usage.prompt_tokens
+                )
+            truncated = completion.choices[0].finish_reason == "length"
+            if truncated:
+                print(f"⚠️ 响应达到 max_tokens={params['max_tokens']} 被截断，"
+                      f"可调大 LLM_OUTPUT_TOKENS_PER_REQUIREMENT")
         except Exception as e:
             import logging
             logging.basicConfig(level=logging.ERROR, format='%(asctime)s - %(levelname)s - %(message)s')
             logging.error(f"API调用失败: {str(e)}")
+            self._record_failure()
             return None
 
+        if cache_key and content and not truncated:
+            self.response_cache.put(cache_key, content)
+        return content
+
+    def _record_failure(self) -> None:
+        with self._failed_lock:
+            self.failed_calls += 1
+
+    def _call_ai_stream(self, prompt: str, status: Optional[Dict[str, Any]] = None,
+                        max_tokens: Optional[int] = None, cache_mode: str = "use") -> Iterator[str]:
+        """以流式方式调用AI，逐段产出补全文本
+
+        缓存命中时一次性产出缓存内容；流式响应完整结束且未被截断时写入缓存。
+        流末尾的 usage 数据块计入运行剖析的 token 用量，并用于校准 token 估算。
+        传入 status 字典时，响应完整结束后将 status["complete"] 置为 True。
+        """
+        status = status if status is not None else {}
+        params = self._request_params(prompt, max_tokens)
+        cache_key = self._cache_key(params, cache_mode)
+        if cache_key and cache_mode == "use":
+            cached = self.response_cache.get(cache_key)
+            if cached is not None:
+                yield cached
+                status["complete"] = True
+                return
+
+        parts = []
+        truncated = False
+        try:
+            import logging
+            logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+            logging.info("正在以流式方式调用AI生成测试用例...")
+            # include_usage 使服务端在流末尾追加一个只含 usage、choices 为空的数据块
+            stream = self.scheduler.stream(self.client.chat.completions.create, stream=True,
+                                           stream_options={"include_usage": True}, **params)
+            for chunk in stream:
+                usage = getattr(chunk, "usage", None)
+                if usage is not None:
+                    record_usage(usage)
+                    self.token_planner.calibrate(
+                        "".join(message["content"] for message in params["messages"]), usage.prompt_tokens
+                    )
+                if not chunk.choices:
+                    continue
+                if chunk.choices[0].finish_reason == "length":
+                    truncated = True
+                    print(f"⚠️ 流式响应达到 max_tokens={params['max_tokens']} 被截断，"
+                          f"可调大 LLM_OUTPUT_TOKENS_PER_REQUIREMENT")
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    parts.append(delta)
+                    yield delta
+        except Exception as e:
+            import logging
+            logging.basicConfig(level=logging.ERROR, format='%(asctime)s - %(levelname)s - %(message)s')
+            logging.error(f"API流式调用失败: {str(e)}")
+            self._record_failure()
+            return
+
+        status["complete"] = True
+        if cache_key and parts and not truncated:
+            self.response_cache.put(cache_key, "".join(parts))
+
 #     def _build_prompt(self, requirements: List[Dict[str, Any]], 
 #                      signals: Dict[str, Dict[str, Any]]) -> str:
 #         """构建AI生成测试用例的提示词"""
@@ -214,6 +757,7 @@ class TestCaseGenerator:
 #             print(f"⚠️ API调用失败: {str(e)}")
 #             return None
     
+    @profiled()
     def _parse_response(self, response: str, 
                        requirements: List[Dict[str, Any]], 
                        signals: Dict[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
@@ -241,6 +785,12 @@ class TestCaseGenerator:
                 return json.loads(json_str)
                 
         except Exception as e:
+            # 整体解析失败时逐个对象解析，只跳过格式错误的测试用例
+            parser = IncrementalCaseParser()
+            cases = parser.feed(response)
+            if cases:
+                print(f"⚠️ 响应JSON不完整，逐个解析得到 {len(cases)} 个测试用例，跳过 {parser.skipped} 个")
+                return cases
             print(f"⚠️ 解析AI响应失败: {str(e)}")
             print(f"原始响应内容:\n{response[:500]}...")
             return []
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# 各模块以脚本目录为根相互导入，测试时将该目录加入模块搜索路径
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
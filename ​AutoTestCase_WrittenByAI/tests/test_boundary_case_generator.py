@@ -0,0 +1,41 @@
+from boundary_case_generator import (BoundaryCaseGenerator, VALID_TEST_TYPE, OUT_OF_RANGE_TEST_TYPE,
+                                     OVERFLOW_TEST_TYPE)
+from signal_codec import SignalCodec, RAW_OUT_OF_RANGE
+
+SIGNALS = {
+    "CoolantTemp": {"message_name": "VCU_1", "start_bit": 0, "bit_length": 12, "factor": 0.5, "offset": 0,
+                    "is_signed": True, "value_range": "-500~500"},
+    "VehSpd": {"message_name": "VCU_1", "start_bit": 16, "bit_length": 8, "value_range": "0~200"},
+}
+
+
+def _stimuli(cases, name):
+    return {case["description"].split("-", 1)[1]: (case["input_signal"][name], case["test_type"])
+            for case in cases if case["coverage"] == [name]}
+
+
+def test_signed_signal_uses_twos_complement_range():
+    cases = BoundaryCaseGenerator().generate(SIGNALS)
+    stimuli = _stimuli(cases, "CoolantTemp")
+    assert stimuli["最小值-500"] == ("-0x3E8", VALID_TEST_TYPE)
+    assert stimuli["最大值500"] == ("0x3E8", VALID_TEST_TYPE)
+    assert stimuli["低于最小值-500.5"] == ("-0x3E9", OUT_OF_RANGE_TEST_TYPE)
+    assert stimuli["高于最大值500.5"] == ("0x3E9", OUT_OF_RANGE_TEST_TYPE)
+    assert stimuli["原始值溢出(12位信号写入0x1000)"] == ("0x1000", OVERFLOW_TEST_TYPE)
+
+
+def test_signed_signal_without_range_covers_full_raw_range():
+    signals = {"Torque": {"message_name": "VCU_2", "start_bit": 0, "bit_length": 8, "is_signed": True}}
+    stimuli = _stimuli(BoundaryCaseGenerator().generate(signals), "Torque")
+    assert stimuli["最小值-128"] == ("-0x80", VALID_TEST_TYPE)
+    assert stimuli["最大值127"] == ("0x7F", VALID_TEST_TYPE)
+    assert not any(label.startswith(("低于最小值", "高于最大值")) for label in stimuli)
+
+
+def test_generated_values_are_accepted_by_signal_codec():
+    cases = BoundaryCaseGenerator().generate(SIGNALS)
+    issues = SignalCodec(SIGNALS).validate_cases(cases)
+    # 只有越界值和溢出值用例的输入超出范围，溢出值超出信号位宽
+    flagged = {(cases[issue["case"]]["test_type"], issue["reason"] == RAW_OUT_OF_RANGE) for issue in issues}
+    assert flagged == {(OUT_OF_RANGE_TEST_TYPE, False), (OVERFLOW_TEST_TYPE, True)}
+    assert all(cases[issue["case"]]["test_type"] != VALID_TEST_TYPE for issue in issues)
@@ -0,0 +1,67 @@
+from dedup import CaseDeduplicator
+
+BASE = {
+    "description": "档位信号为R档时倒车灯点亮",
+    "input_signal": {"VCU_ActGear": "R", "BCM_PowerMode": "ON"},
+    "output_signal": "倒车灯点亮",
+    "steps": ["1. 电源上电至ON档", "2. 设置档位信号为R档"],
+    "expected": ["倒车灯点亮"],
+}
+
+
+def _case(**fields):
+    return dict(BASE, **fields)
+
+
+def test_merges_near_duplicates_and_keeps_richest_case():
+    richer = _case(description="档位信号为R档时，倒车灯点亮",
+                   steps=["步骤1：电源上电至ON档", "步骤2：设置档位信号为R档"],
+                   input_signal={"BCM_PowerMode": "ON", "VCU_ActGear": "R"},
+                   expected=["倒车灯点亮", "仪表倒车提示点亮"])
+    other_signals = _case(input_signal={"VCU_ActGear": "D", "BCM_PowerMode": "ON"})
+    deduplicator = CaseDeduplicator(threshold=0.8)
+
+    result = deduplicator.dedupe([BASE, richer, other_signals])
+    # 输入/输出信号相同且文本只差步骤编号的用例合并，保留内容更完整的一个，位置不变
+    assert result == [richer, other_signals]
+
+    report = deduplicator.report()
+    assert (report["input"], report["kept"], report["merged"]) == (3, 2, 1)
+    assert len(report["groups"]) == 1
+    group = report["groups"][0]
+    # 被替换的是先出现的用例，合并记录中是它的序号和描述
+    assert (group["kept"], group["kept_index"]) == (richer["description"], 1)
+    assert [(merge["index"], merge["description"]) for merge in group["merged"]] == [(0, BASE["description"])]
+    assert group["merged"][0]["similarity"] >= 0.8
+
+
+def test_chained_replacements_record_each_displaced_case():
+    richest = _case(description="档位信号为R档时倒车灯点亮。",
+                    expected=["倒车灯点亮", "仪表倒车提示点亮", "倒车影像开启"])
+    richer = _case(expected=["倒车灯点亮", "仪表倒车提示点亮"])
+    deduplicator = CaseDeduplicator(threshold=0.8)
+    assert deduplicator.dedupe([BASE, richer, richest]) == [richest]
+
+    group = deduplicator.report()["groups"][0]
+    assert (group["kept"], group["kept_index"]) == (richest["description"], 2)
+    assert [merge["index"] for merge in group["merged"]] == [0, 1]
+
+
+def test_different_text_with_same_signals_is_kept():
+    different = _case(description="倒车灯电路短路时记录故障码并熄灭倒车灯",
+                      steps=["1. 短接倒车灯输出至地", "2. 读取故障码"])
+    deduplicator = CaseDeduplicator(threshold=0.8)
+    assert deduplicator.dedupe([BASE, different]) == [BASE, different]
+    assert deduplicator.report()["merged"] == 0
+
+
+def test_later_batches_are_compared_with_earlier_ones():
+    deduplicator = CaseDeduplicator(threshold=0.8)
+    assert deduplicator.dedupe([BASE]) == [BASE]
+    # 之前批次已输出的用例不会被替换，后续批次中的重复用例直接合并
+    assert deduplicator.dedupe([_case(expected=["倒车灯点亮", "蜂鸣器提示"])]) == []
+
+    report = deduplicator.report()
+    assert (report["input"], report["kept"], report["merged"]) == (2, 1, 1)
+    assert (report["groups"][0]["kept"], report["groups"][0]["kept_index"]) == (BASE["description"], 0)
+    assert report["groups"][0]["merged"][0]["index"] == 1
@@ -0,0 +1,48 @@
+import time
+from types import SimpleNamespace
+
+from openai import RateLimitError
+
+import llm_scheduler
+from llm_scheduler import RequestScheduler
+
+
+def _rate_limit_error(headers):
+    # 只设置调度器读取的字段，不依赖 HTTP 客户端构造响应
+    error = RateLimitError.__new__(RateLimitError)
+    error.status_code = 429
+    error.response = SimpleNamespace(headers=headers)
+    return error
+
+
+def test_retry_after_pauses_new_requests(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(llm_scheduler.time, "sleep", sleeps.append)
+    scheduler = RequestScheduler(max_retries=3, max_delay=60.0, initial_concurrency=4)
+
+    before = time.monotonic()
+    scheduler._handle_error(_rate_limit_error({"retry-after": "7"}), attempt=0)
+    assert sleeps == [7.0]
+    assert scheduler._resume_at >= before + 7.0
+    assert (scheduler.retries, scheduler.throttled) == (1, 1)
+    assert scheduler.concurrency == 2
+
+
+def test_throttled_call_is_retried_after_the_header_delay(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(llm_scheduler.time, "sleep", sleeps.append)
+    scheduler = RequestScheduler(max_retries=3)
+    responses = iter([_rate_limit_error({"retry-after-ms": "200"}), "ok"])
+
+    def request():
+        response = next(responses)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    start = time.monotonic()
+    assert scheduler.call(request) == "ok"
+    # 重试前的新请求同样要等到 Retry-After 结束
+    assert time.monotonic() - start >= 0.2
+    assert sleeps[0] == 0.2
+    assert scheduler.stats()["throttled"] == 1
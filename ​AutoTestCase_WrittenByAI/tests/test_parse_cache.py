@@ -0,0 +1,35 @@
+from pathlib import Path
+from types import SimpleNamespace
+
+from document_parser import DocumentParser
+
+DBC = '''VERSION ""
+
+BO_ 291 CGW_VCU_P_5: 8 VCU
+ SG_ VCU_ActGear : 7|4@0+ (1,0) [0|15] "" BCM,ICM
+ SG_ VCU_Temp : 16|12@1- (0.1,-40) [-40|200.5] "degC" BCM
+
+VAL_ 291 VCU_ActGear 0 "Initial value" 9 "Reverse gear" 10 "Neutral" ;
+'''
+
+
+def _parser(tmp_path):
+    config = SimpleNamespace(
+        PARSE_CACHE_ENABLED=True,
+        PARSE_CACHE_DIR=tmp_path / "cache",
+        TAXONOMY_PATH=Path(__file__).resolve().parent.parent / "config" / "config.json",
+        DBC_ENCODING="utf-8",
+    )
+    return DocumentParser(config)
+
+
+def test_cached_dbc_matches_fresh_parse(tmp_path):
+    dbc_path = tmp_path / "vcu.dbc"
+    dbc_path.write_text(DBC, encoding="utf-8")
+
+    fresh = _parser(tmp_path).parse_dbc(dbc_path).to_dict()
+    parser = _parser(tmp_path)
+    cached = parser.parse_dbc(dbc_path).to_dict()
+    assert parser.parse_cache.hits == 1
+    assert fresh["VCU_ActGear"]["value_table"] == {0: "Initial value", 9: "Reverse gear", 10: "Neutral"}
+    assert cached == fresh
@@ -0,0 +1,68 @@
+import numpy as np
+
+from signal_codec import SignalCodec, RAW_OUT_OF_RANGE, PHYSICAL_OUT_OF_RANGE
+
+SIGNALS = {
+    "VehSpd": {"message_name": "VCU_1", "start_bit": 0, "bit_length": 8},
+    "CoolantTemp": {"message_name": "VCU_1", "start_bit": 8, "bit_length": 12,
+                    "factor": 0.5, "offset": 0, "is_signed": True, "value_range": "-500~500"},
+    "ActGear": {"message_name": "VCU_1", "start_bit": 39, "bit_length": 16, "byte_order": "Motorola"},
+    "Odometer": {"message_name": "VCU_2", "start_bit": 0, "bit_length": 64},
+    "Torque": {"message_name": "VCU_3", "start_bit": 0, "bit_length": 64, "is_signed": True},
+}
+
+
+def _frames(result):
+    return {frame["message"]: frame["data"] for frame in result["frames"]}
+
+
+def _payload(data):
+    return np.frombuffer(bytes.fromhex(data), dtype=np.uint8)
+
+
+def test_encode_layout_and_decode_round_trip():
+    codec = SignalCodec(SIGNALS)
+    result = codec.encode_cases([{"input_signal": {"VehSpd": 0x12, "CoolantTemp": -100.5, "ActGear": "0x1234"}}])
+    assert result["issues"] == []
+    # -100.5 / 0.5 = -201，12 位补码为 0xF37；Motorola 信号起始位 39 为 MSB，占用第 4、5 字节
+    assert _frames(result) == {"VCU_1": "12370F0012340000"}
+
+    decoded = codec.decode("VCU_1", _payload(_frames(result)["VCU_1"]))
+    assert decoded["VehSpd"].tolist() == [18.0]
+    assert decoded["CoolantTemp"].tolist() == [-100.5]
+    assert decoded["ActGear"].tolist() == [0x1234]
+
+
+def test_signed_values_round_trip_across_frames():
+    codec = SignalCodec(SIGNALS)
+    temperatures = [-1024.0, -0.5, 0.0, 0.5, 1023.5]
+    cases = [{"input_signal": {"CoolantTemp": value}} for value in temperatures]
+    result = codec.encode_cases(cases)
+    # 超出 value_range 的取值仍然打包，只报告物理值越界
+    assert {issue["reason"] for issue in result["issues"]} == {PHYSICAL_OUT_OF_RANGE}
+    payloads = np.stack([_payload(frame["data"]) for frame in result["frames"]])
+    assert codec.decode("VCU_1", payloads)["CoolantTemp"].tolist() == temperatures
+
+
+def test_64_bit_raw_values_are_packed_exactly():
+    codec = SignalCodec(SIGNALS)
+    result = codec.encode_cases([{"input_signal": {"Odometer": "0xFFFFFFFFFFFFFFFE", "Torque": "-0x2"}}])
+    assert result["issues"] == []
+    frames = _frames(result)
+    assert frames["VCU_2"] == "FEFFFFFFFFFFFFFF"
+    assert frames["VCU_3"] == "FEFFFFFFFFFFFFFF"
+    assert codec.decode("VCU_3", _payload(frames["VCU_3"]))["Torque"].tolist() == [-2.0]
+
+    # 直接打包 uint64 位模式，不经过 float64
+    raw = np.array([0x8000000000000001], dtype=np.uint64)
+    payloads = codec.pack(np.array([0]), np.array([codec.index["Odometer"]]), raw, 1)
+    assert payloads[0, :8].tobytes().hex().upper() == "0100000000000080"
+
+
+def test_out_of_range_raw_values_are_reported_and_not_packed():
+    codec = SignalCodec(SIGNALS)
+    result = codec.encode_cases([{"input_signal": {"VehSpd": "0x100", "CoolantTemp": 2048}}])
+    assert sorted((issue["signal"], issue["reason"]) for issue in result["issues"]) == [
+        ("CoolantTemp", RAW_OUT_OF_RANGE), ("VehSpd", RAW_OUT_OF_RANGE)
+    ]
+    assert _frames(result) == {"VCU_1": "0000000000000000"}
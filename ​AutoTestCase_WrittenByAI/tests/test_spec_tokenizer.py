@@ -0,0 +1,85 @@
+import re
+
+import pytest
+
+from spec_tokenizer import (KINDS, ANCHORED_KINDS, SECTION_PATTERNS, REQUIREMENT_PATTERNS, SIGNAL_PATTERNS,
+                            SpecToken, tokenize)
+
+SAMPLE = """第7章 倒车灯控制
+一、概述
+本章规定倒车灯的控制逻辑
+4.功能定义
+1.同时满足以下条件时，倒车灯点亮：
+  a) 电源模式为ON档
+2.任一条件不满足时，倒车灯熄灭。
+4.1 倒车灯点亮
+4.2.1 当VCU_ActGear为R档时倒车灯应点亮
+ECU_001 倒车灯输出诊断
+3、 工作条件
+需求：倒车灯延时熄灭
+IGN1 信号：点火开关状态
+信号：VCU_ActGear 档位信号
+VCU_ActGear: 0x0=P, 0x7=R
+C14 倒车灯输出引脚
+
+无编号的说明文字
+"""
+
+
+def _reference(line, kinds):
+    """逐个模式依次匹配的参考实现：章节和需求只在行首匹配，信号可在行内任意位置"""
+    found = {}
+    groups = {"section": SECTION_PATTERNS, "requirement": REQUIREMENT_PATTERNS, "signal": SIGNAL_PATTERNS}
+    for kind in kinds:
+        for number, pattern in enumerate(groups[kind], 1):
+            match = (re.match if kind in ANCHORED_KINDS else re.search)(pattern, line)
+            if match is None:
+                continue
+            if kind == "section":
+                found[kind] = match.group(f"section_{number}")
+            elif kind == "requirement" and number == len(REQUIREMENT_PATTERNS):
+                found[kind] = (match.group(f"req_{number}"), line)
+            elif kind == "requirement":
+                found[kind] = (match.group(f"req_{number}"), match.group(f"req_{number}_desc"))
+            else:
+                found[kind] = (match.group(f"signal_{number}"), match.group(f"signal_{number}_desc"))
+            break
+    return found
+
+
+def _expected(text, kinds):
+    tokens, position = [], 0
+    for line in text.split("\n"):
+        stripped = line.strip()
+        if stripped:
+            start = position + len(line) - len(line.lstrip())
+            tokens.append(SpecToken(start, start + len(stripped), stripped, **_reference(stripped, kinds)))
+        position += len(line) + 1
+    return tokens
+
+
+@pytest.mark.parametrize("kinds", [KINDS, ("section",), ("section", "requirement"), ("signal",)])
+def test_matches_sequential_reference(kinds):
+    assert list(tokenize(SAMPLE, kinds)) == _expected(SAMPLE, kinds)
+
+
+def test_chunked_source_matches_whole_text():
+    pieces = [SAMPLE[start:start + 7] for start in range(0, len(SAMPLE), 7)]
+    assert list(tokenize(pieces)) == list(tokenize(SAMPLE))
+
+
+def test_positions_point_into_source():
+    for token in tokenize(SAMPLE):
+        assert SAMPLE[token.start:token.end] == token.text
+
+
+def test_anchoring_and_heading_rules():
+    tokens = {token.text: token for token in tokenize(SAMPLE)}
+    # 编号条款是需求而不是章节，短的编号行是章节
+    assert tokens["4.功能定义"].section == "4.功能定义"
+    assert tokens["1.同时满足以下条件时，倒车灯点亮："].section is None
+    assert tokens["1.同时满足以下条件时，倒车灯点亮："].requirement[0] == "1"
+    # 行中间的信号名、引脚号不是需求编号
+    assert tokens["IGN1 信号：点火开关状态"].requirement is None
+    assert tokens["IGN1 信号：点火开关状态"].signal == ("IGN1", "点火开关状态")
+    assert tokens["C14 倒车灯输出引脚"].requirement is None
@@ -0,0 +1,61 @@
+from traceability import TraceabilityEngine
+
+REQUIREMENTS = [{"id": "4.1", "description": "倒车灯点亮"},
+                {"id": "4.2", "description": "倒车灯熄灭"},
+                {"id": "4.3", "description": "倒车灯故障诊断"}]
+SIGNALS = ["VCU_ActGear", "BCM_PowerMode", "BCM_ReverseLampSts"]
+CASES = [
+    {"description": "R档点亮倒车灯", "coverage": ["需求4.1", "VCU_ActGear"],
+     "input_signal": {"BCM_PowerMode": "ON"}},
+    {"description": "档位信号无效", "test_type": "异常值", "coverage": ["REQ-4.1, 4.2"]},
+    {"description": "未知条目", "coverage": ["4.9"]},
+]
+
+
+def _engine():
+    engine = TraceabilityEngine(REQUIREMENTS, SIGNALS)
+    engine.add_cases(CASES)
+    return engine
+
+
+def test_coverage_counts_and_case_lookup():
+    engine = _engine()
+    requirements = engine.requirement_matrix()
+    assert requirements.shape == (3, 3)
+    assert requirements.counts().tolist() == [2, 1, 0]
+    assert requirements.uncovered() == ["4.3"]
+    assert requirements.cases_of(0).tolist() == [0, 1]
+    assert requirements.items_of(1) == ["4.1", "4.2"]
+
+    signals = engine.signal_matrix()
+    # coverage 中的信号名称和 input_signal 的信号都计入覆盖
+    assert signals.counts().tolist() == [1, 1, 0]
+    assert signals.uncovered() == ["BCM_ReverseLampSts"]
+    assert engine.unmatched == {"4.9": 1}
+
+
+def test_gaps_report_missing_and_normal_only_items():
+    engine = _engine()
+    gaps = [(gap["kind"], gap["id"], gap["missing"]) for gap in engine.gaps()]
+    assert gaps == [("requirement", "4.3", "cases"), ("signal", "BCM_ReverseLampSts", "cases")]
+
+    gaps = [(gap["kind"], gap["id"], gap["missing"]) for gap in engine.gaps(signal_abnormal=True)]
+    assert gaps == [("requirement", "4.3", "cases"),
+                    ("signal", "VCU_ActGear", "abnormal"),
+                    ("signal", "BCM_PowerMode", "abnormal"),
+                    ("signal", "BCM_ReverseLampSts", "cases")]
+
+    # 只有正常场景用例的需求也是缺口
+    engine.add_cases([{"description": "诊断", "coverage": ["4.3"]}])
+    gaps = [(gap["id"], gap["missing"]) for gap in engine.gaps(signal_abnormal=False) if gap["kind"] == "requirement"]
+    assert gaps == [("4.3", "abnormal")]
+
+
+def test_report_ratios():
+    report = _engine().report()
+    assert report["test_cases"] == 3
+    assert report["requirements"]["covered"] == 2
+    assert report["requirements"]["ratio"] == round(2 / 3, 4)
+    assert report["requirements"]["case_counts"] == {"4.1": 2, "4.2": 1}
+    assert report["signals"]["uncovered"] == ["BCM_ReverseLampSts"]
+    assert report["unmatched_coverage"] == {"4.9": 1}
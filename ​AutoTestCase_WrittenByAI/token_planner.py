@@ -0,0 +1,162 @@
+import math
+import re
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+'''
+定义了 TokenPlanner 类，在本地估算提示词和输出的 token 数，用于规划大模型请求。
+输入 token 优先使用 tiktoken 计数（已安装且配置了编码时），否则按中文字符、
+英文单词/数字和符号分别计权的启发式估算，并根据接口返回的 usage.prompt_tokens 持续校准。
+输出 token 按文本中的功能需求条数估算；规划器据此将相邻章节合并为尽量少的请求，
+同时保证每个请求的预计输出不超过模型的最大输出长度，并为每个请求设置合适的 max_tokens。
+'''
+
+# 启发式计数的权重：中文字符（含全角标点）每字约 0.7 token，英文单词/数字每 4 个字符约 1 token
+CJK_PATTERN = re.compile(r'[\u2e80-\u9fff\uac00-\ud7af\uf900-\ufaff\u3000-\u303f\uff00-\uffef]')
+WORD_PATTERN = re.compile(r'[A-Za-z0-9_]+')
+SYMBOL_PATTERN = re.compile(r'[^\sA-Za-z0-9_\u2e80-\u9fff\uac00-\ud7af\uf900-\ufaff\u3000-\u303f\uff00-\uffef]')
+CJK_TOKEN_WEIGHT = 0.7
+CHARS_PER_WORD_TOKEN = 4
+
+# 功能需求条目的行首编号，与 DocumentParser._extract_functions 的编号格式一致
+REQUIREMENT_PATTERN = re.compile(
+    r'^\s*(?:\d+\.\d+(?:\.\d+)*|[A-Z]{2,3}_\d+|\d+\s*、|\d+\s*[.．]\s*(?=[^\d\s])|(?:需求|功能)\s*[:：])',
+    re.MULTILINE
+)
+
+
+class TokenPlanner:
+    def __init__(self, context_tokens: int = 131072, max_output_tokens: int = 8192,
+                 tokens_per_requirement: int = 1200, output_overhead: int = 300,
+                 encoding: Optional[str] = None):
+        self.context_tokens = context_tokens
+        self.max_output_tokens = max_output_tokens
+        self.tokens_per_requirement = tokens_per_requirement
+        self.output_overhead = output_overhead
+        self.ratio = 1.0  # 实际 token 数 / 本地估算值，由 calibrate 更新
+        self._lock = threading.Lock()
+        self._encoder = None
+        if encoding:
+            try:
+                import tiktoken
+                self._encoder = tiktoken.get_encoding(encoding)
+            except (ImportError, ValueError) as e:
+                print(f"⚠️ 无法加载 tiktoken 编码 {encoding}，使用启发式估算: {e}")
+
+    def _raw_count(self, text: str) -> float:
+        if self._encoder is not None:
+            return len(self._encoder.encode(text, disallowed_special=()))
+        cjk = len(CJK_PATTERN.findall(text))
+        words = sum(math.ceil(len(word) / CHARS_PER_WORD_TOKEN) for word in WORD_PATTERN.findall(text))
+        symbols = len(SYMBOL_PATTERN.findall(text))
+        return cjk * CJK_TOKEN_WEIGHT + words + symbols
+
+    def count(self, text: str) -> int:
+        """估算文本的 token 数（已按实际用量校准）"""
+        return math.ceil(self._raw_count(text) * self.ratio)
+
+    def calibrate(self, text: str, actual_tokens: Optional[int]) -> None:
+        """根据接口返回的实际 token 数校准估算比例，按指数滑动平均更新"""
+        if not actual_tokens:
+            return
+        estimated = self._raw_count(text)
+        if estimated <= 0:
+            return
+        with self._lock:
+            self.ratio = 0.7 * self.ratio + 0.3 * (actual_tokens / estimated)
+
+    @staticmethod
+    def count_requirements(text: str) -> int:
+        """统计文本中的功能需求条目数，没有编号条目时按 1 条计"""
+        return max(1, len(REQUIREMENT_PATTERN.findall(text)))
+
+    def output_tokens(self, text: str) -> int:
+        """预计为该需求文本生成测试用例所需的输出 token 数"""
+        return self._output_tokens(self.count_requirements(text))
+
+    def _output_tokens(self, requirements: int) -> int:
+        return max(1, requirements) * self.tokens_per_requirement + self.output_overhead
+
+    def max_tokens_for(self, text: str) -> int:
+        """为该需求文本的请求设置的 max_tokens：预计输出留 25% 余量，不超过模型最大输出长度"""
+        return self._max_tokens(self.count_requirements(text))
+
+    def _max_tokens(self, requirements: int) -> int:
+        return min(self.max_output_tokens, math.ceil(self._output_tokens(requirements) * 1.25))
+
+    def fits(self, text: str, prompt_tokens: int) -> bool:
+        """判断单个请求能否在不截断的情况下完成"""
+        return self._fits(self.count_requirements(text), prompt_tokens)
+
+    def _fits(self, requirements: int, prompt_tokens: int) -> bool:
+        return self._output_tokens(requirements) <= self.max_output_tokens and \
+            prompt_tokens + self._max_tokens(requirements) <= self.context_tokens
+
+    def split_text(self, text: str) -> List[str]:
+        """将预计输出超出上限的文本按需求条目边界切分为多段"""
+        per_part = max(1, (self.max_output_tokens - self.output_overhead) // self.tokens_per_requirement)
+        starts = [match.start() for match in REQUIREMENT_PATTERN.finditer(text)]
+        if len(starts) <= per_part:
+            return [text]
+        # 第一条需求之前的内容（如章节标题）归入第一段
+        cuts = [0] + starts[per_part::per_part] + [len(text)]
+        return [text[cuts[i]:cuts[i + 1]] for i in range(len(cuts) - 1) if text[cuts[i]:cuts[i + 1]].strip()]
+
+    def pack(self, chunks: List[Dict[str, Any]],
+             prompt_tokens: Callable[[Dict[str, Any]], int]) -> List[Dict[str, Any]]:
+        """将生成块合并/切分为请求
+
+        相邻生成块依次合并，直到再加入一个就会使预计输出超过最大输出长度或提示词超出上下文窗口；
+        单个生成块的预计输出超过上限时按需求条目切分。prompt_tokens 返回单个生成块对应提示词的 token 数。
+        每个生成块只构建一次提示词、统计一次需求条目：合并请求的需求条目数为各块之和，
+        提示词 token 数先按各块提示词之和减去重复的固定部分（空生成块的提示词）估算，
+        各块引用的相同信号会被重复计入，估算值不低于实际值；只有估算值超出上限时才构建合并后的提示词精确计算，
+        合并结果与逐个候选精确计算一致。
+        返回的每个请求包含 id、description、content、type 和 max_tokens。
+        """
+        pieces = []
+        for chunk in chunks:
+            parts = self.split_text(chunk["content"])
+            for index, part in enumerate(parts):
+                piece = dict(chunk, content=part)
+                if len(parts) > 1:
+                    piece["id"] = f"{chunk['id']} ({index + 1}/{len(parts)})"
+                pieces.append(piece)
+        if not pieces:
+            return []
+
+        template = prompt_tokens({"id": "", "description": "", "content": "",
+                                  "type": pieces[0].get("type", "Section")})
+        requests, group = [], []
+        group_requirements = group_prompt = 0
+        for piece in pieces:
+            requirements = len(REQUIREMENT_PATTERN.findall(piece["content"]))
+            piece_prompt = prompt_tokens(piece)
+            if group:
+                merged_requirements = group_requirements + requirements
+                merged_prompt = group_prompt + piece_prompt - template
+                if self._output_tokens(merged_requirements) <= self.max_output_tokens and \
+                        not self._fits(merged_requirements, merged_prompt):
+                    merged_prompt = prompt_tokens(self._merge(group + [piece], merged_requirements))
+                if self._fits(merged_requirements, merged_prompt):
+                    group_requirements, group_prompt = merged_requirements, merged_prompt
+                    group.append(piece)
+                    continue
+                requests.append(self._merge(group, group_requirements))
+            group, group_requirements, group_prompt = [piece], requirements, piece_prompt
+        if group:
+            requests.append(self._merge(group, group_requirements))
+        return requests
+
+    def _merge(self, group: List[Dict[str, Any]], requirements: int) -> Dict[str, Any]:
+        if len(group) == 1:
+            merged = dict(group[0])
+        else:
+            merged = {
+                "id": f"{group[0]['id']} ~ {group[-1]['id']}",
+                "description": "\n".join(chunk["description"] for chunk in group),
+                "content": "\n".join(chunk["content"] for chunk in group),
+                "type": group[0].get("type", "Section")
+            }
+        merged["max_tokens"] = self._max_tokens(requirements)
+        return merged
@@ -0,0 +1,232 @@
+import re
+import numpy as np
+from array import array
+from typing import List, Dict, Any, Iterable, Optional, Set, Tuple
+
+'''
+定义了需求/信号到测试用例的追溯引擎 TraceabilityEngine。
+需求编号来自 DocumentParser.extract_requirements，信号名称来自信号矩阵；
+测试用例的 coverage 列表、input_signal 的信号名称（以及提供 SignalIndex 时 output_signal 中提及的信号）
+在接收测试用例时一次性解析为列号，保存为“测试用例 × 需求”和“测试用例 × 信号”两个 CSR 稀疏矩阵。
+覆盖次数、未覆盖条目和某条需求对应的测试用例都由 NumPy 在矩阵上直接计算，
+可在生成过程中反复调用，用来只对未覆盖的需求重新生成。
+每个测试用例同时记录是否为异常/边界用例，用于找出只有正常场景用例的需求和信号。
+'''
+
+# coverage 中的需求编号常带有 "需求"、"REQ-" 等前缀，或将多个编号写在同一项中
+REQUIREMENT_PREFIX_PATTERN = re.compile(r'^(?:需求|功能|req(?:uirement)?)[\s_\-#:：]*', re.IGNORECASE)
+COVERAGE_SPLIT_PATTERN = re.compile(r'[,，、;；/\s]+')
+# 测试类型或描述中含有这些词的测试用例视为异常/边界用例
+ABNORMAL_KEYWORDS = ("异常", "边界", "无效", "越界", "超出", "超限", "溢出", "故障", "失效", "错误",
+                     "丢失", "超时", "最大值", "最小值")
+
+
+def requirement_key(text: Any) -> str:
+    """需求编号的规范形式：去掉前缀、空白和结尾标点，统一小写"""
+    key = REQUIREMENT_PREFIX_PATTERN.sub("", str(text).strip())
+    return re.sub(r'\s+', "", key).rstrip(".。:：").lower()
+
+
+def is_abnormal_case(case: Dict[str, Any]) -> bool:
+    """根据 test_type 和描述判断是否为异常/边界测试用例"""
+    text = f"{case.get('test_type') or ''} {case.get('description') or ''}"
+    return any(keyword in text for keyword in ABNORMAL_KEYWORDS)
+
+
+class CoverageMatrix:
+    """测试用例 × 条目的 0/1 稀疏矩阵（CSR）
+
+    indptr[i]:indptr[i+1] 为第 i 个测试用例在 indices 中的区间，indices 为覆盖的条目列号。
+    """
+
+    def __init__(self, items: List[str], indptr: np.ndarray, indices: np.ndarray):
+        self.items = items
+        self.indptr = indptr
+        self.indices = indices
+        self._csc: Optional[Tuple[np.ndarray, np.ndarray]] = None
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return len(self.indptr) - 1, len(self.items)
+
+    @property
+    def nnz(self) -> int:
+        return len(self.indices)
+
+    def counts(self, row_mask: Optional[np.ndarray] = None) -> np.ndarray:
+        """每个条目被多少个测试用例覆盖；提供 row_mask 时只统计选中的测试用例"""
+        if row_mask is None:
+            return np.bincount(self.indices, minlength=len(self.items))
+        selected = np.repeat(row_mask, np.diff(self.indptr))
+        return np.bincount(self.indices[selected], minlength=len(self.items))
+
+    def covered(self) -> np.ndarray:
+        return self.counts() > 0
+
+    def uncovered(self) -> List[str]:
+        return [self.items[col] for col in np.flatnonzero(self.counts() == 0)]
+
+    def items_of(self, case_index: int) -> List[str]:
+        """测试用例覆盖的条目"""
+        return [self.items[col] for col in self.indices[self.indptr[case_index]:self.indptr[case_index + 1]]]
+
+    def transpose(self) -> Tuple[np.ndarray, np.ndarray]:
+        """转置为按条目索引的 (indptr, 测试用例序号)，即 CSC 形式"""
+        if self._csc is None:
+            rows = np.repeat(np.arange(self.shape[0]), np.diff(self.indptr))
+            order = np.argsort(self.indices, kind="stable")
+            indptr = np.zeros(len(self.items) + 1, dtype=np.int64)
+            np.cumsum(self.counts(), out=indptr[1:])
+            self._csc = indptr, rows[order]
+        return self._csc
+
+    def cases_of(self, col: int) -> np.ndarray:
+        """覆盖某个条目的测试用例序号"""
+        indptr, rows = self.transpose()
+        return rows[indptr[col]:indptr[col + 1]]
+
+
+class TraceabilityEngine:
+    def __init__(self, requirements: List[Dict[str, Any]], signals: Iterable[str], signal_index=None):
+        self.requirements = requirements
+        self.requirement_ids = [str(requirement["id"]) for requirement in requirements]
+        self.signal_names = [str(name) for name in signals]
+        self.signal_index = signal_index
+
+        self._requirement_lookup: Dict[str, int] = {}
+        for col, requirement_id in enumerate(self.requirement_ids):
+            self._requirement_lookup.setdefault(requirement_key(requirement_id), col)
+        self._signal_lookup: Dict[str, int] = {}
+        for col, name in enumerate(self.signal_names):
+            self._signal_lookup.setdefault(name, col)
+            self._signal_lookup.setdefault(name.lower(), col)
+
+        self.case_count = 0
+        self.unmatched: Dict[str, int] = {}  # coverage 中既不是需求编号也不是信号名称的条目
+        # CSR 的行指针和列号保存在类型化数组中，生成矩阵时只需一次内存拷贝
+        self._requirement_cols = array('q')
+        self._requirement_ptr = array('q', [0])
+        self._signal_cols = array('q')
+        self._signal_ptr = array('q', [0])
+        self._abnormal = array('b')
+        self._matrices: Dict[str, CoverageMatrix] = {}
+        self._resolved: Dict[str, Tuple[Optional[int], Tuple[int, ...]]] = {}
+
+    def add_cases(self, test_cases: List[Dict[str, Any]]) -> None:
+        """解析测试用例的覆盖关系并追加为矩阵的行，可多次调用"""
+        for case in test_cases:
+            requirement_cols, signal_cols = self._case_links(case)
+            self._requirement_cols.extend(sorted(requirement_cols))
+            self._requirement_ptr.append(len(self._requirement_cols))
+            self._signal_cols.extend(sorted(signal_cols))
+            self._signal_ptr.append(len(self._signal_cols))
+            self._abnormal.append(is_abnormal_case(case))
+        self.case_count += len(test_cases)
+        self._matrices.clear()
+
+    def _resolve(self, entry: str) -> Tuple[Optional[int], Tuple[int, ...]]:
+        """将一个 coverage 条目解析为 (信号列号, 需求列号)，结果按条目文本缓存"""
+        resolved = self._resolved.get(entry)
+        if resolved is not None:
+            return resolved
+        text = entry.strip()
+        signal_col = self._signal_lookup.get(text)
+        if signal_col is None:
+            signal_col = self._signal_lookup.get(text.lower())
+        requirement_cols = ()
+        if signal_col is None:
+            cols = {}
+            for part in [text] + COVERAGE_SPLIT_PATTERN.split(text):
+                key = requirement_key(part)
+                col = self._requirement_lookup.get(key) if key else None
+                if col is not None:
+                    cols[col] = None
+            requirement_cols = tuple(cols)
+        resolved = self._resolved[entry] = (signal_col, requirement_cols)
+        return resolved
+
+    def _case_links(self, case: Dict[str, Any]) -> Tuple[Set[int], Set[int]]:
+        requirement_cols, signal_cols = set(), set()
+        coverage = case.get("coverage") or []
+        if isinstance(coverage, str):
+            coverage = [coverage]
+        for entry in coverage:
+            entry = str(entry)
+            signal_col, cols = self._resolve(entry)
+            if signal_col is not None:
+                signal_cols.add(signal_col)
+            elif cols:
+                requirement_cols.update(cols)
+            elif entry.strip():
+                self.unmatched[entry.strip()] = self.unmatched.get(entry.strip(), 0) + 1
+
+        input_signal = case.get("input_signal")
+        if isinstance(input_signal, dict):
+            for name in input_signal:
+                col = self._signal_lookup.get(str(name).strip())
+                if col is not None:
+                    signal_cols.add(col)
+        if self.signal_index is not None and case.get("output_signal"):
+            for name in self.signal_index.lookup(str(case["output_signal"])):
+                col = self._signal_lookup.get(str(name))
+                if col is not None:
+                    signal_cols.add(col)
+        return requirement_cols, signal_cols
+
+    def requirement_matrix(self) -> CoverageMatrix:
+        """测试用例 × 需求 的覆盖矩阵"""
+        return self._matrix("requirements", self.requirement_ids, self._requirement_ptr, self._requirement_cols)
+
+    def signal_matrix(self) -> CoverageMatrix:
+        """测试用例 × 信号 的覆盖矩阵"""
+        return self._matrix("signals", self.signal_names, self._signal_ptr, self._signal_cols)
+
+    def _matrix(self, kind: str, items: List[str], indptr: array, indices: array) -> CoverageMatrix:
+        if kind not in self._matrices:
+            self._matrices[kind] = CoverageMatrix(items, np.frombuffer(indptr, dtype=np.int64).copy(),
+                                                  np.frombuffer(indices, dtype=np.int64).copy())
+        return self._matrices[kind]
+
+    def uncovered_requirements(self) -> List[Dict[str, Any]]:
+        """尚无测试用例覆盖的需求条目"""
+        counts = self.requirement_matrix().counts()
+        return [self.requirements[col] for col in np.flatnonzero(counts == 0)]
+
+    def gaps(self, requirement_abnormal: bool = True, signal_abnormal: bool = False) -> List[Dict[str, Any]]:
+        """没有测试用例、或只有正常场景测试用例的需求和信号
+
+        返回 [{"kind": "requirement"/"signal", "id", "missing": "cases"/"abnormal", "requirement"}]，
+        requirement_abnormal / signal_abnormal 为 False 时不检查对应条目的异常/边界用例。
+        """
+        abnormal = np.frombuffer(self._abnormal, dtype=np.int8).astype(bool)
+        result = []
+        for kind, matrix, check_abnormal in (("requirement", self.requirement_matrix(), requirement_abnormal),
+                                             ("signal", self.signal_matrix(), signal_abnormal)):
+            counts = matrix.counts()
+            missing = np.where(counts == 0, 1, 0)
+            if check_abnormal:
+                missing[(counts > 0) & (matrix.counts(abnormal) == 0)] = 2
+            for col in np.flatnonzero(missing):
+                gap = {"kind": kind, "id": matrix.items[col], "missing": "cases" if missing[col] == 1 else "abnormal"}
+                if kind == "requirement":
+                    gap["requirement"] = self.requirements[col]
+                result.append(gap)
+        return result
+
+    def report(self, limit: Optional[int] = None) -> Dict[str, Any]:
+        """覆盖率统计、各条目的覆盖次数和未覆盖条目"""
+        result = {"test_cases": self.case_count}
+        for kind, matrix in (("requirements", self.requirement_matrix()), ("signals", self.signal_matrix())):
+            counts = matrix.counts()
+            covered = int(np.count_nonzero(counts))
+            uncovered = matrix.uncovered()
+            result[kind] = {
+                "total": len(matrix.items),
+                "covered": covered,
+                "ratio": round(covered / len(matrix.items), 4) if matrix.items else 1.0,
+                "uncovered": uncovered[:limit] if limit else uncovered,
+                "case_counts": {item: int(count) for item, count in zip(matrix.items, counts) if count}
+            }
+        unmatched = sorted(self.unmatched.items(), key=lambda item: -item[1])
+        result["unmatched_coverage"] = dict(unmatched[:limit] if limit else unmatched)
+        return result
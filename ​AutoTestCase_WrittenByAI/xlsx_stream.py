@@ -0,0 +1,120 @@
+import posixpath
+import zipfile
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Tuple
+from xml.etree.ElementTree import iterparse, fromstring
+
+'''
+只读流式读取 xlsx 工作表单元格值的工具函数。
+信号矩阵解析只需要单元格的值，而 openpyxl 加载工作簿时会完整解析样式表，
+带有大量命名样式的矩阵文件仅加载就需要十几秒。这里直接读取压缩包中的
+工作表 XML，逐行产出与 openpyxl values_only 相同的数值元组，内存占用只与单行大小有关。
+'''
+
+_NS_MAIN = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+_NS_REL = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+_NS_PKG_REL = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+
+
+def _sheet_paths(archive: zipfile.ZipFile) -> List[Tuple[str, str]]:
+    """按工作簿中的顺序返回 (工作表名称, 压缩包内路径)"""
+    workbook = fromstring(archive.read("xl/workbook.xml"))
+    rels = fromstring(archive.read("xl/_rels/workbook.xml.rels"))
+    targets = {rel.get("Id"): rel.get("Target") for rel in rels.iter(f"{_NS_PKG_REL}Relationship")}
+    sheets = []
+    for sheet in workbook.iter(f"{_NS_MAIN}sheet"):
+        target = targets.get(sheet.get(f"{_NS_REL}id"), "")
+        path = target.lstrip("/") if target.startswith("/") else posixpath.normpath(posixpath.join("xl", target))
+        sheets.append((sheet.get("name"), path))
+    return sheets
+
+
+def _shared_strings(archive: zipfile.ZipFile) -> List[str]:
+    if "xl/sharedStrings.xml" not in archive.namelist():
+        return []
+    strings = []
+    for _, element in iterparse(archive.open("xl/sharedStrings.xml")):
+        if element.tag == f"{_NS_MAIN}si":
+            strings.append(_rich_text(element))
+            element.clear()
+    return strings
+
+
+def _rich_text(element) -> str:
+    """拼接 <si>/<is> 中的文本：纯文本为 <t>，富文本由多个 <r><t> 组成，拼音标注 <rPh> 不计入"""
+    parts = []
+    for child in element:
+        if child.tag == f"{_NS_MAIN}t":
+            parts.append(child.text or "")
+        elif child.tag == f"{_NS_MAIN}r":
+            parts.extend(text.text or "" for text in child.iter(f"{_NS_MAIN}t"))
+    return "".join(parts)
+
+
+def _column_index(reference: str) -> int:
+    """将单元格引用（如 AB12）转换为从0开始的列序号"""
+    index = 0
+    for char in reference:
+        if not char.isalpha():
+            break
+        index = index * 26 + (ord(char.upper()) - 64)
+    return index - 1
+
+
+def _cell_value(cell, shared_strings: List[str]) -> Any:
+    cell_type = cell.get("t", "n")
+    if cell_type == "inlineStr":
+        inline = cell.find(f"{_NS_MAIN}is")
+        return _rich_text(inline) if inline is not None else None
+    value = cell.findtext(f"{_NS_MAIN}v")
+    if value is None:
+        return None
+    if cell_type == "s":
+        return shared_strings[int(value)]
+    if cell_type == "b":
+        return bool(int(value))
+    if cell_type in ("str", "e", "d"):
+        return value
+    if "." in value or "E" in value or "e" in value:
+        return float(value)
+    return int(value)
+
+
+def sheet_names(excel_path: Path) -> List[str]:
+    """返回工作簿中全部工作表名称"""
+    with zipfile.ZipFile(excel_path) as archive:
+        return [name for name, _ in _sheet_paths(archive)]
+
+
+def active_sheet_name(excel_path: Path) -> str:
+    """返回工作簿保存时的当前工作表名称"""
+    with zipfile.ZipFile(excel_path) as archive:
+        workbook = fromstring(archive.read("xl/workbook.xml"))
+        view = workbook.find(f"{_NS_MAIN}bookViews/{_NS_MAIN}workbookView")
+        active = int(view.get("activeTab", 0)) if view is not None else 0
+        names = [name for name, _ in _sheet_paths(archive)]
+    return names[active] if active < len(names) else names[0]
+
+
+def iter_sheet_rows(excel_path: Path, sheet_name: str) -> Iterator[Tuple[Any, ...]]:
+    """逐行产出工作表的单元格值元组，空行产出空元组，与 openpyxl 只读模式的 values_only 一致"""
+    with zipfile.ZipFile(excel_path) as archive:
+        paths: Dict[str, str] = dict(_sheet_paths(archive))
+        if sheet_name not in paths:
+            raise KeyError(f"工作表不存在: {sheet_name}")
+        shared_strings = _shared_strings(archive)
+        next_row = 1
+        for _, element in iterparse(archive.open(paths[sheet_name])):
+            if element.tag != f"{_NS_MAIN}row":
+                continue
+            row_number = int(element.get("r", next_row))
+            while next_row < row_number:
+                yield ()
+                next_row += 1
+            values: Dict[int, Any] = {}
+            for position, cell in enumerate(element.iter(f"{_NS_MAIN}c")):
+                reference = cell.get("r")
+                values[_column_index(reference) if reference else position] = _cell_value(cell, shared_strings)
+            element.clear()
+            next_row = row_number + 1
+            yield tuple(values.get(col) for col in range(max(values) + 1)) if values else ()